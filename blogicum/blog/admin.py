@@ -2,9 +2,17 @@ from django.contrib import admin
 from django.contrib.auth import get_user_model
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.contrib.auth.models import Group
+from django.db.models import Q
 from django.utils.html import format_html
+from django.utils.timezone import now
 
-from .models import Category, Comment, Location, Post
+from . import search
+from .autocomplete import suggest_categories, suggest_usernames
+from .constants import AUTOCOMPLETE_ADMIN_LIMIT
+from .mail import send_queued_mail_task
+from .models import (Category, Comment, Location, OutgoingEmail, Post,
+                     Task)
+from .tasks import enqueue_on_commit
 
 User = get_user_model()  # Получаем модель пользователя.
 
@@ -12,8 +20,22 @@ admin.site.unregister(User)  # Удаляем регистрацию станд
 admin.site.unregister(Group)  # Удаляем группы.
 
 
+class PrefixAutocompleteMixin:
+    """
+    Поля автодополнения в админке (autocomplete_fields) ищут по индексу
+    автодополнения в памяти, а не запросом LIKE к базе на каждое нажатие.
+    Условие отбора по префиксу даёт метод админки prefix_filter.
+    """
+
+    def get_search_results(self, request, queryset, search_term):
+        match = request.resolver_match
+        if search_term and match and match.url_name == 'autocomplete':
+            return queryset.filter(self.prefix_filter(search_term)), False
+        return super().get_search_results(request, queryset, search_term)
+
+
 @admin.register(User)  # Регистрируем кастомизированную админку.
-class BlogUserAdmin(BaseUserAdmin):
+class BlogUserAdmin(PrefixAutocompleteMixin, BaseUserAdmin):
     list_display = (
         'username',
         'email',
@@ -35,11 +57,32 @@ class BlogUserAdmin(BaseUserAdmin):
         'last_name'
     )
 
+    def prefix_filter(self, search_term):
+        return Q(username__in=suggest_usernames(
+            search_term, AUTOCOMPLETE_ADMIN_LIMIT
+        ))
+
     @admin.display(description='Кол-во постов у пользователя')
     def posts_count(self, author):
         return author.posts.count()
 
 
+class FullTextSearchMixin:
+    """
+    Поиск в админке через полнотекстовый индекс вместо LIKE '%...%'
+    по search_fields. Без FTS5 (не SQLite) работает обычный поиск.
+    Условие по индексу даёт метод админки full_text_filter.
+    """
+
+    def get_search_results(self, request, queryset, search_term):
+        if (not search.is_available()
+                or search.match_expression(search_term) is None):
+            return super().get_search_results(
+                request, queryset, search_term
+            )
+        return queryset.filter(self.full_text_filter(search_term)), False
+
+
 class PostInline(admin.TabularInline):
     model = Post
     extra = 0
@@ -54,7 +97,7 @@ class PostInline(admin.TabularInline):
 
 
 @admin.register(Category)
-class CategoryAdmin(admin.ModelAdmin):
+class CategoryAdmin(PrefixAutocompleteMixin, admin.ModelAdmin):
     list_display = (
         'title',
         'description',
@@ -65,9 +108,16 @@ class CategoryAdmin(admin.ModelAdmin):
     search_fields = ('title',)
     inlines = [PostInline]
 
+    def prefix_filter(self, search_term):
+        return Q(slug__in=[
+            slug for _, slug, _ in suggest_categories(
+                search_term, AUTOCOMPLETE_ADMIN_LIMIT, published_only=False
+            )
+        ])
+
 
 @admin.register(Post)
-class PostAdmin(admin.ModelAdmin):
+class PostAdmin(FullTextSearchMixin, admin.ModelAdmin):
     list_display = (
         'title',
         'image_preview',
@@ -86,6 +136,10 @@ class PostAdmin(admin.ModelAdmin):
     list_editable = ('is_published',)
     list_filter = ('category', 'location', 'author', 'is_published')
     search_fields = ('title', 'text')
+    autocomplete_fields = ('author', 'category')
+
+    def full_text_filter(self, search_term):
+        return Q(id__in=search.matching_ids(search.POST_INDEX, search_term))
 
     @admin.display(description='Изображение')
     def image_preview(self, obj):
@@ -102,7 +156,7 @@ class LocationAdmin(admin.ModelAdmin):
 
 
 @admin.register(Comment)
-class CommentAdmin(admin.ModelAdmin):
+class CommentAdmin(FullTextSearchMixin, admin.ModelAdmin):
     """Админка для комментариев."""
 
     list_display = (
@@ -116,5 +170,71 @@ class CommentAdmin(admin.ModelAdmin):
     search_fields = ('text', 'post__title', 'author__username')
     readonly_fields = ('created_at',)
 
+    def full_text_filter(self, search_term):
+        return (
+            Q(id__in=search.matching_ids(search.COMMENT_INDEX, search_term))
+            | Q(post_id__in=search.matching_ids(
+                search.POST_INDEX, search_term, column='title'
+            ))
+            | Q(author__username__icontains=search_term)
+        )
+
+
+@admin.register(Task)
+class TaskAdmin(admin.ModelAdmin):
+    """Очередь задач: просмотр и повторный запуск упавших."""
+
+    list_display = (
+        'name',
+        'status',
+        'priority',
+        'attempts',
+        'run_after',
+        'created_at',
+    )
+    list_filter = ('status', 'name')
+    # Имя и аргументы задаёт только код: из админки задачу можно
+    # лишь перезапустить.
+    readonly_fields = (
+        'name',
+        'args',
+        'kwargs',
+        'attempts',
+        'locked_at',
+        'last_error',
+        'created_at',
+    )
+    actions = ('retry',)
+
+    @admin.action(description='Запустить заново')
+    def retry(self, request, queryset):
+        queryset.update(
+            status=Task.Status.QUEUED, attempts=0, run_after=now(),
+            locked_at=None
+        )
+
+
+@admin.register(OutgoingEmail)
+class OutgoingEmailAdmin(admin.ModelAdmin):
+    """Очередь писем: просмотр и повторная отправка."""
+
+    list_display = ('subject', 'from_email', 'attempts', 'created_at')
+    readonly_fields = (
+        'from_email',
+        'recipients',
+        'subject',
+        'attempts',
+        'locked_at',
+        'last_error',
+        'created_at',
+    )
+    exclude = ('message',)
+    actions = ('retry',)
+
+    @admin.action(description='Отправить заново')
+    def retry(self, request, queryset):
+        queryset.update(attempts=0, locked_at=None)
+        enqueue_on_commit(send_queued_mail_task, unique=True)
+
 
 admin.site.empty_value_display = 'Не задано'
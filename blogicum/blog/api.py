@@ -0,0 +1,258 @@
+import binascii
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import datetime
+from http import HTTPStatus
+
+from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Count, Q
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_GET
+
+from .caching import RELATED_SCOPE, get_generation, get_post_versions
+from .conditional import conditional_response
+from .constants import API_MAX_PAGE_SIZE, API_PAGE_SIZE
+from .models import Category, Comment, Post
+
+User = get_user_model()
+
+# JSON API только для чтения (api/v1/). Страницы строятся курсорами
+# по (дате, id), а не номером страницы: следующая страница читает только
+# свои строки по индексу, как бы далеко ни ушёл клиент. Вместо моделей
+# выбираются кортежи нужных полей, а список пишется в ответ по записи.
+
+# Ключ в ответе → поле для values_list.
+POST_FIELDS = {
+    'id': 'id',
+    'title': 'title',
+    'text_html': 'text_html',
+    'pub_date': 'pub_date',
+    'author': 'author__username',
+    'category': 'category__slug',
+    'location': 'location__name',
+    'comment_count': 'comment_count',
+}
+POST_DETAIL_FIELDS = {
+    **POST_FIELDS,
+    'updated_at': 'updated_at',
+    'views_count': 'views_count',
+    'image': 'image',
+}
+COMMENT_FIELDS = {
+    'id': 'id',
+    'author': 'author__username',
+    'text_html': 'text_html',
+    'created_at': 'created_at',
+    'updated_at': 'updated_at',
+}
+
+_encoder = DjangoJSONEncoder()
+
+
+def _error(status, message):
+    return JsonResponse({'error': message}, status=status)
+
+
+def _project(queryset, fields):
+    """Записи queryset словарями {ключ ответа: значение} без моделей."""
+    keys = list(fields)
+    for row in queryset.values_list(*fields.values()).iterator():
+        yield dict(zip(keys, row))
+
+
+def _with_comment_count(queryset):
+    return queryset.annotate(comment_count=Count('comments'))
+
+
+def encode_cursor(value, pk):
+    return urlsafe_b64encode(
+        json.dumps([value.isoformat(), pk]).encode()
+    ).decode()
+
+
+def decode_cursor(cursor):
+    """(дата, id) последней записи предыдущей страницы; ValueError."""
+    try:
+        payload = json.loads(urlsafe_b64decode(cursor.encode()))
+    except (TypeError, binascii.Error, UnicodeDecodeError) as error:
+        raise ValueError(cursor) from error
+    if not (
+        isinstance(payload, list) and len(payload) == 2
+        and isinstance(payload[0], str) and type(payload[1]) is int
+    ):
+        raise ValueError(cursor)
+    value, pk = payload
+    return datetime.fromisoformat(value), pk
+
+
+def _page_params(request):
+    """Размер страницы и курсор из запроса; ValueError при ошибке."""
+    limit = int(request.GET.get('limit', API_PAGE_SIZE))
+    if not 0 < limit <= API_MAX_PAGE_SIZE:
+        raise ValueError(limit)
+    cursor = request.GET.get('cursor')
+    return limit, decode_cursor(cursor) if cursor else None
+
+
+def _cursor_page(queryset, order_field, limit, after, descending):
+    """
+    Возвращает id записей страницы и курсор следующей.
+    Выбирается на одну запись больше, чтобы узнать, есть ли продолжение.
+    """
+    if descending:
+        ordering = (f'-{order_field}', '-id')
+        lookup = 'lt'
+    else:
+        ordering = (order_field, 'id')
+        lookup = 'gt'
+    if after:
+        value, pk = after
+        queryset = queryset.filter(
+            Q(**{f'{order_field}__{lookup}': value})
+            | Q(**{order_field: value, f'id__{lookup}': pk})
+        )
+    rows = list(
+        queryset.order_by(*ordering).values_list(order_field, 'id')[
+            :limit + 1
+        ]
+    )
+    next_cursor = (
+        encode_cursor(*rows[limit - 1]) if len(rows) > limit else None
+    )
+    return [pk for _, pk in rows[:limit]], ordering, next_cursor
+
+
+def _stream_page(request, items, next_cursor):
+    """Ответ {"results": [...], "next": url}, записи пишутся по одной."""
+    next_url = None
+    if next_cursor:
+        query = request.GET.copy()
+        query['cursor'] = next_cursor
+        next_url = request.build_absolute_uri(f'?{query.urlencode()}')
+
+    def chunks():
+        yield '{"results": ['
+        for number, item in enumerate(items):
+            yield (', ' if number else '') + _encoder.encode(item)
+        yield f'], "next": {_encoder.encode(next_url)}}}'
+
+    return StreamingHttpResponse(chunks(), content_type='application/json')
+
+
+def _post_list(request, queryset):
+    """
+    Страница публикаций. ETag строится из id и версий публикаций
+    страницы, поэтому 304 отдаётся после одного запроса id по индексу.
+    """
+    try:
+        limit, after = _page_params(request)
+    except ValueError:
+        return _error(HTTPStatus.BAD_REQUEST, 'Неверный limit или cursor.')
+    post_ids, ordering, next_cursor = _cursor_page(
+        queryset, 'pub_date', limit, after, descending=True
+    )
+    return conditional_response(
+        request,
+        ('api', post_ids, get_post_versions(post_ids),
+         get_generation(RELATED_SCOPE), next_cursor),
+        lambda: _stream_page(
+            request,
+            _project(
+                _with_comment_count(
+                    Post.objects.filter(id__in=post_ids)
+                ).order_by(*ordering),
+                POST_FIELDS
+            ),
+            next_cursor
+        )
+    )
+
+
+@require_GET
+def posts(request):
+    """Лента главной страницы."""
+    return _post_list(request, Post.objects.filter_posts_by_publication())
+
+
+@require_GET
+def category_posts(request, category_slug):
+    """Лента категории."""
+    category = Category.objects.filter(
+        slug=category_slug, is_published=True
+    ).values_list('id', flat=True).first()
+    if category is None:
+        return _error(HTTPStatus.NOT_FOUND, 'Категория не найдена.')
+    return _post_list(
+        request,
+        Post.objects.filter_posts_by_publication().filter(category=category)
+    )
+
+
+@require_GET
+def profile_posts(request, username):
+    """Публикации автора; сам автор видит и неопубликованные."""
+    author = User.objects.filter(username=username).values_list(
+        'id', flat=True
+    ).first()
+    if author is None:
+        return _error(HTTPStatus.NOT_FOUND, 'Пользователь не найден.')
+    return _post_list(
+        request, Post.objects.visible_to(request.user).filter(author=author)
+    )
+
+
+@require_GET
+def post_detail(request, post_id):
+    """Публикация с текстом и изображением."""
+    post = next(_project(
+        _with_comment_count(
+            Post.objects.visible_to(request.user).filter(id=post_id)
+        ),
+        POST_DETAIL_FIELDS
+    ), None)
+    if post is None:
+        return _error(HTTPStatus.NOT_FOUND, 'Публикация не найдена.')
+    if post['image']:
+        post['image'] = default_storage.url(post['image'])
+    return conditional_response(
+        request,
+        ('api', post_id, get_post_versions([post_id]),
+         get_generation(RELATED_SCOPE)),
+        lambda: JsonResponse(post)
+    )
+
+
+@require_GET
+def post_comments(request, post_id):
+    """
+    Комментарии к публикации в порядке добавления.
+    Любое изменение комментария меняет версию публикации, поэтому
+    она и id страницы служат валидатором.
+    """
+    if not Post.objects.visible_to(request.user).filter(id=post_id).exists():
+        return _error(HTTPStatus.NOT_FOUND, 'Публикация не найдена.')
+    try:
+        limit, after = _page_params(request)
+    except ValueError:
+        return _error(HTTPStatus.BAD_REQUEST, 'Неверный limit или cursor.')
+    comment_ids, ordering, next_cursor = _cursor_page(
+        Comment.objects.filter(post_id=post_id),
+        'created_at', limit, after, descending=False
+    )
+    return conditional_response(
+        request,
+        ('api-comments', post_id, get_post_versions([post_id]),
+         get_generation(RELATED_SCOPE), comment_ids, next_cursor),
+        lambda: _stream_page(
+            request,
+            _project(
+                Comment.objects.filter(id__in=comment_ids).order_by(
+                    *ordering
+                ),
+                COMMENT_FIELDS
+            ),
+            next_cursor
+        )
+    )
@@ -5,3 +5,10 @@ class BlogConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'blog'
     verbose_name = 'Блог'
+
+    def ready(self):
+        """
+        Подключает обработчики сигналов инвалидации кэша и регистрирует
+        задачи очереди (signals импортирует search и timeline).
+        """
+        from . import mail, signals  # noqa: F401
@@ -0,0 +1,239 @@
+from functools import wraps
+from http import HTTPStatus
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.handlers.asgi import ASGIRequest
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.shortcuts import aget_object_or_404, render
+from django.views import View
+
+from .caching import (INDEX_FEED, RELATED_SCOPE, aget_generation, aget_post,
+                      apaginate_comments, apaginate_feed, author_feed,
+                      body_cache_key, category_feed, version_to_datetime,
+                      viewer_variant)
+from .conditional import aconditional_response
+from .constants import POST_RELATED_FIELDS, POSTS_LIMIT_ON_PAGE
+from .counters import view_counter
+from .forms import CommentForm
+from .identity_map import get_identity_map
+from .live import comment_stream, latest_event_id
+from .models import Category, Follow, Post
+from .ranking import aget_trending
+from .templatetags.body_cache import body_storage_key
+
+User = get_user_model()
+
+# Асинхронные версии самых посещаемых страниц для работы под ASGI
+# (см. blogicum/asgi.py). Кэш читается асинхронно, промахи — асинхронным
+# ORM. Шаблоны те же, что у синхронных представлений в views.py, поэтому
+# всё, что шаблон может загрузить лениво, загружается заранее. То, что
+# остаётся синхронным, — рендеринг шаблона (с записью тела страницы
+# в кэш тегом cached_body) и журнал просмотров на диске, — выполняется
+# в пуле потоков, чтобы не останавливать цикл событий.
+
+arender = sync_to_async(render)
+
+
+def with_user(view):
+    """
+    Загружает пользователя до вызова представления: ленивый
+    request.user обратился бы к сессии и базе синхронно.
+    """
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        request.user = await request.auser()
+        return await view(request, *args, **kwargs)
+    return wrapper
+
+
+async def prefetch_body(body_key, page_obj=None):
+    """
+    Тело страницы из кэша для prefetched_bodies. Если тела нет,
+    публикации страницы загружаются заранее — их выведет шаблон.
+    """
+    body = await cache.aget(body_storage_key(body_key))
+    if body is None:
+        if page_obj is not None:
+            await page_obj.object_list.aload()
+        return {}
+    return {body_key: body}
+
+
+@with_user
+async def index(request):
+    """Главная страница."""
+    page_obj = await apaginate_feed(
+        request,
+        Post.objects.filter_posts_by_publication(),
+        INDEX_FEED,
+        request.GET.get('page')
+    )
+    trending = await aget_trending()
+
+    async def render_page():
+        return await arender(request, 'blog/index.html', {
+            'page_obj': page_obj,
+            'trending': trending['posts'],
+            'prefetched_bodies': await prefetch_body(
+                page_obj.body_key, page_obj
+            )
+        })
+
+    return await aconditional_response(
+        request, (page_obj.body_key, trending['computed_at']), render_page
+    )
+
+
+@with_user
+async def category_posts(request, category_slug):
+    """Страница категории."""
+    category = get_identity_map(request).add(await aget_object_or_404(
+        Category,
+        slug=category_slug,
+        is_published=True
+    ))
+    page_obj = await apaginate_feed(
+        request,
+        category.posts.filter_posts_by_publication(),
+        category_feed(category.pk),
+        request.GET.get('page')
+    )
+    trending = await aget_trending()
+
+    async def render_page():
+        return await arender(request, 'blog/category.html', {
+            'category': category,
+            'page_obj': page_obj,
+            'trending': trending['categories'].get(category.pk, []),
+            'prefetched_bodies': await prefetch_body(
+                page_obj.body_key, page_obj
+            )
+        })
+
+    return await aconditional_response(
+        request, (page_obj.body_key, trending['computed_at']), render_page
+    )
+
+
+@with_user
+async def post_detail(request, post_id):
+    """Страница публикации."""
+    post = await aget_post(post_id)
+    if post is None:
+        raise Http404
+    await get_identity_map(request).aattach([post], *POST_RELATED_FIELDS)
+    if not post.author == request.user and not post.is_available():
+        raise Http404
+    page_obj = await apaginate_comments(
+        request, post, request.GET.get('page')
+    )
+    version_parts = (
+        'post', post.id, post.updated_at,
+        await aget_generation(RELATED_SCOPE),
+        page_obj.number, page_obj.paginator.num_pages, page_obj.version
+    )
+    await sync_to_async(view_counter.hit)(post.id)
+
+    async def render_page():
+        body_key = body_cache_key(
+            *version_parts,
+            viewer_variant(
+                request.user,
+                {post.author_id, *(c.author_id for c in page_obj)}
+            )
+        )
+        return await arender(request, 'blog/detail.html', {
+            'post': post,
+            'page_obj': page_obj,
+            'form': CommentForm(),
+            'body_key': body_key,
+            'prefetched_bodies': await prefetch_body(body_key),
+            'views_count': post.views_count + view_counter.pending(post.id)
+        })
+
+    return await aconditional_response(
+        request,
+        version_parts,
+        render_page,
+        last_modified=max(
+            post.updated_at, version_to_datetime(page_obj.version)
+        )
+    )
+
+
+@with_user
+async def post_comments_stream(request, post_id):
+    """
+    Новые комментарии к публикации потоком Server-Sent Events.
+    Соединение долгое, поэтому отдаётся только под ASGI; под WSGI оно
+    заняло бы поток целиком, и ответ 204 велит браузеру не переподключаться.
+    """
+    if not isinstance(request, ASGIRequest):
+        return HttpResponse(status=HTTPStatus.NO_CONTENT)
+    post = await aget_post(post_id)
+    if post is None:
+        raise Http404
+    await get_identity_map(request).aattach([post], *POST_RELATED_FIELDS)
+    if not post.author == request.user and not post.is_available():
+        raise Http404
+    try:
+        since = int(request.headers['Last-Event-ID'])
+    except (KeyError, ValueError):
+        since = await latest_event_id()
+    response = StreamingHttpResponse(
+        comment_stream(request, post, since),
+        content_type='text/event-stream'
+    )
+    response.headers['Cache-Control'] = 'no-cache'
+    # Иначе nginx копит поток в буфере.
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+
+class ProfileView(View):
+    """Профиль пользователя."""
+
+    template_name = 'blog/profile.html'
+
+    async def get(self, request, username):
+        request.user = await request.auser()
+        author = get_identity_map(request).add(
+            await aget_object_or_404(User, username=username)
+        )
+        is_owner = request.user == author
+        posts = author.posts.all()
+        if not is_owner:
+            posts = posts.filter_posts_by_publication()
+        page_obj = await apaginate_feed(
+            request,
+            posts,
+            author_feed(author.pk),
+            request.GET.get('page'),
+            variant='all' if is_owner else 'published',
+            page_size=POSTS_LIMIT_ON_PAGE
+        )
+        is_following = request.user.is_authenticated and await (
+            Follow.objects.filter(user=request.user, author=author).aexists()
+        )
+
+        async def render_page():
+            return await arender(request, self.template_name, {
+                'profile': author,
+                'page_obj': page_obj,
+                'paginator': page_obj.paginator,
+                'is_paginated': page_obj.has_other_pages(),
+                'posts': page_obj.object_list,
+                'is_following': is_following,
+                'prefetched_bodies': await prefetch_body(
+                    page_obj.body_key, page_obj
+                )
+            })
+
+        return await aconditional_response(
+            request,
+            (page_obj.body_key, author.get_full_name(), author.date_joined,
+             author.is_staff, is_following),
+            render_page
+        )
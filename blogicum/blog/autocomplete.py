@@ -0,0 +1,165 @@
+import threading
+import time
+from bisect import bisect_left, insort
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+
+from .constants import (AUTOCOMPLETE_CHANGES_TIMEOUT, AUTOCOMPLETE_LIMIT,
+                        AUTOCOMPLETE_MAX_CHANGES)
+from .models import Category
+
+User = get_user_model()
+
+# Индексы хранятся в памяти процесса. Изменения пишутся в общий кэш
+# журналом с порядковыми номерами: процесс догоняет журнал при следующем
+# обращении, а если часть записей уже вытеснена — строит индекс заново.
+SEQUENCE_KEY = 'blog:autocomplete:seq'
+USERS = 'users'
+CATEGORIES = 'categories'
+
+
+def _change_key(number):
+    return f'blog:autocomplete:change:{number}'
+
+
+class PrefixIndex:
+    """Отсортированный список (ключ, значение) с поиском по префиксу."""
+
+    def __init__(self, entries=()):
+        self._entries = sorted(
+            (key.casefold(), value) for key, value in entries
+        )
+
+    def add(self, key, value):
+        entry = (key.casefold(), value)
+        index = bisect_left(self._entries, entry)
+        if self._entries[index:index + 1] != [entry]:
+            insort(self._entries, entry)
+
+    def remove(self, key, value):
+        entry = (key.casefold(), value)
+        index = bisect_left(self._entries, entry)
+        if self._entries[index:index + 1] == [entry]:
+            del self._entries[index]
+
+    def search(self, prefix, limit, predicate=None):
+        """Значения с ключом на prefix, в порядке ключей."""
+        prefix = prefix.casefold()
+        found = []
+        index = bisect_left(self._entries, (prefix,))
+        while index < len(self._entries) and len(found) < limit:
+            key, value = self._entries[index]
+            if not key.startswith(prefix):
+                break
+            if predicate is None or predicate(value):
+                found.append(value)
+            index += 1
+        return found
+
+
+def _load_users():
+    return PrefixIndex(
+        (username, username)
+        for username in User.objects.values_list('username', flat=True)
+    )
+
+
+def _load_categories():
+    return PrefixIndex(
+        (title, (title, slug, is_published))
+        for title, slug, is_published in Category.objects.values_list(
+            'title', 'slug', 'is_published'
+        )
+    )
+
+
+class Autocomplete:
+    """Индексы имён пользователей и названий категорий процесса."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._indexes = None
+        self._sequence = None
+
+    def _reload(self, sequence):
+        self._indexes = {
+            USERS: _load_users(),
+            CATEGORIES: _load_categories(),
+        }
+        self._sequence = sequence
+
+    def _sync(self):
+        """Догоняет журнал изменений или перестраивает индексы."""
+        sequence = cache.get_or_set(SEQUENCE_KEY, time.time_ns, None)
+        if sequence == self._sequence:
+            return
+        behind = sequence - (self._sequence or 0)
+        if self._indexes is None or not 0 < behind <= AUTOCOMPLETE_MAX_CHANGES:
+            self._reload(sequence)
+            return
+        keys = [
+            _change_key(number)
+            for number in range(self._sequence + 1, sequence + 1)
+        ]
+        changes = cache.get_many(keys)
+        if len(changes) != len(keys):
+            self._reload(sequence)
+            return
+        for key in keys:
+            kind, removed, added = changes[key]
+            if removed:
+                self._indexes[kind].remove(*removed)
+            if added:
+                self._indexes[kind].add(*added)
+        self._sequence = sequence
+
+    def search(self, kind, prefix, limit, predicate=None):
+        with self._lock:
+            self._sync()
+            return self._indexes[kind].search(prefix, limit, predicate)
+
+
+autocomplete = Autocomplete()
+
+
+def record_change(kind, removed=None, added=None):
+    """
+    Записывает изменение в журнал: removed и added — пары
+    (ключ, значение) или None.
+    """
+    try:
+        number = cache.incr(SEQUENCE_KEY)
+    except ValueError:
+        # Счётчик вытеснен: новое значение заставит все процессы
+        # перестроить индексы.
+        cache.set(SEQUENCE_KEY, time.time_ns(), None)
+        return
+    cache.set(
+        _change_key(number), (kind, removed, added),
+        AUTOCOMPLETE_CHANGES_TIMEOUT
+    )
+
+
+def user_entry(user):
+    return (user.username, user.username)
+
+
+def category_entry(category):
+    return (
+        category.title,
+        (category.title, category.slug, category.is_published)
+    )
+
+
+def suggest_usernames(prefix, limit=AUTOCOMPLETE_LIMIT):
+    return autocomplete.search(USERS, prefix, limit)
+
+
+def suggest_categories(prefix, limit=AUTOCOMPLETE_LIMIT,
+                       published_only=True):
+    """Категории (заголовок, slug, опубликована) по началу заголовка."""
+    return autocomplete.search(
+        CATEGORIES, prefix, limit,
+        (lambda value: value[2]) if published_only else None
+    )
@@ -0,0 +1,420 @@
+import os
+import pickle
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+# Локальные уровни общие для всех потоков процесса (как у LocMemCache).
+_tiers = {}
+_tiers_lock = threading.Lock()
+
+_MISSING = object()
+
+# Сколько секунд ждать недописанную запись журнала изменений, прежде чем
+# считать её потерянной.
+LOG_GRACE = 1
+
+# Суффикс короткоживущих блокировок пересчёта (caching.get_or_compute).
+# Блокировки живут только в общем кэше: их захват и снятие не пишутся
+# в журнал изменений и не стоят лишних обращений к общему кэшу.
+LOCK_SUFFIX = ':lock'
+
+
+def is_lock(key):
+    return key.endswith(LOCK_SUFFIX)
+
+
+class LocalTier:
+    """
+    Ограниченный LRU-кэш процесса с TTL и вытеснением по размеру.
+    Записи других процессов приходят из общего журнала изменений
+    (см. TwoTierCache) и сбрасывают локальные копии только своих ключей.
+    """
+
+    def __init__(self, max_entries, max_size):
+        self.max_entries = max_entries
+        self.max_size = max_size
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()  # ключ -> (истекает, данные)
+        self.size = 0
+        self._token = uuid.uuid4().hex
+        self.applied = None  # последний применённый номер журнала
+        self.missing_since = None
+        self.synced_at = 0.0
+        self.stats = dict.fromkeys(
+            ('hits', 'misses', 'shared_hits', 'shared_misses',
+             'evictions', 'expirations', 'invalidations', 'resets'),
+            0
+        )
+
+    @property
+    def token(self):
+        """
+        Метка процесса в журнале: свои записи уже учтены локально.
+        PID отличает процессы, унаследовавшие уровень через fork.
+        """
+        return f'{self._token}:{os.getpid()}'
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.stats['misses'] += 1
+                return _MISSING
+            expires_at, data = entry
+            if expires_at <= time.monotonic():
+                self._pop(key)
+                self.stats['expirations'] += 1
+                self.stats['misses'] += 1
+                return _MISSING
+            self.entries.move_to_end(key)
+            self.stats['hits'] += 1
+        return pickle.loads(data)
+
+    def set(self, key, value, timeout):
+        data = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        if len(data) > self.max_size:
+            self.delete(key)
+            return
+        with self.lock:
+            self._pop(key)
+            self.entries[key] = (time.monotonic() + timeout, data)
+            self.size += len(data)
+            while (len(self.entries) > self.max_entries
+                   or self.size > self.max_size):
+                self._pop(next(iter(self.entries)))
+                self.stats['evictions'] += 1
+
+    def delete(self, key):
+        with self.lock:
+            self._pop(key)
+
+    def clear(self):
+        with self.lock:
+            self.reset(None)
+
+    def reset(self, applied):
+        """Сбрасывает все локальные копии (под lock)."""
+        self.entries.clear()
+        self.size = 0
+        self.applied = applied
+        self.missing_since = None
+        self.stats['resets'] += 1
+
+    def invalidate(self, keys):
+        """Сбрасывает локальные копии ключей (под lock)."""
+        for key in keys:
+            if key in self.entries:
+                self._pop(key)
+                self.stats['invalidations'] += 1
+
+    def _pop(self, key):
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.size -= len(entry[1])
+
+
+class TwoTierCache(BaseCache):
+    """
+    Двухуровневый кэш: LRU в памяти процесса перед общим бэкендом.
+    LOCATION — алиас общего кэша из settings.CACHES. Все записи идут
+    в общий кэш, а их ключи — одной записью в общий журнал изменений
+    (номер из счётчика incr и запись с ключами), сколько бы ключей ни
+    менялось. Раз в SYNC_INTERVAL секунд процесс читает новые записи
+    журнала и сбрасывает копии только изменённых ключей, так что воркеры
+    расходятся не дольше этого срока. Если записи журнала потеряны или
+    отставание больше LOG_MAX_GAP, локальный уровень сбрасывается целиком.
+    """
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        self._shared_alias = location
+        self._local_timeout = options.get('LOCAL_TIMEOUT', 30)
+        self._sync_interval = options.get('SYNC_INTERVAL', 1)
+        self._log_timeout = options.get('LOG_TIMEOUT', 300)
+        self._log_max_gap = options.get('LOG_MAX_GAP', 1000)
+        with _tiers_lock:
+            self._tier = _tiers.setdefault(location, LocalTier(
+                max_entries=options.get('LOCAL_MAX_ENTRIES', 1000),
+                max_size=options.get('LOCAL_MAX_SIZE', 16 * 1024 * 1024),
+            ))
+
+    @property
+    def _shared(self):
+        return caches[self._shared_alias]
+
+    def _sequence_key(self):
+        return f'two-tier:{self.key_prefix}:log'
+
+    def _log_key(self, number):
+        return f'two-tier:{self.key_prefix}:log:{number}'
+
+    def _due(self):
+        """Пора ли читать журнал (не чаще SYNC_INTERVAL)."""
+        tier = self._tier
+        now = time.monotonic()
+        if now - tier.synced_at < self._sync_interval:
+            return False
+        tier.synced_at = now
+        return True
+
+    def _unapplied(self, current):
+        """
+        Номера записей журнала, которые процесс ещё не применил.
+        При первом обращении, после очистки общего кэша и при слишком
+        большом отставании локальный уровень сбрасывается целиком.
+        """
+        tier = self._tier
+        current = current or 0
+        with tier.lock:
+            applied = tier.applied
+            if (applied is None or current < applied
+                    or current - applied > self._log_max_gap):
+                tier.reset(current)
+                return range(0)
+        return range(applied + 1, current + 1)
+
+    def _apply(self, numbers, entries):
+        """Сбрасывает копии ключей из записей журнала других процессов."""
+        tier = self._tier
+        with tier.lock:
+            applied = tier.applied
+            for number in numbers:
+                entry = entries.get(self._log_key(number))
+                if entry is None:
+                    # Запись между incr и set ещё не дописана — подождём
+                    # LOG_GRACE; дольше — она вытеснена, копии не сверить.
+                    now = time.monotonic()
+                    if tier.missing_since is None:
+                        tier.missing_since = now
+                    if now - tier.missing_since >= LOG_GRACE:
+                        tier.reset(numbers[-1])
+                        return
+                    break
+                token, keys = entry
+                if token != tier.token:
+                    tier.invalidate(keys)
+                applied = number
+            else:
+                tier.missing_since = None
+            if tier.applied is not None:
+                tier.applied = max(tier.applied, applied)
+
+    def _sync(self):
+        if not self._due():
+            return
+        numbers = self._unapplied(self._shared.get(self._sequence_key()))
+        if numbers:
+            self._apply(numbers, self._shared.get_many(
+                [self._log_key(number) for number in numbers]
+            ))
+
+    async def _async_sync(self):
+        """Асинхронный _sync: журнал читается без занятия потока."""
+        if not self._due():
+            return
+        numbers = self._unapplied(
+            await self._shared.aget(self._sequence_key())
+        )
+        if numbers:
+            self._apply(numbers, await self._shared.aget_many(
+                [self._log_key(number) for number in numbers]
+            ))
+
+    def _publish(self, local_keys):
+        """
+        Записывает изменённые ключи в журнал: два обращения к общему
+        кэшу на операцию, сколько бы ключей она ни меняла.
+        """
+        local_keys = list(local_keys)
+        if not local_keys:
+            return
+        key = self._sequence_key()
+        try:
+            number = self._shared.incr(key)
+        except ValueError:
+            self._shared.add(key, 0, None)
+            number = self._shared.incr(key)
+        self._shared.set(
+            self._log_key(number),
+            (self._tier.token, local_keys),
+            self._log_timeout
+        )
+
+    def _local_ttl(self, timeout):
+        if timeout is DEFAULT_TIMEOUT or timeout is None:
+            return self._local_timeout
+        return min(timeout, self._local_timeout)
+
+    def _store(self, local_key, value, timeout=DEFAULT_TIMEOUT):
+        if is_lock(local_key):
+            # Блокировки читаются только из общего кэша: их снятие
+            # не видно локальному уровню других воркеров.
+            return
+        ttl = self._local_ttl(timeout)
+        if ttl > 0:
+            self._tier.set(local_key, value, ttl)
+        else:
+            self._tier.delete(local_key)
+
+    def get_stats(self):
+        """Счётчики попаданий, промахов и вытеснений локального уровня."""
+        tier = self._tier
+        with tier.lock:
+            return {
+                **tier.stats,
+                'entries': len(tier.entries),
+                'size': tier.size,
+            }
+
+    def get(self, key, default=None, version=None):
+        local_key = self.make_and_validate_key(key, version)
+        self._sync()
+        value = self._tier.get(local_key)
+        if value is not _MISSING:
+            return value
+        value = self._shared.get(key, _MISSING, version)
+        if value is _MISSING:
+            self._tier.stats['shared_misses'] += 1
+            return default
+        self._tier.stats['shared_hits'] += 1
+        self._store(local_key, value)
+        return value
+
+    def get_many(self, keys, version=None):
+        self._sync()
+        found = {}
+        missing = {}
+        for key in keys:
+            local_key = self.make_and_validate_key(key, version)
+            value = self._tier.get(local_key)
+            if value is _MISSING:
+                missing[key] = local_key
+            else:
+                found[key] = value
+        if missing:
+            fetched = self._shared.get_many(missing, version)
+            self._tier.stats['shared_hits'] += len(fetched)
+            self._tier.stats['shared_misses'] += len(missing) - len(fetched)
+            for key, value in fetched.items():
+                self._store(missing[key], value)
+            found.update(fetched)
+        return found
+
+    # Асинхронное чтение отвечает из локального уровня прямо в цикле
+    # событий; в общий кэш идут только промахи. Запись остаётся
+    # синхронной (BaseCache выполняет её в пуле потоков): она бывает
+    # только при пересчёте и сбросе записей.
+
+    async def aget(self, key, default=None, version=None):
+        local_key = self.make_and_validate_key(key, version)
+        await self._async_sync()
+        value = self._tier.get(local_key)
+        if value is not _MISSING:
+            return value
+        value = await self._shared.aget(key, _MISSING, version)
+        if value is _MISSING:
+            self._tier.stats['shared_misses'] += 1
+            return default
+        self._tier.stats['shared_hits'] += 1
+        self._store(local_key, value)
+        return value
+
+    async def aget_many(self, keys, version=None):
+        await self._async_sync()
+        found = {}
+        missing = {}
+        for key in keys:
+            local_key = self.make_and_validate_key(key, version)
+            value = self._tier.get(local_key)
+            if value is _MISSING:
+                missing[key] = local_key
+            else:
+                found[key] = value
+        if missing:
+            fetched = await self._shared.aget_many(missing, version)
+            self._tier.stats['shared_hits'] += len(fetched)
+            self._tier.stats['shared_misses'] += len(missing) - len(fetched)
+            for key, value in fetched.items():
+                self._store(missing[key], value)
+            found.update(fetched)
+        return found
+
+    # Записи тоже сверяются с журналом: первая сверка сбрасывает
+    # локальный уровень, и сохранённая до неё копия пропала бы.
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        local_key = self.make_and_validate_key(key, version)
+        self._sync()
+        self._shared.set(key, value, timeout, version)
+        self._publish([local_key])
+        self._store(local_key, value, timeout)
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        self._sync()
+        failed = self._shared.set_many(data, timeout, version)
+        local_keys = {
+            key: self.make_and_validate_key(key, version) for key in data
+        }
+        self._publish(local_keys.values())
+        for key, value in data.items():
+            if key not in failed:
+                self._store(local_keys[key], value, timeout)
+        return failed
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        if is_lock(key):
+            return self._shared.add(key, value, timeout, version)
+        local_key = self.make_and_validate_key(key, version)
+        self._sync()
+        added = self._shared.add(key, value, timeout, version)
+        if added:
+            self._publish([local_key])
+            self._store(local_key, value, timeout)
+        return added
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        local_key = self.make_and_validate_key(key, version)
+        self._tier.delete(local_key)
+        return self._shared.touch(key, timeout, version)
+
+    def delete(self, key, version=None):
+        if is_lock(key):
+            return self._shared.delete(key, version)
+        local_key = self.make_and_validate_key(key, version)
+        deleted = self._shared.delete(key, version)
+        self._publish([local_key])
+        self._tier.delete(local_key)
+        return deleted
+
+    def delete_many(self, keys, version=None):
+        keys = list(keys)
+        if not keys:
+            return
+        self._shared.delete_many(keys, version)
+        local_keys = [
+            self.make_and_validate_key(key, version)
+            for key in keys if not is_lock(key)
+        ]
+        self._publish(local_keys)
+        for local_key in local_keys:
+            self._tier.delete(local_key)
+
+    def has_key(self, key, version=None):
+        return self.get(key, _MISSING, version) is not _MISSING
+
+    def incr(self, key, delta=1, version=None):
+        local_key = self.make_and_validate_key(key, version)
+        value = self._shared.incr(key, delta, version)
+        self._publish([local_key])
+        self._tier.delete(local_key)
+        return value
+
+    def clear(self):
+        self._shared.clear()
+        self._tier.clear()
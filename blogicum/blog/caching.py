@@ -0,0 +1,611 @@
+import asyncio
+import hashlib
+import time
+from collections.abc import Sequence
+from datetime import datetime, timezone
+
+from django.core.cache import cache
+from django.core.paginator import Paginator
+
+from .cache_backends import LOCK_SUFFIX
+from .constants import (COMMENT_PAGE_CACHE_TIMEOUT,
+                        COMMENT_PAGE_SOFT_TIMEOUT,
+                        COMMENTS_LIMIT_ON_PAGE,
+                        FEED_IDS_CACHE_TIMEOUT,
+                        FEED_IDS_SOFT_TIMEOUT,
+                        POST_CACHE_TIMEOUT,
+                        POST_RELATED_FIELDS,
+                        POST_SOFT_TIMEOUT,
+                        POSTS_LIMIT_ON_PAGE,
+                        RECOMPUTE_LOCK_TIMEOUT,
+                        RECOMPUTE_POLL_INTERVAL,
+                        RECOMPUTE_WAIT_TIMEOUT)
+from .identity_map import get_identity_map
+from .models import Post
+
+# Ленты кэшируются как упорядоченные списки id публикаций.
+# Версия ленты (поколение) меняется, только когда меняется её состав
+# или порядок; правка текста поста сбрасывает лишь кэш самого поста.
+INDEX_FEED = 'index'
+
+# Поколение связанных объектов: меняется, когда меняется то, что выводится
+# в карточке поста помимо самой публикации (имя автора, категория, место).
+RELATED_SCOPE = 'related'
+
+
+def category_feed(category_id):
+    """Область ленты категории."""
+    return f'category:{category_id}'
+
+
+def author_feed(author_id):
+    """Область ленты профиля автора."""
+    return f'author:{author_id}'
+
+
+def _generation_key(scope):
+    return f'blog:gen:{scope}'
+
+
+def post_cache_key(post_id):
+    """Ключ кэша для отдельной публикации."""
+    return f'blog:post:{post_id}'
+
+
+def get_generation(scope):
+    """
+    Возвращает текущее поколение ленты.
+    Начальное значение берётся из часов, чтобы после вытеснения ключа
+    поколение не совпало со старыми записями в кэше.
+    """
+    return cache.get_or_set(_generation_key(scope), time.time_ns, None)
+
+
+async def aget_generation(scope):
+    """Асинхронный get_generation."""
+    return await cache.aget_or_set(_generation_key(scope), time.time_ns, None)
+
+
+def bump_generation(*scopes):
+    """Инвалидирует ленты, переводя их на новое поколение."""
+    for scope in scopes:
+        try:
+            cache.incr(_generation_key(scope))
+        except ValueError:
+            cache.set(_generation_key(scope), time.time_ns(), None)
+
+
+def _post_version_key(post_id):
+    return f'blog:post-version:{post_id}'
+
+
+def _comment_page_version_key(post_id, page_number):
+    return f'blog:comments-version:{post_id}:{page_number}'
+
+
+def comment_page_cache_key(post_id, page_number):
+    """Ключ кэша для страницы комментариев к публикации."""
+    return f'blog:comments:{post_id}:{page_number}'
+
+
+def _bump_versions(keys):
+    cache.set_many(dict.fromkeys(keys, time.time_ns()), None)
+
+
+def _get_versions(keys):
+    """
+    Возвращает версии одним get_many.
+    Потерянная версия выдаётся заново, а не считается нулевой, иначе
+    ключ тела страницы мог бы совпасть с ключом устаревшей копии.
+    """
+    versions = cache.get_many(keys)
+    missing = {
+        key: time.time_ns() for key in keys if key not in versions
+    }
+    if missing:
+        cache.set_many(missing, None)
+        versions.update(missing)
+    return [versions[key] for key in keys]
+
+
+async def _aget_versions(keys):
+    """Асинхронный _get_versions."""
+    versions = await cache.aget_many(keys)
+    missing = {
+        key: time.time_ns() for key in keys if key not in versions
+    }
+    if missing:
+        await cache.aset_many(missing, None)
+        versions.update(missing)
+    return [versions[key] for key in keys]
+
+
+def invalidate_posts(post_ids):
+    """Удаляет публикации из кэша объектов и меняет их версии."""
+    post_ids = list(post_ids)
+    cache.delete_many([post_cache_key(post_id) for post_id in post_ids])
+    _bump_versions([_post_version_key(post_id) for post_id in post_ids])
+
+
+def get_post_versions(post_ids):
+    """Версии публикаций (меняются и при изменении комментариев)."""
+    return _get_versions([_post_version_key(post_id) for post_id in post_ids])
+
+
+async def aget_post_versions(post_ids):
+    return await _aget_versions(
+        [_post_version_key(post_id) for post_id in post_ids]
+    )
+
+
+def invalidate_comment_pages(post_id, page_numbers):
+    """
+    Меняет версии страниц комментариев публикации.
+    Комментарии упорядочены по времени и только дописываются в конец,
+    поэтому остальные страницы остаются в кэше.
+    """
+    _bump_versions([
+        _comment_page_version_key(post_id, number) for number in page_numbers
+    ])
+
+
+def version_to_datetime(version):
+    """Момент выдачи версии (версии — отметки time.time_ns())."""
+    return datetime.fromtimestamp(version / 1e9, timezone.utc)
+
+
+def viewer_variant(user, owner_ids):
+    """
+    Вариант тела страницы для пользователя.
+    Страница различается только для владельцев её частей (автора поста
+    или комментариев на ней); остальные делят один вариант на всех.
+    """
+    if not user.is_authenticated:
+        return 'anonymous'
+    if user.pk in owner_ids:
+        return f'user:{user.pk}'
+    return 'reader'
+
+
+def body_cache_key(*parts):
+    """Ключ тела страницы из версий всего, что в нём выводится."""
+    return hashlib.md5(repr(parts).encode()).hexdigest()
+
+
+def _acquire(key):
+    """Захватывает право пересчитать запись; удаётся одному воркеру."""
+    return cache.add(f'{key}{LOCK_SUFFIX}', 1, RECOMPUTE_LOCK_TIMEOUT)
+
+
+def _waiting(keys, entries):
+    """
+    Ключи, которые ещё стоит ждать: записи нет, а блокировка держится.
+    Если блокировку сняли без записи (compute не вернул значение,
+    например для удалённой публикации), ждать нечего.
+    """
+    return [
+        key for key in keys
+        if key not in entries and f'{key}{LOCK_SUFFIX}' in entries
+    ]
+
+
+def _wait_for(keys):
+    """
+    Ждёт, пока записи посчитает захвативший блокировку воркер.
+    Возвращает найденные записи и ключи, которые придётся считать самим.
+    """
+    found = {}
+    waiting = keys
+    deadline = time.monotonic() + RECOMPUTE_WAIT_TIMEOUT
+    while waiting and time.monotonic() < deadline:
+        time.sleep(RECOMPUTE_POLL_INTERVAL)
+        entries = cache.get_many(
+            [*waiting, *(f'{key}{LOCK_SUFFIX}' for key in waiting)]
+        )
+        found.update({key: entries[key] for key in waiting if key in entries})
+        waiting = _waiting(waiting, entries)
+    return found, [key for key in keys if key not in found]
+
+
+def get_many_or_compute(
+        keys,
+        compute,
+        soft_timeout,
+        hard_timeout,
+        version=None
+):
+    """
+    Читает записи с защитой от лавины пересчётов (stale-while-revalidate).
+    keys — словарь {ключ кэша: идентификатор}; compute(идентификаторы)
+    возвращает словарь {идентификатор: значение}, отсутствующие не
+    кэшируются. Запись устаревает по мягкому сроку или при смене version;
+    устаревшую пересчитывает тот, кто захватил блокировку, остальные
+    отдают устаревшее значение. Отсутствующую запись остальные ждут не
+    дольше RECOMPUTE_WAIT_TIMEOUT, после чего считают сами.
+    """
+    now = time.time()
+    result = {}
+    to_compute = []
+    to_wait = []
+    entries = cache.get_many(keys)
+    for key, ident in keys.items():
+        entry = entries.get(key)
+        if entry is None:
+            (to_compute if _acquire(key) else to_wait).append(key)
+            continue
+        entry_version, fresh_until, value = entry
+        result[ident] = value
+        if (entry_version != version or fresh_until <= now) and _acquire(key):
+            to_compute.append(key)
+    if to_wait:
+        found, missing = _wait_for(to_wait)
+        for key, (_, _, value) in found.items():
+            result[keys[key]] = value
+        to_compute.extend(missing)
+    if not to_compute:
+        return result
+    try:
+        computed = compute([keys[key] for key in to_compute])
+        fresh_until = time.time() + soft_timeout
+        cache.set_many(
+            {
+                key: (version, fresh_until, computed[keys[key]])
+                for key in to_compute if keys[key] in computed
+            },
+            hard_timeout
+        )
+    finally:
+        cache.delete_many([f'{key}{LOCK_SUFFIX}' for key in to_compute])
+    for key in to_compute:
+        result.pop(keys[key], None)
+    result.update(computed)
+    return result
+
+
+async def _await_for(keys):
+    """Асинхронный _wait_for: ожидание не занимает поток."""
+    found = {}
+    waiting = keys
+    deadline = time.monotonic() + RECOMPUTE_WAIT_TIMEOUT
+    while waiting and time.monotonic() < deadline:
+        await asyncio.sleep(RECOMPUTE_POLL_INTERVAL)
+        entries = await cache.aget_many(
+            [*waiting, *(f'{key}{LOCK_SUFFIX}' for key in waiting)]
+        )
+        found.update({key: entries[key] for key in waiting if key in entries})
+        waiting = _waiting(waiting, entries)
+    return found, [key for key in keys if key not in found]
+
+
+async def aget_many_or_compute(
+        keys,
+        compute,
+        soft_timeout,
+        hard_timeout,
+        version=None
+):
+    """
+    Асинхронный get_many_or_compute; compute — корутина.
+    При попадании в кэш ни поток, ни соединение с базой не занимаются.
+    """
+    now = time.time()
+    result = {}
+    to_compute = []
+    to_wait = []
+    entries = await cache.aget_many(keys)
+    for key, ident in keys.items():
+        entry = entries.get(key)
+        if entry is None:
+            acquired = await cache.aadd(
+                f'{key}{LOCK_SUFFIX}', 1, RECOMPUTE_LOCK_TIMEOUT
+            )
+            (to_compute if acquired else to_wait).append(key)
+            continue
+        entry_version, fresh_until, value = entry
+        result[ident] = value
+        if (entry_version != version or fresh_until <= now) and (
+            await cache.aadd(f'{key}{LOCK_SUFFIX}', 1, RECOMPUTE_LOCK_TIMEOUT)
+        ):
+            to_compute.append(key)
+    if to_wait:
+        found, missing = await _await_for(to_wait)
+        for key, (_, _, value) in found.items():
+            result[keys[key]] = value
+        to_compute.extend(missing)
+    if not to_compute:
+        return result
+    try:
+        computed = await compute([keys[key] for key in to_compute])
+        fresh_until = time.time() + soft_timeout
+        await cache.aset_many(
+            {
+                key: (version, fresh_until, computed[keys[key]])
+                for key in to_compute if keys[key] in computed
+            },
+            hard_timeout
+        )
+    finally:
+        await cache.adelete_many([f'{key}{LOCK_SUFFIX}' for key in to_compute])
+    for key in to_compute:
+        result.pop(keys[key], None)
+    result.update(computed)
+    return result
+
+
+def store_computed(key, value, soft_timeout, hard_timeout, version=None):
+    """
+    Кладёт заранее посчитанное значение в формате get_or_compute,
+    например из периодической задачи.
+    """
+    cache.set(
+        key, (version, time.time() + soft_timeout, value), hard_timeout
+    )
+
+
+def get_or_compute(key, compute, soft_timeout, hard_timeout, version=None):
+    """Вариант get_many_or_compute для одной записи."""
+    return get_many_or_compute(
+        {key: key},
+        lambda idents: {key: compute()},
+        soft_timeout,
+        hard_timeout,
+        version
+    )[key]
+
+
+async def aget_or_compute(key, compute, soft_timeout, hard_timeout,
+                          version=None):
+    """Асинхронный get_or_compute; compute — корутина."""
+
+    async def compute_one(idents):
+        return {key: await compute()}
+
+    return (await aget_many_or_compute(
+        {key: key}, compute_one, soft_timeout, hard_timeout, version
+    ))[key]
+
+
+def _fetch_posts(post_ids):
+    return {
+        post.id: post
+        for post in Post.objects.filter(id__in=post_ids).with_comments_count()
+    }
+
+
+def get_posts(post_ids):
+    """
+    Возвращает публикации в порядке post_ids.
+    Найденные в кэше берутся одним get_many, остальные — одним запросом
+    id__in, после чего складываются в кэш.
+    """
+    posts = get_many_or_compute(
+        {post_cache_key(post_id): post_id for post_id in post_ids},
+        _fetch_posts,
+        POST_SOFT_TIMEOUT,
+        POST_CACHE_TIMEOUT
+    )
+    return [posts[post_id] for post_id in post_ids if post_id in posts]
+
+
+async def _afetch_posts(post_ids):
+    return {
+        post.id: post
+        async for post in Post.objects.filter(
+            id__in=post_ids
+        ).with_comments_count()
+    }
+
+
+async def aget_posts(post_ids):
+    """Асинхронный get_posts: промахи читаются асинхронным ORM."""
+    posts = await aget_many_or_compute(
+        {post_cache_key(post_id): post_id for post_id in post_ids},
+        _afetch_posts,
+        POST_SOFT_TIMEOUT,
+        POST_CACHE_TIMEOUT
+    )
+    return [posts[post_id] for post_id in post_ids if post_id in posts]
+
+
+async def aget_post(post_id):
+    posts = await aget_posts([post_id])
+    return posts[0] if posts else None
+
+
+def get_post(post_id):
+    """Возвращает публикацию из кэша объектов или None."""
+    posts = get_posts([post_id])
+    return posts[0] if posts else None
+
+
+class LazyPostList(Sequence):
+    """
+    Публикации страницы, которые загружаются при первом обращении.
+    Если тело страницы взято из кэша, публикации не загружаются вовсе.
+    """
+
+    def __init__(self, post_ids, hydrate, ahydrate=None):
+        self.post_ids = post_ids
+        self._hydrate = hydrate
+        self._ahydrate = ahydrate
+        self._posts = None
+
+    def _load(self):
+        if self._posts is None:
+            self._posts = self._hydrate(self.post_ids)
+        return self._posts
+
+    async def aload(self):
+        """Загружает публикации заранее — для асинхронных представлений."""
+        if self._posts is None:
+            self._posts = await self._ahydrate(self.post_ids)
+        return self._posts
+
+    def __len__(self):
+        return len(self.post_ids)
+
+    def __getitem__(self, index):
+        return self._load()[index]
+
+    def __iter__(self):
+        return iter(self._load())
+
+
+def paginate_comments(request, post, page_number):
+    """
+    Создаёт страницу комментариев без запросов к базе при попадании в кэш.
+    Количество берётся из аннотации закэшированной публикации,
+    комментарии страницы — из кэша с версией этой страницы.
+    """
+    paginator = Paginator(
+        post.comments.order_by('created_at', 'id'), COMMENTS_LIMIT_ON_PAGE
+    )
+    paginator.count = post.comment_count
+    page = paginator.get_page(page_number)
+    page.version = _get_versions(
+        [_comment_page_version_key(post.id, page.number)]
+    )[0]
+    comments = get_or_compute(
+        comment_page_cache_key(post.id, page.number),
+        lambda: list(page.object_list),
+        COMMENT_PAGE_SOFT_TIMEOUT,
+        COMMENT_PAGE_CACHE_TIMEOUT,
+        page.version
+    )
+    page.object_list = get_identity_map(request).attach(comments, 'author')
+    return page
+
+
+async def apaginate_comments(request, post, page_number):
+    """Асинхронный paginate_comments."""
+    paginator = Paginator(
+        post.comments.order_by('created_at', 'id'), COMMENTS_LIMIT_ON_PAGE
+    )
+    paginator.count = post.comment_count
+    page = paginator.get_page(page_number)
+    page.version = (await _aget_versions(
+        [_comment_page_version_key(post.id, page.number)]
+    ))[0]
+
+    async def fetch_comments():
+        return [comment async for comment in page.object_list]
+
+    comments = await aget_or_compute(
+        comment_page_cache_key(post.id, page.number),
+        fetch_comments,
+        COMMENT_PAGE_SOFT_TIMEOUT,
+        COMMENT_PAGE_CACHE_TIMEOUT,
+        page.version
+    )
+    page.object_list = await get_identity_map(request).aattach(
+        comments, 'author'
+    )
+    return page
+
+
+def paginate_feed(
+        request,
+        posts,
+        scope,
+        page_number,
+        variant='',
+        page_size=POSTS_LIMIT_ON_PAGE
+):
+    """
+    Создаёт страницу ленты с кэшированием количества и id публикаций.
+    posts — упорядоченный QuerySet ленты без аннотаций; variant различает
+    разные выборки в пределах одной области (например, черновики автора).
+    Смена поколения ленты делает записи устаревшими, а не удаляет их.
+    Публикации загружаются лениво, а page.body_key позволяет закэшировать
+    тело страницы без их загрузки.
+    """
+    prefix = f'blog:feed:{scope}:{variant}'
+    generation = get_generation(scope)
+    paginator = Paginator(posts, page_size)
+    # Paginator.count — cached_property, подставляем значение из кэша.
+    paginator.count = get_or_compute(
+        f'{prefix}:count',
+        posts.count,
+        FEED_IDS_SOFT_TIMEOUT,
+        FEED_IDS_CACHE_TIMEOUT,
+        generation
+    )
+    page = paginator.get_page(page_number)
+    post_ids = get_or_compute(
+        f'{prefix}:page:{page.number}',
+        lambda: list(page.object_list.values_list('id', flat=True)),
+        FEED_IDS_SOFT_TIMEOUT,
+        FEED_IDS_CACHE_TIMEOUT,
+        generation
+    )
+    page.object_list = LazyPostList(
+        post_ids,
+        lambda ids: get_identity_map(request).attach(
+            get_posts(ids), *POST_RELATED_FIELDS
+        )
+    )
+    page.body_key = body_cache_key(
+        'feed', scope, variant, generation, get_generation(RELATED_SCOPE),
+        page.number, paginator.num_pages,
+        list(zip(post_ids, get_post_versions(post_ids)))
+    )
+    return page
+
+
+async def apaginate_feed(
+        request,
+        posts,
+        scope,
+        page_number,
+        variant='',
+        page_size=POSTS_LIMIT_ON_PAGE
+):
+    """
+    Асинхронный paginate_feed. Публикации не загружаются: если тела
+    страницы нет в кэше, представление вызывает page.object_list.aload().
+    """
+    prefix = f'blog:feed:{scope}:{variant}'
+    generation = await aget_generation(scope)
+    paginator = Paginator(posts, page_size)
+    paginator.count = await aget_or_compute(
+        f'{prefix}:count',
+        posts.acount,
+        FEED_IDS_SOFT_TIMEOUT,
+        FEED_IDS_CACHE_TIMEOUT,
+        generation
+    )
+    page = paginator.get_page(page_number)
+
+    async def fetch_ids():
+        return [
+            post_id async for post_id
+            in page.object_list.values_list('id', flat=True)
+        ]
+
+    post_ids = await aget_or_compute(
+        f'{prefix}:page:{page.number}',
+        fetch_ids,
+        FEED_IDS_SOFT_TIMEOUT,
+        FEED_IDS_CACHE_TIMEOUT,
+        generation
+    )
+
+    async def ahydrate(ids):
+        return await get_identity_map(request).aattach(
+            await aget_posts(ids), *POST_RELATED_FIELDS
+        )
+
+    page.object_list = LazyPostList(
+        post_ids,
+        lambda ids: get_identity_map(request).attach(
+            get_posts(ids), *POST_RELATED_FIELDS
+        ),
+        ahydrate
+    )
+    page.body_key = body_cache_key(
+        'feed', scope, variant, generation,
+        await aget_generation(RELATED_SCOPE),
+        page.number, paginator.num_pages,
+        list(zip(post_ids, await aget_post_versions(post_ids)))
+    )
+    return page
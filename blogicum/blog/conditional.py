@@ -0,0 +1,61 @@
+from django.utils.cache import (get_conditional_response, patch_cache_control,
+                                patch_vary_headers)
+from django.utils.http import http_date, quote_etag
+
+from .caching import body_cache_key
+
+
+def _validators(request, etag_parts, last_modified, public):
+    if not public:
+        etag_parts = (*etag_parts, request.user.pk)
+    etag = quote_etag(body_cache_key(*etag_parts))
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+    return etag, timestamp
+
+
+def _finish(response, etag, timestamp, public):
+    response.headers['ETag'] = etag
+    if timestamp is not None:
+        response.headers['Last-Modified'] = http_date(timestamp)
+    # Страницу хранят клиент (или общий кэш, если она одна для всех),
+    # но перепроверяют её при каждом показе.
+    if public:
+        patch_cache_control(response, public=True, no_cache=True)
+    else:
+        patch_cache_control(response, private=True, no_cache=True)
+        patch_vary_headers(response, ('Cookie',))
+    return response
+
+
+def conditional_response(request, etag_parts, render_response,
+                         last_modified=None, public=False):
+    """
+    Отвечает 304, если у клиента актуальная версия страницы.
+    ETag строится из тех же версий кэша, что и ключ тела страницы,
+    и из пользователя (шапка персональная), поэтому проверка не требует
+    ни рендеринга, ни запросов к базе сверх уже сделанных. Ответы
+    с public=True одинаковы для всех: пользователь в ETag не входит.
+    """
+    etag, timestamp = _validators(
+        request, etag_parts, last_modified, public
+    )
+    response = get_conditional_response(
+        request, etag=etag, last_modified=timestamp
+    )
+    if response is None:
+        response = render_response()
+    return _finish(response, etag, timestamp, public)
+
+
+async def aconditional_response(request, etag_parts, render_response,
+                                last_modified=None, public=False):
+    """Асинхронный conditional_response; render_response — корутина."""
+    etag, timestamp = _validators(
+        request, etag_parts, last_modified, public
+    )
+    response = get_conditional_response(
+        request, etag=etag, last_modified=timestamp
+    )
+    if response is None:
+        response = await render_response()
+    return _finish(response, etag, timestamp, public)
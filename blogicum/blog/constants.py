@@ -9,3 +9,129 @@ POSTS_LIMIT_ON_PAGE = 10
 
 # Количество отображаемых комментариев на странице при пагинации.
 COMMENTS_LIMIT_ON_PAGE = 10
+
+# Связанные объекты публикации, выводимые в карточке поста.
+POST_RELATED_FIELDS = ('author', 'category', 'location')
+
+# Мягкий срок (сек.) списка id публикаций страницы ленты: после него
+# запись считается устаревшей и пересчитывается одним воркером.
+# Ограничивает задержку появления отложенных публикаций.
+FEED_IDS_SOFT_TIMEOUT = 60
+
+# Жёсткий срок (сек.), до которого устаревший список ещё можно отдать.
+FEED_IDS_CACHE_TIMEOUT = 10 * 60
+
+# Мягкий и жёсткий сроки (сек.) закэшированной публикации.
+POST_SOFT_TIMEOUT = 5 * 60
+POST_CACHE_TIMEOUT = 60 * 60
+
+# Блокировка пересчёта записи кэша: время жизни (сек.) на случай падения
+# воркера, сколько (сек.) остальные ждут результат и шаг опроса (сек.).
+RECOMPUTE_LOCK_TIMEOUT = 10
+RECOMPUTE_WAIT_TIMEOUT = 2
+RECOMPUTE_POLL_INTERVAL = 0.05
+
+# Время жизни (сек.) закэшированных авторов, категорий и местоположений.
+RELATED_CACHE_TIMEOUT = 60 * 60
+
+# Время жизни (сек.) закэшированного тела страницы (без шапки).
+BODY_CACHE_TIMEOUT = 10 * 60
+
+# Мягкий и жёсткий сроки (сек.) закэшированной страницы комментариев.
+# Страницы сбрасываются явно при изменениях, сроки — лишь страховка.
+COMMENT_PAGE_SOFT_TIMEOUT = 10 * 60
+COMMENT_PAGE_CACHE_TIMEOUT = 60 * 60
+
+# Буфер просмотров публикаций: не реже чем раз в столько секунд
+# или при стольких накопленных просмотрах счётчики пишутся в базу.
+VIEW_COUNTS_FLUSH_INTERVAL = 30
+VIEW_COUNTS_MAX_PENDING = 1000
+
+# Сколько публикаций обновлять одним UPDATE ... CASE.
+VIEW_COUNTS_BATCH_SIZE = 500
+
+# Блок «самое обсуждаемое»: сколько публикаций выводить, за сколько
+# дней считать комментарии, как часто (сек.) пересчитывать рейтинг
+# и сколько (сек.) устаревший рейтинг ещё можно отдавать.
+TRENDING_LIMIT = 5
+TRENDING_WINDOW_DAYS = 7
+TRENDING_INTERVAL = 5 * 60
+TRENDING_CACHE_TIMEOUT = 60 * 60
+
+# Лента подписок: у автора с большим числом подписчиков посты не
+# раскладываются по лентам, а подтягиваются при чтении.
+TIMELINE_FANOUT_LIMIT = 1000
+
+# Сколько последних постов автора добавить в ленту при подписке.
+TIMELINE_BACKFILL = 50
+
+# Сколько строк ленты вставлять одним запросом.
+TIMELINE_BATCH_SIZE = 1000
+
+# Мягкий и жёсткий сроки (сек.) закэшированного списка крупных авторов.
+MEGA_AUTHORS_SOFT_TIMEOUT = 5 * 60
+MEGA_AUTHORS_CACHE_TIMEOUT = 60 * 60
+
+# Сколько найденных публикаций поиск ранжирует и выводит постранично.
+SEARCH_MAX_RESULTS = 1000
+
+# Мягкий и жёсткий сроки (сек.) закэшированных результатов поиска.
+# Новые публикации и комментарии сбрасывают их сразу, сроки ограничивают
+# задержку появления отложенных публикаций.
+SEARCH_SOFT_TIMEOUT = 60
+SEARCH_CACHE_TIMEOUT = 5 * 60
+
+# Длина фрагмента с подсветкой в результатах поиска (в словах).
+SEARCH_SNIPPET_TOKENS = 24
+
+# Автодополнение: сколько подсказок отдавать, сколько (сек.) браузер
+# и прокси могут хранить ответ, сколько (сек.) хранится журнал изменений
+# индекса в общем кэше и после скольких пропущенных изменений индекс
+# процесса перестраивается целиком.
+AUTOCOMPLETE_LIMIT = 10
+AUTOCOMPLETE_ADMIN_LIMIT = 100
+AUTOCOMPLETE_MAX_AGE = 5 * 60
+AUTOCOMPLETE_CHANGES_TIMEOUT = 60 * 60
+AUTOCOMPLETE_MAX_CHANGES = 1000
+
+# Сколько последних публикаций отдаётся в RSS/Atom.
+SYNDICATION_ITEMS = 20
+
+# Карта сайта: сколько id публикаций покрывает один файл (протокол
+# допускает не больше 50 000 адресов в файле) и сколько строк читается
+# из базы за один запрос.
+SITEMAP_SHARD_SIZE = 50_000
+SITEMAP_CHUNK_SIZE = 2000
+
+# JSON API: размер страницы по умолчанию и наибольший допустимый.
+API_PAGE_SIZE = 20
+API_MAX_PAGE_SIZE = 100
+
+# Живые комментарии (SSE): как часто (сек.) процесс читает новые события,
+# через сколько секунд тишины слать клиенту пинг, сколько (сек.) хранить
+# события для переподключившихся клиентов и через сколько (мс) браузеру
+# переподключаться.
+LIVE_POLL_INTERVAL = 0.5
+LIVE_HEARTBEAT_INTERVAL = 15
+LIVE_EVENTS_TTL = 10 * 60
+LIVE_RETRY_MS = 3000
+
+# Очередь задач: число попыток по умолчанию, пауза (сек.) перед первым
+# повтором (далее удваивается), через сколько секунд задача зависшего
+# воркера возвращается в очередь и как часто (сек.) воркер проверяет
+# очередь, когда она пуста.
+TASK_MAX_ATTEMPTS = 3
+TASK_RETRY_DELAY = 30
+TASK_LOCK_TIMEOUT = 10 * 60
+TASK_POLL_INTERVAL = 1
+
+# Приоритеты задач: письма (сброс пароля ждёт пользователь) важнее
+# раскладки по лентам, раскладка важнее поискового индекса.
+TASK_PRIORITY_EMAIL = 20
+TASK_PRIORITY_TIMELINE = 10
+TASK_PRIORITY_SEARCH = 0
+
+# Очередь писем: сколько писем отправляется за одно соединение с почтовым
+# сервером и сколько попыток даётся каждому письму.
+EMAIL_BATCH_SIZE = 100
+EMAIL_MAX_ATTEMPTS = 5
@@ -0,0 +1,173 @@
+import atexit
+import os
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+
+from django.conf import settings
+from django.db import DatabaseError
+from django.db.models import Case, F, PositiveIntegerField, Value, When
+
+from .constants import (VIEW_COUNTS_BATCH_SIZE, VIEW_COUNTS_FLUSH_INTERVAL,
+                        VIEW_COUNTS_MAX_PENDING)
+from .models import Post
+
+# Журнал процесса: строки «id_публикации количество». Пишется при каждом
+# просмотре и очищается после записи счётчиков в базу, поэтому в нём
+# всегда только то, что ещё не попало в базу.
+LOG_PREFIX = 'views-'
+
+
+def log_dir():
+    return Path(settings.VIEW_COUNTS_DIR)
+
+
+def log_pid(path):
+    """PID процесса, которому принадлежит журнал."""
+    return int(path.stem.removeprefix(LOG_PREFIX))
+
+
+def read_log(path):
+    """Суммирует просмотры из журнала."""
+    counts = Counter()
+    with open(path) as log:
+        for line in log:
+            try:
+                post_id, count = map(int, line.split())
+            except ValueError:
+                # Строка, недописанная при падении процесса.
+                continue
+            counts[post_id] += count
+    return counts
+
+
+def apply_counts(counts):
+    """
+    Прибавляет просмотры пачками UPDATE ... SET views_count = views_count +
+    CASE id WHEN ... END. update() не вызывает сигналов и не меняет
+    updated_at, поэтому кэши публикаций и страниц не сбрасываются.
+    """
+    post_ids = list(counts)
+    for start in range(0, len(post_ids), VIEW_COUNTS_BATCH_SIZE):
+        batch = post_ids[start:start + VIEW_COUNTS_BATCH_SIZE]
+        Post.objects.filter(id__in=batch).update(
+            views_count=F('views_count') + Case(
+                *(When(id=post_id, then=Value(counts[post_id]))
+                  for post_id in batch),
+                default=Value(0),
+                output_field=PositiveIntegerField()
+            )
+        )
+
+
+class ViewCounter:
+    """
+    Буфер просмотров процесса с отложенной записью в базу.
+    Просмотры копятся в памяти и дописываются в журнал процесса;
+    в базу они пишутся одним пакетом раз в VIEW_COUNTS_FLUSH_INTERVAL
+    секунд, при VIEW_COUNTS_MAX_PENDING накопленных просмотрах
+    и при завершении процесса. При падении процесса теряются только
+    просмотры, не дошедшие до журнала; остальные переносит в базу
+    команда compact_view_counts.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._pid = os.getpid()
+        self._pending = Counter()
+        self._in_flight = Counter()
+        self._log = None
+        self._last_flush = time.monotonic()
+
+    def _log_file(self):
+        if self._log is None:
+            log_dir().mkdir(parents=True, exist_ok=True)
+            self._log = open(
+                log_dir() / f'{LOG_PREFIX}{self._pid}.log', 'a'
+            )
+        return self._log
+
+    def hit(self, post_id):
+        """Учитывает просмотр публикации."""
+        if self.record(post_id):
+            self.flush()
+
+    def record(self, post_id):
+        """
+        Учитывает просмотр без записи в базу; возвращает True, если
+        пора вызвать flush.
+        """
+        with self._lock:
+            if self._pid != os.getpid():
+                # После fork буфер и журнал принадлежат родителю.
+                self._reset()
+            self._pending[post_id] += 1
+            log = self._log_file()
+            log.write(f'{post_id} 1\n')
+            log.flush()
+            return (
+                sum(self._pending.values()) >= VIEW_COUNTS_MAX_PENDING
+                or time.monotonic() - self._last_flush
+                >= VIEW_COUNTS_FLUSH_INTERVAL
+            )
+
+    def pending(self, post_id):
+        """Просмотры публикации, ещё не записанные в базу."""
+        return self._pending[post_id] + self._in_flight[post_id]
+
+    def flush(self):
+        """
+        Пишет накопленные просмотры в базу и очищает журнал.
+        Буфер подменяется под блокировкой, а UPDATE идёт уже без неё,
+        чтобы просмотры не ждали базу. Если база недоступна, просмотры
+        возвращаются в буфер; журнал до успешной записи не трогается.
+        """
+        with self._lock:
+            if self._pid != os.getpid() or self._in_flight:
+                return
+            self._last_flush = time.monotonic()
+            if not self._pending:
+                return
+            self._in_flight, self._pending = self._pending, Counter()
+        try:
+            apply_counts(self._in_flight)
+        except DatabaseError:
+            with self._lock:
+                self._pending.update(self._in_flight)
+                self._in_flight = Counter()
+            return
+        with self._lock:
+            self._in_flight = Counter()
+            if self._log is not None:
+                # В журнале остаются просмотры, пришедшие во время записи.
+                self._log.truncate(0)
+                self._log.writelines(
+                    f'{post_id} {count}\n'
+                    for post_id, count in self._pending.items()
+                )
+                self._log.flush()
+
+    def clear(self):
+        """Отбрасывает буфер без записи в базу."""
+        with self._lock:
+            if self._log is not None:
+                self._log.close()
+            self._reset()
+
+    def close(self):
+        """Записывает остаток при завершении процесса."""
+        self.flush()
+        with self._lock:
+            if self._log is not None:
+                self._log.close()
+                if not self._pending:
+                    Path(self._log.name).unlink(missing_ok=True)
+            self._reset()
+
+
+view_counter = ViewCounter()
+atexit.register(view_counter.close)
@@ -0,0 +1,18 @@
+from django.db import models
+from django.utils.safestring import mark_safe
+
+
+class RenderedHTMLField(models.TextField):
+    """
+    Готовый HTML, отрендеренный из текста при записи.
+    Значение из базы помечается безопасным и выводится в шаблон как есть.
+    """
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault('editable', False)
+        kwargs.setdefault('blank', True)
+        kwargs.setdefault('default', '')
+        super().__init__(*args, **kwargs)
+
+    def from_db_value(self, value, expression, connection):
+        return value if value is None else mark_safe(value)
@@ -0,0 +1,140 @@
+from collections import defaultdict
+
+from django.core.cache import cache
+
+from .constants import RELATED_CACHE_TIMEOUT
+
+# Поля, которые не попадают в кэш связанных объектов.
+DEFERRED_FIELDS = {'auth.user': ('password',)}
+
+
+def related_cache_key(model, pk):
+    """Ключ кэша для связанного объекта (автора, категории, места)."""
+    return f'blog:obj:{model._meta.label_lower}:{pk}'
+
+
+class IdentityMap:
+    """
+    Карта идентичности связанных объектов в рамках одного запроса.
+    Гарантирует, что для пары (модель, pk) создаётся ровно один экземпляр,
+    сколько бы публикаций или комментариев на него ни ссылалось.
+    """
+
+    def __init__(self):
+        self._objects = {}
+
+    @staticmethod
+    def _key(model, pk):
+        return model._meta.concrete_model, pk
+
+    def get(self, model, pk):
+        """Возвращает уже загруженный экземпляр или None."""
+        return self._objects.get(self._key(model, pk))
+
+    def add(self, instance):
+        """Регистрирует экземпляр и возвращает канонический объект."""
+        return self._objects.setdefault(
+            self._key(type(instance), instance.pk), instance
+        )
+
+    def load(self, model, pks):
+        """
+        Догружает отсутствующие в карте объекты: сначала из кэша
+        одним get_many, затем оставшиеся — одним запросом к базе.
+        """
+        keys = {
+            related_cache_key(model, pk): pk for pk in pks
+            if pk is not None and self.get(model, pk) is None
+        }
+        if not keys:
+            return
+        for instance in cache.get_many(keys).values():
+            self.add(instance)
+        missing = [pk for pk in keys.values() if self.get(model, pk) is None]
+        if not missing:
+            return
+        fetched = model._base_manager.defer(
+            *DEFERRED_FIELDS.get(model._meta.label_lower, ())
+        ).in_bulk(missing)
+        cache.set_many(
+            {related_cache_key(model, pk): obj for pk, obj in fetched.items()},
+            RELATED_CACHE_TIMEOUT
+        )
+        for instance in fetched.values():
+            self.add(instance)
+
+    async def aload(self, model, pks):
+        """Асинхронный load."""
+        keys = {
+            related_cache_key(model, pk): pk for pk in pks
+            if pk is not None and self.get(model, pk) is None
+        }
+        if not keys:
+            return
+        for instance in (await cache.aget_many(keys)).values():
+            self.add(instance)
+        missing = [pk for pk in keys.values() if self.get(model, pk) is None]
+        if not missing:
+            return
+        fetched = await model._base_manager.defer(
+            *DEFERRED_FIELDS.get(model._meta.label_lower, ())
+        ).ain_bulk(missing)
+        await cache.aset_many(
+            {related_cache_key(model, pk): obj for pk, obj in fetched.items()},
+            RELATED_CACHE_TIMEOUT
+        )
+        for instance in fetched.values():
+            self.add(instance)
+
+    @staticmethod
+    def _related_pks(instances, field_names):
+        """Поля и множества pk связанных объектов по каждому полю."""
+        opts = instances[0]._meta
+        fields = [opts.get_field(name) for name in field_names]
+        pks_by_field = defaultdict(set)
+        for instance in instances:
+            for field in fields:
+                pks_by_field[field].add(getattr(instance, field.attname))
+        return fields, pks_by_field
+
+    def _set_related(self, instances, fields):
+        for instance in instances:
+            for field in fields:
+                pk = getattr(instance, field.attname)
+                field.set_cached_value(
+                    instance,
+                    None if pk is None else self.get(field.related_model, pk)
+                )
+
+    def attach(self, instances, *field_names):
+        """
+        Подставляет связанные объекты для ForeignKey-полей из карты.
+        Недостающие объекты догружаются одним запросом на модель,
+        поэтому одинаковые авторы и категории на странице — один объект.
+        """
+        instances = list(instances)
+        if not instances:
+            return instances
+        fields, pks_by_field = self._related_pks(instances, field_names)
+        for field, pks in pks_by_field.items():
+            self.load(field.related_model, pks)
+        self._set_related(instances, fields)
+        return instances
+
+    async def aattach(self, instances, *field_names):
+        """Асинхронный attach."""
+        instances = list(instances)
+        if not instances:
+            return instances
+        fields, pks_by_field = self._related_pks(instances, field_names)
+        for field, pks in pks_by_field.items():
+            await self.aload(field.related_model, pks)
+        self._set_related(instances, fields)
+        return instances
+
+
+def get_identity_map(request):
+    """Возвращает карту идентичности, привязанную к текущему запросу."""
+    if not hasattr(request, 'identity_map'):
+        request.identity_map = IdentityMap()
+    return request.identity_map
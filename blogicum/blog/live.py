@@ -0,0 +1,166 @@
+import asyncio
+import time
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import DatabaseError
+from django.db.models import Max
+from django.template.loader import render_to_string
+from django.utils.timezone import now
+
+from .constants import (LIVE_EVENTS_TTL, LIVE_HEARTBEAT_INTERVAL,
+                        LIVE_POLL_INTERVAL, LIVE_RETRY_MS)
+from .models import Comment, LiveEvent
+
+
+def publish_comment(comment):
+    """Записывает событие о новом комментарии в общую таблицу."""
+    LiveEvent.objects.create(post_id=comment.post_id, comment_id=comment.pk)
+
+
+async def _load_events(events):
+    """(id события, комментарий) с авторами; удалённые пропускаются."""
+    comments = {
+        comment.id: comment
+        async for comment in Comment.objects.filter(
+            id__in=[comment_id for _, _, comment_id in events]
+        ).select_related('author')
+    }
+    return [
+        (event_id, post_id, comments[comment_id])
+        for event_id, post_id, comment_id in events
+        if comment_id in comments
+    ]
+
+
+class Broker:
+    """
+    Pub/sub процесса: подписчики — очереди asyncio по публикациям.
+    Одна задача-опросчик на процесс раз в LIVE_POLL_INTERVAL читает
+    новые события LiveEvent одним запросом и раскладывает их по очередям,
+    так что стоимость опроса не зависит от числа открытых трансляций.
+    Опросчик работает, только пока есть подписчики.
+    """
+
+    def __init__(self):
+        self._subscribers = defaultdict(set)
+        self._task = None
+        self._last_id = 0
+        self._pruned_at = 0.0
+
+    def subscribe(self, post_id):
+        queue = asyncio.Queue()
+        self._subscribers[post_id].add(queue)
+        loop = asyncio.get_running_loop()
+        # Задача прежнего цикла событий (например, после перезапуска)
+        # не будет выполняться — заводим новую.
+        if (self._task is None or self._task.done()
+                or self._task.get_loop() is not loop):
+            self._task = loop.create_task(self._poll())
+        return queue
+
+    def unsubscribe(self, post_id, queue):
+        subscribers = self._subscribers.get(post_id, set())
+        subscribers.discard(queue)
+        if not subscribers:
+            self._subscribers.pop(post_id, None)
+
+    async def _poll(self):
+        self._last_id = await latest_event_id()
+        while self._subscribers:
+            await asyncio.sleep(LIVE_POLL_INTERVAL)
+            try:
+                await self._dispatch_new()
+                await self._prune()
+            except DatabaseError:
+                continue
+
+    async def _dispatch_new(self):
+        events = [
+            event async for event in LiveEvent.objects.filter(
+                id__gt=self._last_id, post_id__in=list(self._subscribers)
+            ).order_by('id').values_list('id', 'post_id', 'comment_id')
+        ]
+        if not events:
+            return
+        self._last_id = events[-1][0]
+        for event_id, post_id, comment in await _load_events(events):
+            for queue in self._subscribers.get(post_id, ()):
+                queue.put_nowait((event_id, comment))
+
+    async def _prune(self):
+        """Удаляет события старше LIVE_EVENTS_TTL (изредка)."""
+        if time.monotonic() - self._pruned_at < LIVE_EVENTS_TTL / 10:
+            return
+        self._pruned_at = time.monotonic()
+        await LiveEvent.objects.filter(
+            created_at__lt=now() - timedelta(seconds=LIVE_EVENTS_TTL)
+        ).adelete()
+
+
+broker = Broker()
+
+
+async def latest_event_id():
+    return (
+        await LiveEvent.objects.aaggregate(last=Max('id'))
+    )['last'] or 0
+
+
+def sse_message(data, event=None, event_id=None):
+    """Сообщение Server-Sent Events; многострочные данные — по строке."""
+    lines = []
+    if event_id is not None:
+        lines.append(f'id: {event_id}')
+    if event:
+        lines.append(f'event: {event}')
+    lines += [f'data: {line}' for line in data.splitlines() or ['']]
+    return '\n'.join(lines) + '\n\n'
+
+
+def _comment_message(request, post, event_id, comment):
+    return sse_message(
+        render_to_string(
+            'includes/comments.html',
+            {'page_obj': [comment], 'post': post},
+            request
+        ),
+        event='comment',
+        event_id=event_id
+    )
+
+
+async def comment_stream(request, post, since):
+    """
+    Поток новых комментариев к публикации после события since.
+    Пропущенное до подписки (в том числе за время переподключения
+    по Last-Event-ID) досылается из таблицы сразу, а из очереди
+    отбрасываются уже отправленные события.
+    """
+    queue = broker.subscribe(post.id)
+    try:
+        yield f'retry: {LIVE_RETRY_MS}\n\n'
+        missed = await _load_events([
+            event async for event in LiveEvent.objects.filter(
+                post_id=post.id, id__gt=since
+            ).order_by('id').values_list('id', 'post_id', 'comment_id')
+        ])
+        last_id = since
+        for event_id, _, comment in missed:
+            last_id = event_id
+            yield _comment_message(request, post, event_id, comment)
+        while True:
+            try:
+                event_id, comment = await asyncio.wait_for(
+                    queue.get(), LIVE_HEARTBEAT_INTERVAL
+                )
+            except asyncio.TimeoutError:
+                # Комментарий SSE не даёт прокси закрыть соединение.
+                yield ': ping\n\n'
+                continue
+            if event_id <= last_id:
+                continue
+            last_id = event_id
+            yield _comment_message(request, post, event_id, comment)
+    finally:
+        broker.unsubscribe(post.id, queue)
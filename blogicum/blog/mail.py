@@ -0,0 +1,143 @@
+import traceback
+from datetime import timedelta
+from email import message_from_bytes
+from email.message import Message
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.mail.message import MIMEMixin
+from django.db.models import F, Q
+from django.utils.timezone import now
+
+from .constants import (CHAR_FIELD_MAX_LENGTH, EMAIL_BATCH_SIZE,
+                        EMAIL_MAX_ATTEMPTS, TASK_LOCK_TIMEOUT,
+                        TASK_PRIORITY_EMAIL)
+from .models import OutgoingEmail
+from .tasks import enqueue_on_commit, task
+
+# Отложенная отправка писем. QueuedEmailBackend (EMAIL_BACKEND) только
+# сохраняет письма в OutgoingEmail и ставит в очередь задачу рассылки,
+# поэтому запрос не ждёт почтового сервера. Задача (или команда
+# send_queued_mail) отправляет письма пачками по EMAIL_BATCH_SIZE через
+# одно соединение с настоящим бэкендом QUEUED_EMAIL_BACKEND.
+
+
+class StoredMIMEMessage(MIMEMixin, Message):
+    """Разобранное сохранённое письмо с сериализацией как у Django."""
+
+
+class QueuedMessage(EmailMessage):
+    """Письмо из очереди: отправляется готовый MIME без повторной сборки."""
+
+    def __init__(self, row):
+        super().__init__(subject=row.subject, from_email=row.from_email)
+        self.raw_message = bytes(row.message)
+        self.queued_recipients = row.recipients
+
+    def message(self):
+        return message_from_bytes(
+            self.raw_message, _class=StoredMIMEMessage
+        )
+
+    def recipients(self):
+        return self.queued_recipients
+
+
+class QueuedEmailBackend(BaseEmailBackend):
+    """Бэкенд EMAIL_BACKEND, который кладёт письма в очередь."""
+
+    def send_messages(self, email_messages):
+        rows = [
+            OutgoingEmail(
+                from_email=message.from_email,
+                recipients=message.recipients(),
+                subject=str(message.subject)[:CHAR_FIELD_MAX_LENGTH],
+                message=message.message().as_bytes()
+            )
+            for message in email_messages
+            if message.recipients()
+        ]
+        if rows:
+            OutgoingEmail.objects.bulk_create(rows)
+            # Одна ожидающая задача разошлёт все накопившиеся письма.
+            enqueue_on_commit(send_queued_mail_task, unique=True)
+        return len(rows)
+
+
+def claim_batch(limit, after=0):
+    """
+    Забирает до limit писем с id больше after. Письмо достаётся одному
+    отправителю: UPDATE срабатывает только для ещё не взятых.
+    """
+    free = Q(locked_at__isnull=True) | Q(
+        locked_at__lt=now() - timedelta(seconds=TASK_LOCK_TIMEOUT)
+    )
+    candidates = OutgoingEmail.objects.filter(
+        free, id__gt=after, attempts__lt=EMAIL_MAX_ATTEMPTS
+    )
+    email_ids = list(candidates.values_list('id', flat=True)[:limit])
+    locked_at = now()
+    OutgoingEmail.objects.filter(free, id__in=email_ids).update(
+        locked_at=locked_at
+    )
+    return list(OutgoingEmail.objects.filter(
+        id__in=email_ids, locked_at=locked_at
+    ))
+
+
+def _release(rows, error):
+    OutgoingEmail.objects.filter(id__in=[row.id for row in rows]).update(
+        attempts=F('attempts') + 1, locked_at=None, last_error=error
+    )
+
+
+def send_batch(rows):
+    """
+    Отправляет пачку писем через одно соединение. Отправленные письма
+    удаляются, неотправленные возвращаются в очередь с текстом ошибки.
+    Возвращает (отправлено, не отправлено).
+    """
+    connection = get_connection(settings.QUEUED_EMAIL_BACKEND)
+    try:
+        connection.open()
+    except Exception:
+        _release(rows, traceback.format_exc())
+        return 0, len(rows)
+    sent = []
+    try:
+        for row in rows:
+            try:
+                if connection.send_messages([QueuedMessage(row)]):
+                    sent.append(row.id)
+                else:
+                    _release([row], 'Почтовый сервер не принял письмо.')
+            except Exception:
+                _release([row], traceback.format_exc())
+    finally:
+        connection.close()
+    OutgoingEmail.objects.filter(id__in=sent).delete()
+    return len(sent), len(rows) - len(sent)
+
+
+def send_queued_mail(batch_size=EMAIL_BATCH_SIZE):
+    """
+    Отправляет очередь писем пачками. Каждое письмо пробуется один раз
+    за вызов: проход идёт по возрастанию id. Возвращает (отправлено,
+    не отправлено).
+    """
+    sent = failed = last_id = 0
+    while rows := claim_batch(batch_size, after=last_id):
+        last_id = rows[-1].id
+        batch_sent, batch_failed = send_batch(rows)
+        sent += batch_sent
+        failed += batch_failed
+    return sent, failed
+
+
+@task(priority=TASK_PRIORITY_EMAIL)
+def send_queued_mail_task():
+    """Задача рассылки; при ошибках очередь задач повторит её позже."""
+    _, failed = send_queued_mail()
+    if failed:
+        raise RuntimeError(f'Не отправлено писем: {failed}.')
@@ -0,0 +1,103 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.urls import reverse
+
+from blog.models import Comment, Post
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет пропускную способность добавления комментариев '
+        'при нескольких одновременных писателях.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'post_id', type=int, help='Публикация для комментариев.'
+        )
+        parser.add_argument(
+            '--writers', type=int, default=4,
+            help='Количество одновременных писателей.'
+        )
+        parser.add_argument(
+            '--comments', type=int, default=50,
+            help='Сколько комментариев отправляет каждый писатель.'
+        )
+        parser.add_argument(
+            '--username',
+            help='Автор комментариев (по умолчанию — автор публикации).'
+        )
+        parser.add_argument(
+            '--json', action='store_true',
+            help='Отправлять комментарии в режиме JSON, без перенаправления.'
+        )
+        parser.add_argument(
+            '--keep', action='store_true',
+            help='Не удалять созданные комментарии после замера.'
+        )
+
+    def handle(self, *args, post_id, writers, comments, username, json,
+               keep, **options):
+        post = Post.objects.filter(pk=post_id).first()
+        if post is None:
+            raise CommandError(f'Публикация {post_id} не найдена.')
+        user = (
+            User.objects.get(username=username) if username else post.author
+        )
+        url = reverse('blog:add_comment', args=(post_id,))
+        headers = {'HTTP_ACCEPT': 'application/json'} if json else {}
+        started_after = Comment.objects.order_by('-id').values_list(
+            'id', flat=True
+        ).first() or 0
+
+        # Сессии создаются заранее, чтобы замерять только запись.
+        clients = []
+        for _ in range(writers):
+            client = Client(
+                raise_request_exception=False, HTTP_HOST='localhost'
+            )
+            client.force_login(user)
+            clients.append(client)
+
+        def write(writer):
+            client = clients[writer]
+            failures = 0
+            try:
+                for number in range(comments):
+                    response = client.post(
+                        url,
+                        {'text': f'Замер: писатель {writer}, №{number}'},
+                        **headers
+                    )
+                    failures += response.status_code not in (
+                        HTTPStatus.FOUND, HTTPStatus.CREATED
+                    )
+            finally:
+                # У каждого потока своё соединение с базой.
+                connection.close()
+            return failures
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(writers) as executor:
+            failures = sum(executor.map(write, range(writers)))
+        elapsed = time.perf_counter() - start
+
+        total = writers * comments
+        self.stdout.write(
+            f'Писателей: {writers}, комментариев: {total}, '
+            f'ошибок: {failures}\n'
+            f'Время: {elapsed:.2f} с, '
+            f'{(total - failures) / elapsed:.1f} комментариев/с'
+        )
+        if not keep:
+            Comment.objects.filter(
+                post_id=post_id, id__gt=started_after, author=user
+            ).delete()
@@ -0,0 +1,110 @@
+import asyncio
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import AsyncClient, Client
+from django.test.utils import override_settings
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает синхронные страницы под WSGI (поток на запрос) '
+        'с асинхронными под ASGI при большом числе одновременных клиентов.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'urls', nargs='*', default=['/'],
+            help='Адреса страниц (по умолчанию — главная).'
+        )
+        parser.add_argument(
+            '--concurrency', type=int, default=100,
+            help='Количество одновременных клиентов.'
+        )
+        parser.add_argument(
+            '--requests', type=int, default=20,
+            help='Сколько запросов отправляет каждый клиент.'
+        )
+
+    def handle(self, *args, urls, concurrency, requests, **options):
+        for name, run in (('WSGI, sync', self.run_sync),
+                          ('ASGI, async', self.run_async)):
+            # Тестовые клиенты обращаются к хосту testserver.
+            with override_settings(
+                ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']
+            ):
+                elapsed, timings, failures = run(
+                    urls, concurrency, requests
+                )
+            total = len(timings)
+            timings.sort()
+            self.stdout.write(
+                f'{name}: запросов {total}, ошибок {failures}, '
+                f'{total / elapsed:.1f} запросов/с, '
+                f'медиана {statistics.median(timings) * 1000:.1f} мс, '
+                f'p95 {timings[int(total * 0.95) - 1] * 1000:.1f} мс'
+            )
+
+    @staticmethod
+    def _ok(response):
+        return response.status_code in (HTTPStatus.OK, HTTPStatus.NOT_MODIFIED)
+
+    def run_sync(self, urls, concurrency, requests):
+        """Пул потоков по числу клиентов, как у потокового WSGI-сервера."""
+        def client_run(_):
+            client = Client(raise_request_exception=False)
+            timings = []
+            failures = 0
+            try:
+                for number in range(requests):
+                    start = time.perf_counter()
+                    response = client.get(urls[number % len(urls)])
+                    timings.append(time.perf_counter() - start)
+                    failures += not self._ok(response)
+            finally:
+                connection.close()
+            return timings, failures
+
+        with override_settings(ROOT_URLCONF='blogicum.urls'):
+            start = time.perf_counter()
+            with ThreadPoolExecutor(concurrency) as executor:
+                results = list(executor.map(client_run, range(concurrency)))
+            elapsed = time.perf_counter() - start
+        return (
+            elapsed,
+            [timing for timings, _ in results for timing in timings],
+            sum(failures for _, failures in results)
+        )
+
+    def run_async(self, urls, concurrency, requests):
+        """Все клиенты — задачи одного цикла событий."""
+        async def client_run():
+            client = AsyncClient(raise_request_exception=False)
+            timings = []
+            failures = 0
+            for number in range(requests):
+                start = time.perf_counter()
+                response = await client.get(urls[number % len(urls)])
+                timings.append(time.perf_counter() - start)
+                failures += not self._ok(response)
+            return timings, failures
+
+        async def run_all():
+            return await asyncio.gather(
+                *(client_run() for _ in range(concurrency))
+            )
+
+        with override_settings(ROOT_URLCONF='blogicum.asgi_urls'):
+            start = time.perf_counter()
+            results = asyncio.run(run_all())
+            elapsed = time.perf_counter() - start
+        return (
+            elapsed,
+            [timing for timings, _ in results for timing in timings],
+            sum(failures for _, failures in results)
+        )
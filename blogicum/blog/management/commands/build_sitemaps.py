@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from blog.constants import SITEMAP_SHARD_SIZE
+from blog.sitemaps import build_sitemaps, sitemaps_dir
+
+
+class Command(BaseCommand):
+    help = (
+        'Собирает карту сайта (публикации, категории, профили) '
+        'в статические файлы SITEMAPS_DIR.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--base-url',
+            help='Адрес сайта для ссылок (по умолчанию — SITE_URL).'
+        )
+        parser.add_argument(
+            '--shard-size', type=int, default=SITEMAP_SHARD_SIZE,
+            help='Сколько id покрывает один файл раздела.'
+        )
+
+    def handle(self, *args, base_url, shard_size, **options):
+        names = build_sitemaps(base_url=base_url, shard_size=shard_size)
+        self.stdout.write(
+            f'Карта сайта записана в {sitemaps_dir()}: '
+            f'файлов разделов {len(names)}'
+        )
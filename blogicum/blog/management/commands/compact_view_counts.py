@@ -0,0 +1,36 @@
+import os
+
+from django.core.management.base import BaseCommand
+
+from blog.counters import apply_counts, log_dir, log_pid, read_log
+
+
+def is_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class Command(BaseCommand):
+    help = (
+        'Переносит в базу просмотры из журналов завершившихся процессов '
+        'и удаляет эти журналы.'
+    )
+
+    def handle(self, *args, **options):
+        logs = sorted(log_dir().glob('views-*.log'))
+        for path in logs:
+            # Журнал живого процесса он очистит сам при записи в базу.
+            if is_alive(log_pid(path)):
+                continue
+            counts = read_log(path)
+            apply_counts(counts)
+            path.unlink()
+            self.stdout.write(
+                f'{path.name}: публикаций {len(counts)}, '
+                f'просмотров {sum(counts.values())}'
+            )
@@ -0,0 +1,43 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from blog.constants import (TRENDING_INTERVAL, TRENDING_LIMIT,
+                            TRENDING_WINDOW_DAYS)
+from blog.ranking import refresh_trending
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает рейтинг самых обсуждаемых публикаций '
+        '(общий и по категориям) и кладёт его в кэш.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--limit', type=int, default=TRENDING_LIMIT,
+            help='Сколько публикаций в каждом топе.'
+        )
+        parser.add_argument(
+            '--window-days', type=int, default=TRENDING_WINDOW_DAYS,
+            help='За сколько последних дней считать комментарии.'
+        )
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Пересчитывать рейтинг бесконечно с интервалом --interval.'
+        )
+        parser.add_argument(
+            '--interval', type=int, default=TRENDING_INTERVAL,
+            help='Пауза (сек.) между пересчётами в режиме --loop.'
+        )
+
+    def handle(self, *args, limit, window_days, loop, interval, **options):
+        while True:
+            trending = refresh_trending(limit=limit, window_days=window_days)
+            self.stdout.write(
+                f'Рейтинг обновлён: публикаций {len(trending["posts"])}, '
+                f'категорий {len(trending["categories"])}'
+            )
+            if not loop:
+                return
+            time.sleep(interval)
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from blog import search
+
+
+class Command(BaseCommand):
+    help = 'Перестраивает полнотекстовый индекс публикаций и комментариев.'
+
+    def handle(self, *args, **options):
+        if not search.is_available():
+            raise CommandError('Полнотекстовый индекс есть только в SQLite.')
+        search.rebuild()
+        self.stdout.write('Индекс перестроен.')
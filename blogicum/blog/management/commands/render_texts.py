@@ -0,0 +1,51 @@
+from django.core.management.base import BaseCommand
+
+from blog.models import Comment, Post
+from blog.services import render_text
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет text_html у публикаций и комментариев, '
+        'сохранённых до появления предрендеренного HTML.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help='Сколько записей обновлять за один запрос.'
+        )
+        parser.add_argument(
+            '--all', action='store_true', dest='rerender_all',
+            help='Перерендерить все записи, а не только пустые.'
+        )
+
+    def handle(self, *args, batch_size, rerender_all, **options):
+        for model in (Post, Comment):
+            queryset = model.objects.all()
+            if not rerender_all:
+                queryset = queryset.filter(text_html='')
+            updated = self.backfill(queryset, batch_size)
+            self.stdout.write(
+                f'{model._meta.verbose_name_plural}: обновлено {updated}'
+            )
+
+    def backfill(self, queryset, batch_size):
+        """Идёт по id без OFFSET и обновляет записи пачками."""
+        model = queryset.model
+        updated = 0
+        last_id = 0
+        while True:
+            batch = list(
+                queryset.filter(id__gt=last_id)
+                .order_by('id')
+                .only('id', 'text')[:batch_size]
+            )
+            if not batch:
+                return updated
+            for obj in batch:
+                obj.text_html = render_text(obj.text)
+            # bulk_update не вызывает save() и не меняет updated_at.
+            model.objects.bulk_update(batch, ['text_html'])
+            updated += len(batch)
+            last_id = batch[-1].id
@@ -0,0 +1,82 @@
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import django
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError, connection
+
+from blog.constants import TASK_POLL_INTERVAL
+from blog.tasks import claim, requeue_stale, run_task
+
+
+def run_and_close(task_id):
+    """Выполняет задачу в потоке или процессе пула и закрывает соединение."""
+    try:
+        return run_task(task_id)
+    finally:
+        connection.close()
+
+
+class Command(BaseCommand):
+    help = (
+        'Выполняет задачи локальной очереди: по приоритету, с повторами '
+        'упавших, в пуле потоков или процессов.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--executor', choices=('thread', 'process'), default='thread',
+            help='Пул потоков (ввод-вывод) или процессов (вычисления).'
+        )
+        parser.add_argument(
+            '--concurrency', type=int,
+            help=(
+                'Сколько задач выполняется одновременно (по умолчанию 1 '
+                'на SQLite, где одновременно пишет только одно соединение, '
+                'и 4 на остальных базах).'
+            )
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Выполнить готовые задачи и выйти.'
+        )
+        parser.add_argument(
+            '--poll-interval', type=float, default=TASK_POLL_INTERVAL,
+            help='Пауза (сек.) между проверками пустой очереди.'
+        )
+
+    def handle(self, *args, executor, concurrency, once, poll_interval,
+               **options):
+        if concurrency is None:
+            concurrency = 1 if connection.vendor == 'sqlite' else 4
+        if executor == 'process':
+            # spawn, а не fork: дочерние процессы не наследуют соединения
+            # с базой и сами настраивают Django.
+            pool = ProcessPoolExecutor(
+                concurrency,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=django.setup
+            )
+        else:
+            pool = ThreadPoolExecutor(concurrency)
+        done = failed = 0
+        with pool:
+            while True:
+                try:
+                    requeue_stale()
+                    task_ids = claim(concurrency)
+                except DatabaseError as error:
+                    # Занятая база не останавливает воркер.
+                    self.stderr.write(f'Очередь недоступна: {error}')
+                    time.sleep(poll_interval)
+                    continue
+                if not task_ids:
+                    if once:
+                        break
+                    time.sleep(poll_interval)
+                    continue
+                for succeeded in pool.map(run_and_close, task_ids):
+                    done += succeeded
+                    failed += not succeeded
+        self.stdout.write(f'Выполнено задач: {done}, с ошибкой: {failed}')
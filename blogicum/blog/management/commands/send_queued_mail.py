@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from blog.constants import EMAIL_BATCH_SIZE
+from blog.mail import send_queued_mail
+
+
+class Command(BaseCommand):
+    help = (
+        'Отправляет накопившиеся письма пачками через одно соединение '
+        'с почтовым сервером на пачку.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=EMAIL_BATCH_SIZE,
+            help='Сколько писем отправляется за одно соединение.'
+        )
+
+    def handle(self, *args, batch_size, **options):
+        sent, failed = send_queued_mail(batch_size)
+        self.stdout.write(f'Отправлено писем: {sent}, с ошибкой: {failed}')
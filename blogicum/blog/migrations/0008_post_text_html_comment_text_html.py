@@ -0,0 +1,34 @@
+# Generated by Django 5.1.1 on 2026-10-19 09:13
+
+import blog.fields
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog", "0007_post_updated_at_comment_updated_at"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="comment",
+            name="text_html",
+            field=blog.fields.RenderedHTMLField(
+                blank=True,
+                default="",
+                editable=False,
+                verbose_name="Текст комментария (HTML)",
+            ),
+        ),
+        migrations.AddField(
+            model_name="post",
+            name="text_html",
+            field=blog.fields.RenderedHTMLField(
+                blank=True,
+                default="",
+                editable=False,
+                verbose_name="Текст (HTML)",
+            ),
+        ),
+    ]
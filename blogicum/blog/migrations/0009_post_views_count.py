@@ -0,0 +1,20 @@
+# Generated by Django 5.1.1 on 2026-10-19 09:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog", "0008_post_text_html_comment_text_html"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="post",
+            name="views_count",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="Просмотры"
+            ),
+        ),
+    ]
@@ -0,0 +1,44 @@
+from django.db import migrations
+
+# SQL записан здесь, а не взят из blog.search: миграция не должна меняться
+# вместе с кодом приложения.
+CREATE_INDEXES = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS blog_post_fts "
+    "USING fts5(title, text, tokenize='unicode61 remove_diacritics 2')",
+    "CREATE VIRTUAL TABLE IF NOT EXISTS blog_comment_fts "
+    "USING fts5(text, tokenize='unicode61 remove_diacritics 2')",
+    "INSERT INTO blog_post_fts (rowid, title, text) "
+    "SELECT id, title, text FROM blog_post",
+    "INSERT INTO blog_comment_fts (rowid, text) "
+    "SELECT id, text FROM blog_comment",
+)
+
+DROP_INDEXES = (
+    "DROP TABLE IF EXISTS blog_post_fts",
+    "DROP TABLE IF EXISTS blog_comment_fts",
+)
+
+
+def run_on_sqlite(statements):
+    """FTS5 есть только в SQLite; на других базах поиск идёт через LIKE."""
+
+    def operation(apps, schema_editor):
+        if schema_editor.connection.vendor != "sqlite":
+            return
+        for sql in statements:
+            schema_editor.execute(sql)
+
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog", "0010_follow_timelineentry"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run_on_sqlite(CREATE_INDEXES), run_on_sqlite(DROP_INDEXES)
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.1.1 on 2026-10-19 09:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog", "0011_search_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="LiveEvent",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("post_id", models.PositiveBigIntegerField(verbose_name="Публикация")),
+                (
+                    "comment_id",
+                    models.PositiveBigIntegerField(verbose_name="Комментарий"),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="Добавлено"),
+                ),
+            ],
+            options={
+                "verbose_name": "событие трансляции",
+                "verbose_name_plural": "События трансляций",
+            },
+        ),
+    ]
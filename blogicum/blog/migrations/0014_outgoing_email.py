@@ -0,0 +1,63 @@
+# Generated by Django 5.1.1 on 2026-10-19 09:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog", "0013_task_queue"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="OutgoingEmail",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "from_email",
+                    models.CharField(max_length=256, verbose_name="Отправитель"),
+                ),
+                (
+                    "recipients",
+                    models.JSONField(default=list, verbose_name="Получатели"),
+                ),
+                (
+                    "subject",
+                    models.CharField(blank=True, max_length=256, verbose_name="Тема"),
+                ),
+                ("message", models.BinaryField(verbose_name="Сообщение")),
+                (
+                    "attempts",
+                    models.PositiveSmallIntegerField(default=0, verbose_name="Попытки"),
+                ),
+                (
+                    "locked_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="Взято в работу"
+                    ),
+                ),
+                (
+                    "last_error",
+                    models.TextField(blank=True, verbose_name="Последняя ошибка"),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="Добавлено"),
+                ),
+            ],
+            options={
+                "verbose_name": "письмо",
+                "verbose_name_plural": "Очередь писем",
+                "ordering": ("id",),
+            },
+        ),
+    ]
@@ -1,7 +1,12 @@
+from http import HTTPStatus
+
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
+from django.http import JsonResponse
 from django.shortcuts import redirect
+from django.template.loader import render_to_string
 from django.urls import reverse
 
+from .caching import get_post
 from .forms import PostForm
 from .models import Comment, Post
 
@@ -43,11 +48,52 @@ class PostMixin(LoginRequiredMixin):
 
 
 class CommentMixin:
-    """Миксин для работы с комментариями."""
+    """
+    Миксин для работы с комментариями.
+    Запрос с Accept: application/json получает вместо перенаправления
+    на страницу публикации JSON с отрисованным комментарием или ошибками
+    формы, и страница обновляется на месте.
+    """
 
     model = Comment
     pk_url_kwarg = 'comment_id'
     template_name = 'blog/comment.html'
+    json_status = HTTPStatus.OK
+
+    def wants_json(self):
+        """Клиент просит JSON, а не HTML-страницу."""
+        return (
+            self.request.accepts('application/json')
+            and not self.request.accepts('text/html')
+        )
+
+    def get_json_data(self):
+        """Данные JSON-ответа: комментарий в разметке списка комментариев."""
+        return {
+            'id': self.object.pk,
+            'html': render_to_string(
+                'includes/comments.html',
+                {
+                    'page_obj': [self.object],
+                    'post': get_post(self.object.post_id)
+                },
+                self.request
+            )
+        }
+
+    def form_valid(self, form):
+        response = super().form_valid(form)
+        if not self.wants_json():
+            return response
+        return JsonResponse(self.get_json_data(), status=self.json_status)
+
+    def form_invalid(self, form):
+        if not self.wants_json():
+            return super().form_invalid(form)
+        return JsonResponse(
+            {'errors': form.errors.get_json_data()},
+            status=HTTPStatus.BAD_REQUEST
+        )
 
     def get_success_url(self):
         """Перенаправление на страницу публикации после успешного действия."""
@@ -3,7 +3,8 @@ from django.db import models
 from django.utils.timezone import now
 
 from .constants import CHAR_FIELD_MAX_LENGTH
-from .services import truncate_text
+from .fields import RenderedHTMLField
+from .services import render_text, truncate_text
 
 User = get_user_model()
 
@@ -19,15 +20,42 @@ class PostQuerySet(models.QuerySet):
             category__is_published=True
         )
 
+    def visible_to(self, user):
+        """Возвращает опубликованные посты и все посты самого пользователя."""
+        visible = models.Q(
+            is_published=True,
+            pub_date__lte=now(),
+            category__is_published=True
+        )
+        if user.is_authenticated:
+            visible |= models.Q(author=user)
+        return self.filter(visible)
+
     def with_comments_count(self):
-        """Добавляет аннотацию с количеством комментов и сортирует по дате."""
+        """
+        Добавляет аннотацию с количеством комментов и сортирует по дате.
+        Связанные объекты не присоединяются: их подставляет карта
+        идентичности запроса (см. caching.paginate_feed).
+        """
         return self.annotate(
             comment_count=models.Count('comments')
-        ).select_related(
-            'author', 'category', 'location'
         ).order_by("-pub_date")
 
 
+class RenderedTextMixin:
+    """
+    Заполняет text_html из text при каждом сохранении,
+    чтобы шаблоны не обрабатывали текст на каждом показе.
+    """
+
+    def save(self, *args, **kwargs):
+        self.text_html = render_text(self.text)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'text' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'text_html'}
+        super().save(*args, **kwargs)
+
+
 class CreatedAtAbstract(models.Model):
     """Абстрактная модель с полем даты создания."""
 
@@ -54,7 +82,7 @@ class IsPublishedCreatedAtAbstract(CreatedAtAbstract):
         abstract = True
 
 
-class Post(IsPublishedCreatedAtAbstract):
+class Post(RenderedTextMixin, IsPublishedCreatedAtAbstract):
     """Публикация."""
 
     objects = PostQuerySet.as_manager()
@@ -64,6 +92,7 @@ class Post(IsPublishedCreatedAtAbstract):
         max_length=CHAR_FIELD_MAX_LENGTH
     )
     text = models.TextField('Текст')
+    text_html = RenderedHTMLField('Текст (HTML)')
     pub_date = models.DateTimeField(
         'Дата и время публикации',
         help_text='Если установить дату и время в будущем — '
@@ -93,6 +122,13 @@ class Post(IsPublishedCreatedAtAbstract):
         blank=True,
         null=True
     )
+    updated_at = models.DateTimeField('Изменено', auto_now=True)
+    # Обновляется пачками из буфера просмотров (см. counters.py).
+    views_count = models.PositiveIntegerField(
+        'Просмотры',
+        default=0,
+        editable=False
+    )
 
     class Meta:
         verbose_name = 'публикация'
@@ -103,6 +139,18 @@ class Post(IsPublishedCreatedAtAbstract):
     def __str__(self):
         return truncate_text(self.title)
 
+    def is_available(self):
+        """
+        Проверяет без запроса к базе те же условия,
+        что и PostQuerySet.filter_posts_by_publication().
+        """
+        return (
+            self.is_published
+            and self.pub_date <= now()
+            and self.category_id is not None
+            and self.category.is_published
+        )
+
 
 class Category(IsPublishedCreatedAtAbstract):
     """Тематическая история."""
@@ -145,7 +193,7 @@ class Location(IsPublishedCreatedAtAbstract):
         return truncate_text(self.name)
 
 
-class Comment(CreatedAtAbstract):
+class Comment(RenderedTextMixin, CreatedAtAbstract):
     """Комментарий к публикации."""
 
     post = models.ForeignKey(
@@ -159,6 +207,8 @@ class Comment(CreatedAtAbstract):
         verbose_name='Автор'
     )
     text = models.TextField('Текст комментария')
+    text_html = RenderedHTMLField('Текст комментария (HTML)')
+    updated_at = models.DateTimeField('Изменено', auto_now=True)
 
     class Meta(CreatedAtAbstract.Meta):
         verbose_name = 'комментарий'
@@ -168,3 +218,173 @@ class Comment(CreatedAtAbstract):
 
     def __str__(self):
         return f'Комментарий {self.author.username} к посту {self.post.id}'
+
+
+class Follow(CreatedAtAbstract):
+    """Подписка читателя на автора."""
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='following',
+        verbose_name='Подписчик'
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='followers',
+        verbose_name='Автор'
+    )
+
+    class Meta(CreatedAtAbstract.Meta):
+        verbose_name = 'подписка'
+        verbose_name_plural = 'Подписки'
+        constraints = (
+            models.UniqueConstraint(
+                fields=('user', 'author'),
+                name='unique_follow'
+            ),
+            models.CheckConstraint(
+                condition=~models.Q(user=models.F('author')),
+                name='no_self_follow'
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.user.username} → {self.author.username}'
+
+
+class TimelineEntry(models.Model):
+    """
+    Строка ленты подписок читателя, записанная при публикации поста.
+    pub_date копируется из поста, чтобы лента читалась по индексу
+    (user, pub_date) без сортировки публикаций.
+    """
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='timeline',
+        verbose_name='Читатель'
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='timeline_entries',
+        verbose_name='Публикация'
+    )
+    pub_date = models.DateTimeField('Дата и время публикации')
+
+    class Meta:
+        verbose_name = 'запись ленты подписок'
+        verbose_name_plural = 'Ленты подписок'
+        constraints = (
+            models.UniqueConstraint(
+                fields=('user', 'post'),
+                name='unique_timeline_entry'
+            ),
+        )
+        indexes = (
+            models.Index(
+                fields=('user', '-pub_date'),
+                name='timeline_user_pub_date'
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.user.username}: {self.post_id}'
+
+
+class LiveEvent(models.Model):
+    """
+    Новый комментарий для живых трансляций публикаций (см. live.py).
+    Таблица служит общей шиной между воркерами: каждый процесс читает
+    её одним запросом и раздаёт события своим подписчикам. Строки
+    недолговечны, поэтому это простые числа, а не внешние ключи.
+    """
+
+    post_id = models.PositiveBigIntegerField('Публикация')
+    comment_id = models.PositiveBigIntegerField('Комментарий')
+    created_at = models.DateTimeField('Добавлено', auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'событие трансляции'
+        verbose_name_plural = 'События трансляций'
+
+    def __str__(self):
+        return f'{self.post_id}: {self.comment_id}'
+
+
+class Task(models.Model):
+    """
+    Отложенная задача локальной очереди (см. tasks.py).
+    Выполненные задачи удаляются, исчерпавшие попытки остаются
+    со статусом failed и текстом последней ошибки.
+    """
+
+    class Status(models.TextChoices):
+        QUEUED = 'queued', 'В очереди'
+        RUNNING = 'running', 'Выполняется'
+        FAILED = 'failed', 'Ошибка'
+
+    name = models.CharField('Задача', max_length=CHAR_FIELD_MAX_LENGTH)
+    args = models.JSONField('Аргументы', default=list)
+    kwargs = models.JSONField('Именованные аргументы', default=dict)
+    priority = models.SmallIntegerField(
+        'Приоритет',
+        default=0,
+        help_text='Задачи с бо́льшим приоритетом выполняются раньше.'
+    )
+    status = models.CharField(
+        'Статус',
+        max_length=16,
+        choices=Status.choices,
+        default=Status.QUEUED
+    )
+    attempts = models.PositiveSmallIntegerField('Попытки', default=0)
+    max_attempts = models.PositiveSmallIntegerField('Наибольшее число попыток')
+    run_after = models.DateTimeField('Не раньше', default=now)
+    locked_at = models.DateTimeField('Взята в работу', null=True, blank=True)
+    last_error = models.TextField('Последняя ошибка', blank=True)
+    created_at = models.DateTimeField('Добавлено', auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'задача'
+        verbose_name_plural = 'Очередь задач'
+        indexes = (
+            models.Index(
+                fields=('status', '-priority', 'run_after'),
+                name='task_queue_order'
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.name} ({self.get_status_display()})'
+
+
+class OutgoingEmail(models.Model):
+    """
+    Письмо, ожидающее отправки (см. mail.py). Хранится готовым
+    MIME-сообщением; отправленные письма удаляются.
+    """
+
+    from_email = models.CharField(
+        'Отправитель', max_length=CHAR_FIELD_MAX_LENGTH
+    )
+    recipients = models.JSONField('Получатели', default=list)
+    subject = models.CharField(
+        'Тема', max_length=CHAR_FIELD_MAX_LENGTH, blank=True
+    )
+    message = models.BinaryField('Сообщение')
+    attempts = models.PositiveSmallIntegerField('Попытки', default=0)
+    locked_at = models.DateTimeField('Взято в работу', null=True, blank=True)
+    last_error = models.TextField('Последняя ошибка', blank=True)
+    created_at = models.DateTimeField('Добавлено', auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'письмо'
+        verbose_name_plural = 'Очередь писем'
+        ordering = ('id',)
+
+    def __str__(self):
+        return self.subject or f'Письмо {self.pk}'
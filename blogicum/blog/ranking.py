@@ -0,0 +1,82 @@
+import time
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.db.models import Count
+from django.utils.timezone import now
+
+from .caching import aget_or_compute, get_or_compute, store_computed
+from .constants import (TRENDING_CACHE_TIMEOUT, TRENDING_INTERVAL,
+                        TRENDING_LIMIT, TRENDING_WINDOW_DAYS)
+from .models import Comment, Post
+
+TRENDING_KEY = 'blog:trending'
+
+
+def compute_trending(limit=TRENDING_LIMIT, window_days=TRENDING_WINDOW_DAYS):
+    """
+    Самые обсуждаемые опубликованные посты за последние window_days дней:
+    общий топ и топ каждой категории. Всё, что нужно для вывода блока,
+    хранится в результате, чтобы показ не требовал других запросов.
+    """
+    rows = (
+        Comment.objects
+        .filter(
+            created_at__gte=now() - timedelta(days=window_days),
+            post__in=Post.objects.filter_posts_by_publication()
+        )
+        .values('post_id', 'post__title', 'post__category_id')
+        .annotate(comments=Count('id'))
+        .order_by('-comments', 'post_id')
+    )
+    posts = []
+    categories = {}
+    for row in rows:
+        item = {
+            'id': row['post_id'],
+            'title': row['post__title'],
+            'comments': row['comments'],
+        }
+        if len(posts) < limit:
+            posts.append(item)
+        category = categories.setdefault(row['post__category_id'], [])
+        if len(category) < limit:
+            category.append(item)
+    return {
+        'posts': posts,
+        'categories': categories,
+        'computed_at': time.time(),
+    }
+
+
+def refresh_trending(**kwargs):
+    """Пересчитывает рейтинг и кладёт его в кэш (для rank_posts)."""
+    trending = compute_trending(**kwargs)
+    store_computed(
+        TRENDING_KEY, trending, TRENDING_INTERVAL, TRENDING_CACHE_TIMEOUT
+    )
+    return trending
+
+
+def get_trending():
+    """
+    Рейтинг из кэша — одно чтение ключа. Обычно его обновляет команда
+    rank_posts; если она не запущена, рейтинг пересчитает один воркер
+    по истечении TRENDING_INTERVAL.
+    """
+    return get_or_compute(
+        TRENDING_KEY,
+        compute_trending,
+        TRENDING_INTERVAL,
+        TRENDING_CACHE_TIMEOUT
+    )
+
+
+async def aget_trending():
+    """Асинхронный get_trending; редкий пересчёт идёт в пуле потоков."""
+    return await aget_or_compute(
+        TRENDING_KEY,
+        sync_to_async(compute_trending),
+        TRENDING_INTERVAL,
+        TRENDING_CACHE_TIMEOUT
+    )
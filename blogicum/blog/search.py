@@ -0,0 +1,252 @@
+import re
+
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from .caching import (body_cache_key, bump_generation, get_generation,
+                      get_or_compute)
+from .constants import (SEARCH_CACHE_TIMEOUT, SEARCH_MAX_RESULTS,
+                        SEARCH_SNIPPET_TOKENS, SEARCH_SOFT_TIMEOUT,
+                        TASK_PRIORITY_SEARCH)
+from .models import Comment, Post
+from .tasks import task
+
+# Полнотекстовый индекс SQLite FTS5. Таблицы хранят копию текста,
+# rowid строки индекса равен id публикации или комментария.
+POST_INDEX = 'blog_post_fts'
+COMMENT_INDEX = 'blog_comment_fts'
+
+# Поколение поиска: меняется при изменении публикаций и комментариев
+# и сбрасывает закэшированные результаты.
+SEARCH_SCOPE = 'search'
+
+# Границы совпадения во фрагменте: управляющие символы не встречаются
+# в тексте и переживают экранирование HTML.
+MATCH_START = '\x02'
+MATCH_END = '\x03'
+
+
+def is_available(using=connection):
+    """FTS5 есть только в SQLite; на других базах поиск идёт через LIKE."""
+    return using.vendor == 'sqlite'
+
+
+def match_expression(query, column=None):
+    """
+    Переводит запрос пользователя в выражение MATCH: каждое слово
+    берётся в кавычки как префикс, слова объединяются через AND.
+    Операторы FTS5 из запроса не интерпретируются.
+    """
+    words = re.findall(r'\w+', query)
+    if not words:
+        return None
+    expression = ' '.join(f'"{word}"*' for word in words)
+    return f'{column} : ({expression})' if column else expression
+
+
+def normalize_query(query):
+    """
+    Нормализует запрос для ключа кэша: порядок, регистр и повторы слов
+    не влияют ни на найденное, ни на ранжирование.
+    """
+    return ' '.join(sorted({word.lower() for word in re.findall(
+        r'\w+', query
+    )}))
+
+
+def _execute(sql, params=()):
+    if is_available():
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+
+
+def index_post(post):
+    _execute(f'DELETE FROM {POST_INDEX} WHERE rowid = %s', [post.pk])
+    _execute(
+        f'INSERT INTO {POST_INDEX} (rowid, title, text) VALUES (%s, %s, %s)',
+        [post.pk, post.title, post.text]
+    )
+
+
+def unindex_post(post_id):
+    _execute(f'DELETE FROM {POST_INDEX} WHERE rowid = %s', [post_id])
+
+
+def index_comment(comment):
+    _execute(f'DELETE FROM {COMMENT_INDEX} WHERE rowid = %s', [comment.pk])
+    _execute(
+        f'INSERT INTO {COMMENT_INDEX} (rowid, text) VALUES (%s, %s)',
+        [comment.pk, comment.text]
+    )
+
+
+def unindex_comment(comment_id):
+    _execute(f'DELETE FROM {COMMENT_INDEX} WHERE rowid = %s', [comment_id])
+
+
+@task(priority=TASK_PRIORITY_SEARCH)
+def reindex_post(post_id):
+    """Переиндексирует публикацию из очереди задач."""
+    post = Post.objects.filter(pk=post_id).only('title', 'text').first()
+    if post is None:
+        unindex_post(post_id)
+    else:
+        index_post(post)
+    bump_generation(SEARCH_SCOPE)
+
+
+@task(priority=TASK_PRIORITY_SEARCH)
+def reindex_comment(comment_id):
+    """Переиндексирует комментарий из очереди задач."""
+    comment = Comment.objects.filter(pk=comment_id).only('text').first()
+    if comment is None:
+        unindex_comment(comment_id)
+    else:
+        index_comment(comment)
+    bump_generation(SEARCH_SCOPE)
+
+
+def rebuild():
+    """Заполняет индекс заново из таблиц публикаций и комментариев."""
+    _execute(f'DELETE FROM {POST_INDEX}')
+    _execute(
+        f'INSERT INTO {POST_INDEX} (rowid, title, text) '
+        'SELECT id, title, text FROM blog_post'
+    )
+    _execute(f'DELETE FROM {COMMENT_INDEX}')
+    _execute(
+        f'INSERT INTO {COMMENT_INDEX} (rowid, text) '
+        'SELECT id, text FROM blog_comment'
+    )
+    for table in (POST_INDEX, COMMENT_INDEX):
+        _execute(f"INSERT INTO {table} ({table}) VALUES ('optimize')")
+
+
+def matching_ids(index, query, column=None):
+    """
+    Подзапрос id строк индекса, подходящих под запрос, —
+    для фильтра id__in без выгрузки id в Python.
+    """
+    return RawSQL(
+        f'SELECT rowid FROM {index} WHERE {index} MATCH %s',
+        [match_expression(query, column)]
+    )
+
+
+def search_post_ids(query):
+    """
+    Видимые публикации (id) по запросу в порядке релевантности (bm25):
+    сначала совпадения в заголовке и тексте, затем публикации
+    с подходящими комментариями.
+    """
+    expression = match_expression(query)
+    if expression is None:
+        return []
+    if not is_available():
+        return list(
+            Post.objects.filter_posts_by_publication()
+            .filter(Q(title__icontains=query) | Q(text__icontains=query))
+            .values_list('id', flat=True)[:SEARCH_MAX_RESULTS]
+        )
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'SELECT rowid FROM {POST_INDEX} WHERE {POST_INDEX} MATCH %s '
+            'ORDER BY rank LIMIT %s',
+            [expression, SEARCH_MAX_RESULTS]
+        )
+        ranked = [row[0] for row in cursor.fetchall()]
+        cursor.execute(
+            f'SELECT c.post_id FROM {COMMENT_INDEX} AS f '
+            'JOIN blog_comment AS c ON c.id = f.rowid '
+            f'WHERE {COMMENT_INDEX} MATCH %s ORDER BY f.rank LIMIT %s',
+            [expression, SEARCH_MAX_RESULTS]
+        )
+        ranked.extend(row[0] for row in cursor.fetchall())
+    ranked = list(dict.fromkeys(ranked))
+    visible = set(
+        Post.objects.filter_posts_by_publication()
+        .filter(id__in=ranked)
+        .values_list('id', flat=True)
+    )
+    return [
+        post_id for post_id in ranked if post_id in visible
+    ][:SEARCH_MAX_RESULTS]
+
+
+def _cache_key(kind, *parts):
+    return (
+        f'blog:search:{kind}:{get_generation(SEARCH_SCOPE)}:'
+        f'{body_cache_key(*parts)}'
+    )
+
+
+def cached_search_post_ids(query):
+    """
+    search_post_ids() с кэшем по нормализованному запросу.
+    Список хранится целиком, страницы нарезаются из него.
+    """
+    query = normalize_query(query)
+    if not query:
+        return []
+    return get_or_compute(
+        _cache_key('ids', query),
+        lambda: search_post_ids(query),
+        SEARCH_SOFT_TIMEOUT,
+        SEARCH_CACHE_TIMEOUT
+    )
+
+
+def _mark_up(snippet):
+    return mark_safe(
+        escape(snippet)
+        .replace(MATCH_START, '<mark>')
+        .replace(MATCH_END, '</mark>')
+    )
+
+
+def _build_snippets(expression, post_ids):
+    """
+    Фрагменты с подсветкой строит snippet() FTS5 по данным индекса,
+    без загрузки текстов публикаций. Для публикаций, найденных только
+    по комментариям, берётся фрагмент лучшего комментария.
+    """
+    placeholders = ', '.join(['%s'] * len(post_ids))
+    snippet_args = [MATCH_START, MATCH_END, '…', SEARCH_SNIPPET_TOKENS]
+    snippets = {}
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'SELECT rowid, snippet({POST_INDEX}, -1, %s, %s, %s, %s) '
+            f'FROM {POST_INDEX} WHERE {POST_INDEX} MATCH %s '
+            f'AND rowid IN ({placeholders})',
+            [*snippet_args, expression, *post_ids]
+        )
+        snippets.update(cursor.fetchall())
+        cursor.execute(
+            f'SELECT c.post_id, snippet({COMMENT_INDEX}, 0, %s, %s, %s, %s) '
+            f'FROM {COMMENT_INDEX} AS f '
+            'JOIN blog_comment AS c ON c.id = f.rowid '
+            f'WHERE {COMMENT_INDEX} MATCH %s '
+            f'AND c.post_id IN ({placeholders}) ORDER BY f.rank',
+            [*snippet_args, expression, *post_ids]
+        )
+        for post_id, snippet in cursor.fetchall():
+            snippets.setdefault(post_id, snippet)
+    return {
+        post_id: _mark_up(snippet) for post_id, snippet in snippets.items()
+    }
+
+
+def get_snippets(query, post_ids):
+    """Фрагменты с подсветкой для страницы результатов: {id: html}."""
+    query = normalize_query(query)
+    if not query or not post_ids or not is_available():
+        return {}
+    return get_or_compute(
+        _cache_key('snippets', query, list(post_ids)),
+        lambda: _build_snippets(match_expression(query), post_ids),
+        SEARCH_SOFT_TIMEOUT,
+        SEARCH_CACHE_TIMEOUT
+    )
@@ -1,7 +1,6 @@
-from django.core.paginator import Paginator
-from django.db.models import QuerySet
+from django.template.defaultfilters import linebreaksbr
 
-from .constants import (POSTS_LIMIT_ON_PAGE, TRUNCATE_LENGTH)
+from .constants import TRUNCATE_LENGTH
 
 
 def truncate_text(text, length=TRUNCATE_LENGTH):
@@ -9,11 +8,6 @@ def truncate_text(text, length=TRUNCATE_LENGTH):
     return text[:length] + '...' if len(text) > length else text
 
 
-def paginate_posts(
-        posts: QuerySet,
-        page_number: str,
-        page_size: int = POSTS_LIMIT_ON_PAGE
-):
-    """Создает пагинатор для постов и возвращает страницу."""
-    paginator = Paginator(posts, page_size)
-    return paginator.get_page(page_number)
+def render_text(text):
+    """Экранирует текст и заменяет переводы строк на <br> (для шаблонов)."""
+    return linebreaksbr(text, autoescape=True)
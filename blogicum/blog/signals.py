@@ -0,0 +1,270 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.signals import (post_delete, post_save, pre_delete,
+                                      pre_save)
+from django.dispatch import receiver
+
+from . import autocomplete, live, search
+from .caching import (INDEX_FEED, RELATED_SCOPE, author_feed,
+                      bump_generation, category_feed,
+                      invalidate_comment_pages, invalidate_posts)
+from .constants import COMMENTS_LIMIT_ON_PAGE
+from .identity_map import related_cache_key
+from .models import Category, Comment, Follow, Location, Post
+from .timeline import backfill_task, deliver_post_task, remove_author
+
+User = get_user_model()
+
+# Поля публикации, от которых зависят состав и порядок лент.
+FEED_FIELDS = ('is_published', 'pub_date', 'category_id', 'author_id')
+
+
+def _post_feeds(state):
+    """Ленты, в которые может входить публикация с таким состоянием."""
+    return (
+        INDEX_FEED,
+        category_feed(state['category_id']),
+        author_feed(state['author_id']),
+    )
+
+
+@receiver(pre_save, sender=Post)
+def remember_post_feed_state(sender, instance, **kwargs):
+    """Запоминает прежнее положение публикации в лентах."""
+    instance._old_feed_state = (
+        sender.objects.filter(pk=instance.pk).values(*FEED_FIELDS).first()
+        if instance.pk else None
+    )
+
+
+@receiver(post_save, sender=Post)
+def invalidate_saved_post(sender, instance, created, **kwargs):
+    """
+    Сбрасывает кэш публикации, а ленты — только если изменилось
+    её положение в них.
+    """
+    invalidate_posts([instance.pk])
+    old_state = getattr(instance, '_old_feed_state', None)
+    new_state = {field: getattr(instance, field) for field in FEED_FIELDS}
+    if created or old_state != new_state:
+        bump_generation(*_post_feeds(new_state))
+        if old_state:
+            bump_generation(*_post_feeds(old_state))
+
+
+@receiver(post_save, sender=Post)
+def deliver_saved_post(sender, instance, created, **kwargs):
+    """
+    Ставит в очередь раскладку поста по лентам подписок при публикации
+    и её смене: у автора могут быть тысячи подписчиков.
+    """
+    old_state = getattr(instance, '_old_feed_state', None)
+    if created or old_state is None or any(
+        old_state[field] != getattr(instance, field)
+        for field in ('is_published', 'pub_date')
+    ):
+        deliver_post_task.enqueue_on_commit(instance.pk)
+
+
+@receiver(post_delete, sender=Post)
+def invalidate_deleted_post(sender, instance, **kwargs):
+    invalidate_posts([instance.pk])
+    bump_generation(*_post_feeds(
+        {field: getattr(instance, field) for field in FEED_FIELDS}
+    ))
+
+
+def _comment_page_number(comment):
+    """Номер страницы комментария в порядке (created_at, id)."""
+    before = Comment.objects.filter(post_id=comment.post_id).filter(
+        Q(created_at__lt=comment.created_at)
+        | Q(created_at=comment.created_at, id__lt=comment.pk)
+    ).count()
+    return before // COMMENTS_LIMIT_ON_PAGE + 1
+
+
+@receiver(post_save, sender=Comment)
+def invalidate_saved_comment(sender, instance, **kwargs):
+    """
+    Счётчик комментариев хранится в кэше публикации. Новый комментарий
+    попадает на последнюю страницу, правка меняет только свою страницу.
+    """
+    invalidate_posts([instance.post_id])
+    invalidate_comment_pages(
+        instance.post_id, [_comment_page_number(instance)]
+    )
+
+
+@receiver(post_save, sender=Comment)
+def broadcast_new_comment(sender, instance, created, **kwargs):
+    """Публикует новый комментарий в живые трансляции после коммита."""
+    if created:
+        transaction.on_commit(lambda: live.publish_comment(instance))
+
+
+@receiver(post_delete, sender=Comment)
+def invalidate_deleted_comment(sender, instance, origin=None, **kwargs):
+    """
+    Удаление сдвигает последующие комментарии, поэтому сбрасываются
+    страница удалённого комментария и все страницы после неё.
+    """
+    invalidate_posts([instance.post_id])
+    if isinstance(origin, Post):
+        return
+    remaining = Comment.objects.filter(post_id=instance.post_id).count()
+    invalidate_comment_pages(
+        instance.post_id,
+        range(
+            _comment_page_number(instance),
+            remaining // COMMENTS_LIMIT_ON_PAGE + 2
+        )
+    )
+
+
+@receiver(post_save, sender=Follow)
+def backfill_timeline(sender, instance, created, **kwargs):
+    if created:
+        backfill_task.enqueue_on_commit(instance.pk)
+
+
+@receiver(post_delete, sender=Follow)
+def clear_timeline(sender, instance, **kwargs):
+    remove_author(instance)
+
+
+@receiver(post_save, sender=Post)
+def index_saved_post(sender, instance, **kwargs):
+    """Индексация уходит в очередь, удаление из индекса — сразу."""
+    search.reindex_post.enqueue_on_commit(instance.pk)
+
+
+@receiver(post_delete, sender=Post)
+def unindex_deleted_post(sender, instance, **kwargs):
+    search.unindex_post(instance.pk)
+    bump_generation(search.SEARCH_SCOPE)
+
+
+@receiver(post_save, sender=Comment)
+def index_saved_comment(sender, instance, **kwargs):
+    search.reindex_comment.enqueue_on_commit(instance.pk)
+
+
+@receiver(post_delete, sender=Comment)
+def unindex_deleted_comment(sender, instance, **kwargs):
+    search.unindex_comment(instance.pk)
+    bump_generation(search.SEARCH_SCOPE)
+
+
+@receiver(pre_delete, sender=Category)
+@receiver(pre_delete, sender=Location)
+def invalidate_related_posts(sender, instance, **kwargs):
+    """
+    Связь публикаций обнуляется через UPDATE без сигналов,
+    поэтому сбрасываем кэш этих публикаций заранее.
+    """
+    invalidate_posts(instance.posts.values_list('id', flat=True))
+
+
+def _category_author_feeds(category):
+    """Ленты профилей авторов, у которых есть публикации в категории."""
+    return [
+        author_feed(author_id)
+        for author_id in Post.objects.filter(
+            category_id=category.pk
+        ).values_list('author_id', flat=True).distinct()
+    ]
+
+
+@receiver(pre_delete, sender=Category)
+def remember_category_authors(sender, instance, **kwargs):
+    """После удаления категории её публикации уже не найти по category_id."""
+    instance._author_feeds = _category_author_feeds(instance)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_category(sender, instance, **kwargs):
+    cache.delete(related_cache_key(sender, instance.pk))
+    author_feeds = getattr(instance, '_author_feeds', None)
+    if author_feeds is None:
+        author_feeds = _category_author_feeds(instance)
+    bump_generation(
+        INDEX_FEED, category_feed(instance.pk), RELATED_SCOPE, *author_feeds
+    )
+
+
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def invalidate_location(sender, instance, **kwargs):
+    cache.delete(related_cache_key(sender, instance.pk))
+    bump_generation(RELATED_SCOPE)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user(sender, instance, signal, created=False, **kwargs):
+    """
+    Из пользователя в карточках постов выводится только имя, поэтому
+    тела страниц сбрасываются, лишь когда оно изменилось или пользователь
+    удалён. Регистрация, вход и смена пароля их не трогают. Прежнее имя
+    запоминает remember_autocomplete_entry.
+    """
+    cache.delete(related_cache_key(sender, instance.pk))
+    if created:
+        return
+    old_entry = getattr(instance, '_old_autocomplete_entry', None)
+    if (signal is post_delete
+            or old_entry != autocomplete.user_entry(instance)):
+        bump_generation(RELATED_SCOPE)
+
+
+# Модель → (индекс автодополнения, запись индекса для объекта).
+_AUTOCOMPLETE_KINDS = {
+    User: (autocomplete.USERS, autocomplete.user_entry),
+    Category: (autocomplete.CATEGORIES, autocomplete.category_entry),
+}
+
+
+@receiver(pre_save, sender=User)
+@receiver(pre_save, sender=Category)
+def remember_autocomplete_entry(sender, instance, update_fields=None,
+                                **kwargs):
+    """
+    Запоминает прежнюю запись индекса автодополнения.
+    Вход пользователя сохраняет только last_login — его не перечитываем.
+    """
+    _, make_entry = _AUTOCOMPLETE_KINDS[sender]
+    if update_fields is not None and not {'username', 'title', 'slug',
+                                          'is_published'} & update_fields:
+        instance._old_autocomplete_entry = make_entry(instance)
+        return
+    old = instance.pk and sender.objects.filter(pk=instance.pk).first()
+    instance._old_autocomplete_entry = make_entry(old) if old else None
+
+
+@receiver(post_save, sender=User)
+@receiver(post_save, sender=Category)
+def update_autocomplete(sender, instance, **kwargs):
+    """
+    Переносит в индекс автодополнения только изменившиеся записи
+    и только после коммита: откат не должен попасть в журнал изменений.
+    """
+    kind, make_entry = _AUTOCOMPLETE_KINDS[sender]
+    old_entry = getattr(instance, '_old_autocomplete_entry', None)
+    new_entry = make_entry(instance)
+    if old_entry != new_entry:
+        transaction.on_commit(
+            lambda: autocomplete.record_change(kind, old_entry, new_entry)
+        )
+
+
+@receiver(post_delete, sender=User)
+@receiver(post_delete, sender=Category)
+def remove_from_autocomplete(sender, instance, **kwargs):
+    kind, make_entry = _AUTOCOMPLETE_KINDS[sender]
+    removed = make_entry(instance)
+    transaction.on_commit(
+        lambda: autocomplete.record_change(kind, removed=removed)
+    )
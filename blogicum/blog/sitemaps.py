@@ -0,0 +1,153 @@
+import os
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.utils.xmlutils import SimplerXMLGenerator
+
+from .constants import SITEMAP_CHUNK_SIZE, SITEMAP_SHARD_SIZE
+from .models import Category, Post
+
+User = get_user_model()
+
+SITEMAP_NAMESPACE = 'http://www.sitemaps.org/schemas/sitemap/0.9'
+INDEX_NAME = 'sitemap.xml'
+SHARD_PREFIX = 'sitemap-'
+
+
+def sitemaps_dir():
+    return Path(settings.SITEMAPS_DIR)
+
+
+def iter_keyset(queryset, fields, chunk_size=SITEMAP_CHUNK_SIZE):
+    """
+    Перебирает строки queryset по возрастанию id пачками id > последнего.
+    В отличие от OFFSET, каждый запрос читает только свою пачку
+    по индексу первичного ключа, как бы далеко ни ушёл перебор.
+    """
+    last_id = 0
+    while True:
+        rows = list(
+            queryset.filter(id__gt=last_id).order_by('id').values_list(
+                'id', *fields
+            )[:chunk_size]
+        )
+        yield from rows
+        if len(rows) < chunk_size:
+            return
+        last_id = rows[-1][0]
+
+
+def _sections():
+    """Разделы: имя → (queryset, поля, «строка → (путь, lastmod)»)."""
+    return {
+        'posts': (
+            Post.objects.filter_posts_by_publication(),
+            ('updated_at',),
+            lambda row: (
+                reverse('blog:post_detail', args=(row[0],)), row[1]
+            ),
+        ),
+        'categories': (
+            Category.objects.filter(is_published=True),
+            ('slug',),
+            lambda row: (
+                reverse('blog:category_posts', args=(row[1],)), None
+            ),
+        ),
+        'profiles': (
+            User.objects.filter(is_active=True),
+            ('username',),
+            lambda row: (reverse('blog:profile', args=(row[1],)), None),
+        ),
+    }
+
+
+class _SitemapWriter:
+    """
+    Пишет файл карты по мере перебора, не держа адреса в памяти.
+    root — корневой элемент (urlset или sitemapindex), element — элемент
+    записи (url или sitemap). Файл пишется во временный и подменяет
+    прежний только целиком, чтобы поисковик не получил недописанную карту.
+    """
+
+    def __init__(self, path, root='urlset', element='url'):
+        self.path = path
+        self.lastmod = None
+        self._root = root
+        self._element = element
+        self._file = open(path.with_suffix('.tmp'), 'w', encoding='utf-8')
+        self._xml = SimplerXMLGenerator(self._file, 'utf-8')
+        self._xml.startDocument()
+        self._xml.startElement(root, {'xmlns': SITEMAP_NAMESPACE})
+
+    def add(self, location, lastmod=None):
+        self._xml.startElement(self._element, {})
+        self._xml.addQuickElement('loc', location)
+        if lastmod is not None:
+            self._xml.addQuickElement('lastmod', lastmod.isoformat())
+            self.lastmod = max(self.lastmod or lastmod, lastmod)
+        self._xml.endElement(self._element)
+
+    def close(self):
+        self._xml.endElement(self._root)
+        self._xml.endDocument()
+        self._file.close()
+        os.replace(self._file.name, self.path)
+
+
+def _write_section(name, rows, make_entry, base_url, shard_size):
+    """
+    Раскладывает раздел по файлам диапазонов id: в файл N попадают
+    id от N * shard_size до (N + 1) * shard_size - 1. Так файл меняется,
+    только когда меняются объекты его диапазона.
+    """
+    shards = []
+    writer = shard = None
+    for row in rows:
+        if row[0] // shard_size != shard:
+            if writer:
+                writer.close()
+            shard = row[0] // shard_size
+            writer = _SitemapWriter(
+                sitemaps_dir() / f'{SHARD_PREFIX}{name}-{shard}.xml'
+            )
+            shards.append(writer)
+        location, lastmod = make_entry(row)
+        writer.add(base_url + location, lastmod)
+    if writer:
+        writer.close()
+    return shards
+
+
+def build_sitemaps(base_url=None, shard_size=SITEMAP_SHARD_SIZE):
+    """
+    Собирает карту сайта в SITEMAPS_DIR: файлы разделов и индекс
+    sitemap.xml со ссылками на них. Файлы диапазонов, ставших пустыми,
+    удаляются. Возвращает имена записанных файлов разделов.
+    """
+    base_url = (base_url or settings.SITE_URL).rstrip('/')
+    sitemaps_dir().mkdir(parents=True, exist_ok=True)
+    shards = []
+    for name, (queryset, fields, make_entry) in _sections().items():
+        shards += _write_section(
+            name, iter_keyset(queryset, fields), make_entry,
+            base_url, shard_size
+        )
+
+    index = _SitemapWriter(
+        sitemaps_dir() / INDEX_NAME, 'sitemapindex', 'sitemap'
+    )
+    for shard in shards:
+        index.add(
+            base_url + reverse('blog:sitemap_shard', args=(shard.path.name,)),
+            shard.lastmod
+        )
+    index.close()
+
+    names = {shard.path.name for shard in shards}
+    for path in sitemaps_dir().glob(f'{SHARD_PREFIX}*.xml'):
+        if path.name not in names:
+            path.unlink()
+    return sorted(names)
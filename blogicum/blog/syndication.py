@@ -0,0 +1,147 @@
+from io import StringIO
+
+from django.http import Http404, StreamingHttpResponse
+from django.urls import reverse
+from django.utils.feedgenerator import Atom1Feed, Rss201rev2Feed
+from django.utils.xmlutils import SimplerXMLGenerator
+
+from .caching import paginate_feed
+from .conditional import conditional_response
+from .constants import SYNDICATION_ITEMS
+
+
+class StreamingFeedMixin:
+    """
+    Отдаёт ленту по частям: заголовок документа, затем каждая запись,
+    затем окончание, — не собирая весь XML в памяти. Части пишут методы
+    start_document, write_item и end_document класса формата.
+    """
+
+    def latest_post_date(self):
+        # Записи не хранятся в self.items, дата передаётся заранее.
+        return self.feed.get('latest_post_date') or super().latest_post_date()
+
+    def make_item(self, **kwargs):
+        """Запись в формате feedgenerator без накопления в self.items."""
+        self.add_item(**kwargs)
+        return self.items.pop()
+
+    def stream(self, items, encoding='utf-8'):
+        buffer = StringIO()
+        handler = SimplerXMLGenerator(
+            buffer, encoding, short_empty_elements=True
+        )
+
+        def drain():
+            chunk = buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            return chunk
+
+        handler.startDocument()
+        self.start_document(handler)
+        yield drain()
+        for item in items:
+            self.write_item(handler, item)
+            yield drain()
+        self.end_document(handler)
+        yield drain()
+
+
+class StreamingRssFeed(StreamingFeedMixin, Rss201rev2Feed):
+
+    def start_document(self, handler):
+        handler.startElement('rss', self.rss_attributes())
+        handler.startElement('channel', self.root_attributes())
+        self.add_root_elements(handler)
+
+    def write_item(self, handler, item):
+        handler.startElement('item', self.item_attributes(item))
+        self.add_item_elements(handler, item)
+        handler.endElement('item')
+
+    def end_document(self, handler):
+        self.endChannelElement(handler)
+        handler.endElement('rss')
+
+
+class StreamingAtomFeed(StreamingFeedMixin, Atom1Feed):
+
+    def start_document(self, handler):
+        handler.startElement('feed', self.root_attributes())
+        self.add_root_elements(handler)
+
+    def write_item(self, handler, item):
+        handler.startElement('entry', self.item_attributes(item))
+        self.add_item_elements(handler, item)
+        handler.endElement('entry')
+
+    def end_document(self, handler):
+        handler.endElement('feed')
+
+
+FEED_FORMATS = {
+    'rss': StreamingRssFeed,
+    'atom': StreamingAtomFeed,
+}
+
+
+def feed_response(request, feed_format, posts, scope, title, link,
+                  description):
+    """
+    RSS или Atom с последними публикациями ленты.
+    Список публикаций берётся из того же кэша и с тем же поколением,
+    что и HTML-лента, поэтому сбрасывается теми же событиями, а ETag
+    строится из ключа версии страницы (поколений ленты) без загрузки
+    публикаций.
+    """
+    feed_class = FEED_FORMATS.get(feed_format)
+    if feed_class is None:
+        raise Http404
+    page = paginate_feed(
+        request, posts, scope, 1,
+        variant='syndication', page_size=SYNDICATION_ITEMS
+    )
+
+    def render_response():
+        absolute = request.build_absolute_uri
+
+        def chunks():
+            posts = list(page.object_list)
+            feed = feed_class(
+                title=title,
+                link=absolute(link),
+                description=description,
+                feed_url=absolute(),
+                language='ru',
+                latest_post_date=max(
+                    (post.updated_at for post in posts), default=None
+                )
+            )
+            items = (
+                feed.make_item(
+                    title=post.title,
+                    link=absolute(
+                        reverse('blog:post_detail', args=(post.id,))
+                    ),
+                    description=post.text_html or post.text,
+                    author_name=post.author.username,
+                    pubdate=post.pub_date,
+                    updateddate=post.updated_at,
+                    categories=(
+                        [post.category.title] if post.category else None
+                    ),
+                )
+                for post in posts
+            )
+            yield from feed.stream(items)
+
+        return StreamingHttpResponse(
+            chunks(), content_type=feed_class.content_type
+        )
+
+    # Ленты одинаковы для всех читателей: их можно хранить в общих кэшах.
+    return conditional_response(
+        request, ('syndication', feed_format, page.body_key), render_response,
+        public=True
+    )
@@ -0,0 +1,172 @@
+import logging
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DatabaseError, transaction
+from django.utils.timezone import now
+
+from .constants import TASK_LOCK_TIMEOUT, TASK_MAX_ATTEMPTS, TASK_RETRY_DELAY
+from .models import Task
+
+# Локальная очередь задач на таблице Task, без внешнего брокера.
+# Медленные побочные действия запроса ставятся в очередь после коммита
+# (enqueue_on_commit), а выполняет их команда run_tasks. С настройкой
+# BLOG_TASKS_EAGER задачи выполняются сразу при постановке (тоже после
+# коммита) — так работают тесты и сервер разработки; ошибка такой задачи
+# пишется в журнал и не доходит до запроса. Модули с задачами
+# импортируются в BlogConfig.ready, поэтому реестр заполнен в любом
+# процессе воркера.
+
+logger = logging.getLogger(__name__)
+
+_registry = {}
+
+
+def task(priority=0, max_attempts=TASK_MAX_ATTEMPTS):
+    """
+    Регистрирует функцию как задачу очереди.
+    Аргументы задачи хранятся в JSON, поэтому передаются id, а не объекты.
+
+    @task(priority=TASK_PRIORITY_SEARCH)
+    def reindex_post(post_id): ...
+
+    reindex_post.enqueue_on_commit(post.pk)
+    """
+    def decorator(func):
+        func.task_name = f'{func.__module__}.{func.__qualname__}'
+        func.priority = priority
+        func.max_attempts = max_attempts
+        func.enqueue = lambda *args, **kwargs: enqueue(func, args, kwargs)
+        func.enqueue_on_commit = (
+            lambda *args, **kwargs: enqueue_on_commit(func, args, kwargs)
+        )
+        _registry[func.task_name] = func
+        return func
+    return decorator
+
+
+def enqueue(func, args=(), kwargs=None, priority=None, delay=0,
+            unique=False):
+    """
+    Ставит задачу в очередь; возвращает Task или None (eager).
+    С unique=True задача не ставится, если такая же уже ждёт
+    и выполнится не позже.
+    """
+    if settings.BLOG_TASKS_EAGER:
+        try:
+            func(*args, **(kwargs or {}))
+        except Exception:
+            logger.exception('Задача %s завершилась ошибкой.', func.task_name)
+        return None
+    run_after = now() + timedelta(seconds=delay)
+    if unique and Task.objects.filter(
+        name=func.task_name,
+        args=list(args),
+        kwargs=kwargs or {},
+        status=Task.Status.QUEUED,
+        run_after__lte=run_after
+    ).exists():
+        return None
+    return Task.objects.create(
+        name=func.task_name,
+        args=list(args),
+        kwargs=kwargs or {},
+        priority=func.priority if priority is None else priority,
+        max_attempts=func.max_attempts,
+        run_after=run_after
+    )
+
+
+def enqueue_on_commit(func, args=(), kwargs=None, **options):
+    """
+    Ставит задачу в очередь после коммита текущей транзакции, чтобы
+    воркер не увидел данных, которых ещё нет (или уже не будет) в базе.
+    Вне транзакции задача ставится сразу.
+    """
+    transaction.on_commit(lambda: enqueue(func, args, kwargs, **options))
+
+
+def requeue_stale():
+    """Возвращает в очередь задачи воркеров, которые не отчитались."""
+    return Task.objects.filter(
+        status=Task.Status.RUNNING,
+        locked_at__lt=now() - timedelta(seconds=TASK_LOCK_TIMEOUT)
+    ).update(status=Task.Status.QUEUED, locked_at=None)
+
+
+def claim(limit):
+    """
+    Забирает до limit готовых задач: сначала с бо́льшим приоритетом,
+    при равном — старые. Задача достаётся одному воркеру: UPDATE
+    с условием status=queued срабатывает только у первого.
+    """
+    candidates = Task.objects.filter(
+        status=Task.Status.QUEUED, run_after__lte=now()
+    ).order_by('-priority', 'run_after', 'id').values_list(
+        'id', flat=True
+    )[:limit * 2]
+    claimed = []
+    for task_id in candidates:
+        if len(claimed) == limit:
+            break
+        if Task.objects.filter(
+            id=task_id, status=Task.Status.QUEUED
+        ).update(status=Task.Status.RUNNING, locked_at=now()):
+            claimed.append(task_id)
+    return claimed
+
+
+def run_task(task_id):
+    """
+    Выполняет взятую задачу. Успешная задача удаляется, упавшая
+    возвращается в очередь с удвоенной паузой, пока есть попытки.
+    Возвращает True при успехе.
+    """
+    task_row = Task.objects.filter(
+        id=task_id, status=Task.Status.RUNNING
+    ).first()
+    if task_row is None:
+        return False
+    func = _registry.get(task_row.name)
+    if func is None:
+        # Выполняются только зарегистрированные через @task функции.
+        task_row.status = Task.Status.FAILED
+        task_row.locked_at = None
+        task_row.last_error = f'Неизвестная задача {task_row.name}.'
+        task_row.save(update_fields=('status', 'locked_at', 'last_error'))
+        return False
+    try:
+        func(*task_row.args, **task_row.kwargs)
+    except Exception:
+        task_row.attempts += 1
+        task_row.last_error = traceback.format_exc()
+        task_row.locked_at = None
+        if task_row.attempts < task_row.max_attempts:
+            task_row.status = Task.Status.QUEUED
+            task_row.run_after = now() + timedelta(
+                seconds=TASK_RETRY_DELAY * 2 ** (task_row.attempts - 1)
+            )
+        else:
+            task_row.status = Task.Status.FAILED
+        _report(task_row.save, update_fields=(
+            'attempts', 'last_error', 'locked_at', 'status', 'run_after'
+        ))
+        return False
+    # Задачи повторяемы: если строку не удалось удалить, задачу ещё раз
+    # выполнит воркер после requeue_stale.
+    return _report(task_row.delete)
+
+
+def _report(write, **kwargs):
+    """
+    Записывает итог задачи. Ошибка базы (например, занятая таблица
+    SQLite) не должна остановить воркер: строка останется running,
+    и requeue_stale вернёт её в очередь.
+    """
+    try:
+        write(**kwargs)
+    except DatabaseError:
+        logger.exception('Не удалось записать итог задачи.')
+        return False
+    return True
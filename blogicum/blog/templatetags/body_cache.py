@@ -0,0 +1,51 @@
+from django import template
+from django.core.cache import cache
+
+from blog.constants import BODY_CACHE_TIMEOUT
+
+register = template.Library()
+
+
+def body_storage_key(key):
+    """Ключ кэша, под которым хранится тело страницы."""
+    return f'blog:body:{key}'
+
+
+class CachedBodyNode(template.Node):
+    def __init__(self, nodelist, key):
+        self.nodelist = nodelist
+        self.key = key
+
+    def render(self, context):
+        key = self.key.resolve(context)
+        if not key:
+            return self.nodelist.render(context)
+        cache_key = body_storage_key(key)
+        # Асинхронные представления читают тело заранее и передают его
+        # в prefetched_bodies, чтобы шаблон не ходил в кэш повторно.
+        body = context.get('prefetched_bodies', {}).get(key)
+        if body is None:
+            body = cache.get(cache_key)
+        if body is None:
+            body = self.nodelist.render(context)
+            cache.set(cache_key, body, BODY_CACHE_TIMEOUT)
+        return body
+
+
+@register.tag
+def cached_body(parser, token):
+    """
+    Кэширует тело страницы по готовому ключу версии.
+    Всё, что вне тега (шапка с именем пользователя), рендерится
+    на каждый запрос. Пустой ключ отключает кэширование.
+
+    {% cached_body page_obj.body_key %}...{% endcached_body %}
+    """
+    bits = token.split_contents()
+    if len(bits) != 2:
+        raise template.TemplateSyntaxError(
+            f"'{bits[0]}' принимает ровно один аргумент — ключ."
+        )
+    nodelist = parser.parse(('endcached_body',))
+    parser.delete_first_token()
+    return CachedBodyNode(nodelist, parser.compile_filter(bits[1]))
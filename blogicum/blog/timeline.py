@@ -0,0 +1,136 @@
+from django.core.paginator import Paginator
+from django.db.models import Count
+
+from .caching import get_or_compute, get_posts
+from .constants import (MEGA_AUTHORS_CACHE_TIMEOUT,
+                        MEGA_AUTHORS_SOFT_TIMEOUT, POST_RELATED_FIELDS,
+                        POSTS_LIMIT_ON_PAGE, TASK_PRIORITY_TIMELINE,
+                        TIMELINE_BACKFILL, TIMELINE_BATCH_SIZE,
+                        TIMELINE_FANOUT_LIMIT)
+from .identity_map import get_identity_map
+from .models import Follow, Post, TimelineEntry
+from .tasks import task
+
+# Лента подписок собирается при записи: опубликованный пост раскладывается
+# строками TimelineEntry по лентам подписчиков автора. Строка хранит
+# pub_date поста, поэтому отложенная публикация появляется в ленте сама,
+# когда наступает её время. Посты авторов, у которых подписчиков больше
+# TIMELINE_FANOUT_LIMIT, не раскладываются, а подтягиваются при чтении.
+
+
+def get_mega_authors():
+    """Авторы (id), чьи посты лента подтягивает при чтении."""
+    return get_or_compute(
+        'blog:timeline:mega-authors',
+        lambda: set(
+            Follow.objects.values('author')
+            .annotate(followers=Count('id'))
+            .filter(followers__gt=TIMELINE_FANOUT_LIMIT)
+            .values_list('author', flat=True)
+        ),
+        MEGA_AUTHORS_SOFT_TIMEOUT,
+        MEGA_AUTHORS_CACHE_TIMEOUT
+    )
+
+
+def _fan_out(posts, user_ids):
+    """Записывает посты в ленты читателей (повторная запись обновляет дату)."""
+    entries = [
+        TimelineEntry(user_id=user_id, post_id=post.id, pub_date=post.pub_date)
+        for post in posts for user_id in user_ids
+    ]
+    TimelineEntry.objects.bulk_create(
+        entries,
+        batch_size=TIMELINE_BATCH_SIZE,
+        update_conflicts=True,
+        unique_fields=('user', 'post'),
+        update_fields=('pub_date',)
+    )
+
+
+def deliver_post(post):
+    """
+    Раскладывает пост по лентам подписчиков автора.
+    Снятый с публикации пост из лент убирается.
+    """
+    if not post.is_published:
+        TimelineEntry.objects.filter(post=post).delete()
+        return
+    followers = Follow.objects.filter(author_id=post.author_id).values_list(
+        'user_id', flat=True
+    )
+    if (post.author_id in get_mega_authors()
+            or followers.count() > TIMELINE_FANOUT_LIMIT):
+        return
+    # Ленты прежних подписчиков прежнего автора не трогаем: автор
+    # у поста не меняется через интерфейс блога.
+    _fan_out([post], list(followers))
+
+
+def backfill(follow):
+    """Добавляет в ленту нового подписчика последние посты автора."""
+    if follow.author_id in get_mega_authors():
+        return
+    posts = Post.objects.filter(
+        author_id=follow.author_id, is_published=True
+    ).only('id', 'pub_date').order_by('-pub_date')[:TIMELINE_BACKFILL]
+    _fan_out(posts, [follow.user_id])
+
+
+@task(priority=TASK_PRIORITY_TIMELINE)
+def deliver_post_task(post_id):
+    """
+    Раскладывает пост из очереди задач. Пост перечитывается при
+    выполнении, поэтому устаревшие постановки безвредны.
+    """
+    post = Post.objects.filter(pk=post_id).first()
+    if post is not None:
+        deliver_post(post)
+
+
+@task(priority=TASK_PRIORITY_TIMELINE)
+def backfill_task(follow_id):
+    """Заполняет ленту из очереди; отменённая подписка пропускается."""
+    follow = Follow.objects.filter(pk=follow_id).first()
+    if follow is not None:
+        backfill(follow)
+
+
+def remove_author(follow):
+    """Убирает посты автора из ленты отписавшегося читателя."""
+    TimelineEntry.objects.filter(
+        user_id=follow.user_id, post__author_id=follow.author_id
+    ).delete()
+
+
+def timeline_queryset(user):
+    """
+    Пары (id, дата) постов ленты: строки ленты читателя и посты крупных
+    авторов, на которых он подписан. UNION убирает посты, попавшие
+    в обе части.
+    Условия видимости те же, что у filter_posts_by_publication().
+    """
+    visible = Post.objects.filter_posts_by_publication()
+    entries = TimelineEntry.objects.filter(
+        user=user, post__in=visible
+    ).values_list('post_id', 'pub_date').order_by()
+    mega_authors = get_mega_authors()
+    if mega_authors:
+        entries = entries.union(
+            visible.filter(
+                author_id__in=mega_authors, author__followers__user=user
+            ).values_list('id', 'pub_date').order_by()
+        )
+    return entries.order_by('-pub_date')
+
+
+def paginate_timeline(request, page_number):
+    """Страница ленты подписок; публикации берутся из кэша объектов."""
+    page = Paginator(
+        timeline_queryset(request.user), POSTS_LIMIT_ON_PAGE
+    ).get_page(page_number)
+    page.object_list = get_identity_map(request).attach(
+        get_posts([post_id for post_id, _ in page.object_list]),
+        *POST_RELATED_FIELDS
+    )
+    return page
@@ -1,6 +1,6 @@
 from django.urls import path
 
-from . import views
+from . import api, async_views, views
 
 
 app_name = 'blog'  # namespase для приложения blog.
@@ -12,18 +12,42 @@ urlpatterns = [
         views.index,
         name='index'),
 
+    # Следующая страница главной для бесконечной прокрутки.
+    path(
+        'page/',
+        views.index_page,
+        name='index_page'),
+
     # Страница создания публикации.
     path(
         'posts/create/',
         views.PostCreateView.as_view(),
         name='create_post'),
 
+    # RSS/Atom главной страницы.
+    path(
+        'feed/<str:feed_format>/',
+        views.index_syndication,
+        name='index_feed'),
+
     # Страница публикации.
     path(
         'posts/<int:post_id>/',
         views.post_detail,
         name='post_detail'),
 
+    # Следующая страница комментариев к публикации.
+    path(
+        'posts/<int:post_id>/comments/',
+        views.post_comments_page,
+        name='post_comments_page'),
+
+    # Новые комментарии к публикации (Server-Sent Events, под ASGI).
+    path(
+        'posts/<int:post_id>/comments/live/',
+        async_views.post_comments_stream,
+        name='post_comments_stream'),
+
     # Страница редактирования публикации.
     path(
         'posts/<int:post_id>/edit/',
@@ -42,6 +66,18 @@ urlpatterns = [
         views.category_posts,
         name='category_posts'),
 
+    # Следующая страница категории.
+    path(
+        'category/<slug:category_slug>/page/',
+        views.category_posts_page,
+        name='category_posts_page'),
+
+    # RSS/Atom категории.
+    path(
+        'category/<slug:category_slug>/feed/<str:feed_format>/',
+        views.category_syndication,
+        name='category_feed'),
+
     # Страница редактирования профиля пользователя.
     path(
         'profile/edit/',
@@ -54,6 +90,46 @@ urlpatterns = [
         views.ProfileView.as_view(),
         name='profile'),
 
+    # Следующая страница публикаций пользователя.
+    path(
+        'profile/<str:username>/page/',
+        views.ProfilePostsPageView.as_view(),
+        name='profile_page'),
+
+    # RSS/Atom публикаций пользователя.
+    path(
+        'profile/<str:username>/feed/<str:feed_format>/',
+        views.author_syndication,
+        name='author_feed'),
+
+    # Подписка на автора и отписка от него.
+    path(
+        'profile/<str:username>/follow/',
+        views.follow,
+        name='follow'),
+    path(
+        'profile/<str:username>/unfollow/',
+        views.unfollow,
+        name='unfollow'),
+
+    # Поиск по публикациям.
+    path(
+        'search/',
+        views.search_posts,
+        name='search'),
+
+    # Подсказки для строки поиска.
+    path(
+        'autocomplete/',
+        views.autocomplete_suggestions,
+        name='autocomplete'),
+
+    # Лента подписок.
+    path(
+        'timeline/',
+        views.timeline,
+        name='timeline'),
+
     # Страница добавления комментария.
     path(
         'posts/<int:post_id>/comment/',
@@ -71,4 +147,42 @@ urlpatterns = [
         'posts/<int:post_id>/delete_comment/<int:comment_id>/',
         views.CommentDeleteView.as_view(),
         name='delete_comment'),
+
+    # Карта сайта: индекс и файлы разделов.
+    path(
+        'sitemap.xml',
+        views.sitemap,
+        name='sitemap'),
+    path(
+        'sitemaps/<str:name>',
+        views.sitemap,
+        name='sitemap_shard'),
+
+    # JSON API только для чтения.
+    path(
+        'api/v1/posts/',
+        api.posts,
+        name='api_posts'),
+    path(
+        'api/v1/posts/<int:post_id>/',
+        api.post_detail,
+        name='api_post_detail'),
+    path(
+        'api/v1/posts/<int:post_id>/comments/',
+        api.post_comments,
+        name='api_post_comments'),
+    path(
+        'api/v1/categories/<slug:category_slug>/posts/',
+        api.category_posts,
+        name='api_category_posts'),
+    path(
+        'api/v1/profiles/<str:username>/posts/',
+        api.profile_posts,
+        name='api_profile_posts'),
+
+    # CSRF-токен для форм на кэшируемых страницах.
+    path(
+        'csrf/',
+        views.csrf_token,
+        name='csrf_token'),
 ]
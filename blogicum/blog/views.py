@@ -1,17 +1,41 @@
+from http import HTTPStatus
+from urllib.parse import urlencode
+
+from django.contrib.auth.decorators import login_required
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.auth.models import User
-from django.shortcuts import get_object_or_404, render
+from django.core.paginator import Paginator
+from django.http import Http404, JsonResponse
+from django.middleware.csrf import get_token
+from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse, reverse_lazy
+from django.utils.cache import patch_cache_control
+from django.views.decorators.cache import never_cache
+from django.views.decorators.http import require_GET, require_POST
 from django.views.generic import CreateView, ListView, UpdateView, DeleteView
-
-from .constants import POSTS_LIMIT_ON_PAGE, COMMENTS_LIMIT_ON_PAGE
+from django.views.static import serve
+
+from .autocomplete import suggest_categories, suggest_usernames
+from .caching import (INDEX_FEED, RELATED_SCOPE, author_feed,
+                      body_cache_key, category_feed, get_generation, get_post,
+                      get_posts, paginate_comments, paginate_feed,
+                      version_to_datetime, viewer_variant)
+from .conditional import conditional_response
+from .counters import view_counter
+from .constants import (AUTOCOMPLETE_MAX_AGE, POST_RELATED_FIELDS,
+                        POSTS_LIMIT_ON_PAGE)
 from .forms import CommentForm, PostForm, ProfileEditForm
 from .mixins import (AuthorCheckMixin,
                      PostMixin,
                      CommentMixin)
-from .models import Category, Post
-from .services import paginate_posts
+from .models import Category, Follow, Post
+from .ranking import get_trending
+from .search import cached_search_post_ids, get_snippets
+from .sitemaps import INDEX_NAME, sitemaps_dir
+from .syndication import feed_response
+from .timeline import paginate_timeline
+from .identity_map import get_identity_map
 
 
 class SignUpView(CreateView):
@@ -30,26 +54,162 @@ class ProfileView(ListView):
     paginate_by = POSTS_LIMIT_ON_PAGE
 
     def get_author(self):
-        """Получает автора по username из URL."""
-        return get_object_or_404(
-            User,
-            username=self.kwargs['username']
-        )
+        """Получает автора по username из URL (один раз за запрос)."""
+        if not hasattr(self, 'author'):
+            self.author = get_identity_map(self.request).add(
+                get_object_or_404(User, username=self.kwargs['username'])
+            )
+        return self.author
+
+    def is_owner(self):
+        """Автор видит в профиле и неопубликованные посты."""
+        return self.request.user == self.get_author()
 
     def get_queryset(self):
-        """Возвращает посты автора с аннотацией количества комментариев."""
-        author = self.get_author()
-        queryset = author.posts.with_comments_count()
-        if self.request.user != author:
+        """Возвращает посты автора (без аннотаций — их добавит кэш)."""
+        queryset = self.get_author().posts.all()
+        if not self.is_owner():
             queryset = queryset.filter_posts_by_publication()
         return queryset
 
+    def paginate_queryset(self, queryset, page_size):
+        """
+        Берёт страницу из кэша id ленты автора; публикации загружаются,
+        только если тело страницы не найдено в кэше.
+        """
+        page = paginate_feed(
+            self.request,
+            queryset,
+            author_feed(self.get_author().pk),
+            self.request.GET.get(self.page_kwarg),
+            variant='all' if self.is_owner() else 'published',
+            page_size=page_size
+        )
+        return (page.paginator, page, page.object_list,
+                page.has_other_pages())
+
+    def is_following(self):
+        """Подписан ли текущий пользователь на автора."""
+        user = self.request.user
+        return user.is_authenticated and Follow.objects.filter(
+            user=user, author=self.get_author()
+        ).exists()
+
     def get_context_data(self, **kwargs):
-        """Добавляет автора в контекст."""
+        """Добавляет автора и состояние подписки в контекст."""
         context = super().get_context_data(**kwargs)
         context['profile'] = self.get_author()
+        context['is_following'] = self.is_following()
         return context
 
+    def get(self, request, *args, **kwargs):
+        """Отвечает 304, если лента и данные автора не менялись."""
+        self.object_list = self.get_queryset()
+        context = self.get_context_data()
+        author = self.get_author()
+        return conditional_response(
+            request,
+            (context['page_obj'].body_key, author.get_full_name(),
+             author.date_joined, author.is_staff, context['is_following']),
+            lambda: self.render_to_response(context)
+        )
+
+
+class ProfilePostsPageView(ProfileView):
+    """Фрагмент профиля: только карточки публикаций автора."""
+
+    template_name = 'blog/fragments/posts.html'
+
+    def get(self, request, *args, **kwargs):
+        self.object_list = self.get_queryset()
+        page_obj = self.get_context_data()['page_obj']
+        return _fragment_response(
+            request,
+            self.template_name,
+            {'page_obj': page_obj},
+            page_obj.body_key
+        )
+
+
+@login_required
+@require_POST
+def follow(request, username):
+    """Подписывает текущего пользователя на автора."""
+    author = get_object_or_404(User, username=username)
+    if author != request.user:
+        Follow.objects.get_or_create(user=request.user, author=author)
+    return redirect('blog:profile', username=username)
+
+
+@login_required
+@require_POST
+def unfollow(request, username):
+    """Отписывает текущего пользователя от автора."""
+    # delete() по одному объекту, чтобы сработал сигнал очистки ленты.
+    for subscription in Follow.objects.filter(
+        user=request.user, author__username=username
+    ):
+        subscription.delete()
+    return redirect('blog:profile', username=username)
+
+
+@require_GET
+def autocomplete_suggestions(request):
+    """
+    Подсказки для строки поиска: пользователи и категории по началу
+    имени. Ответ не зависит от пользователя и кэшируется браузером и
+    прокси, а сами подсказки берутся из индекса в памяти процесса.
+    """
+    prefix = request.GET.get('q', '').strip()
+    users = suggest_usernames(prefix) if prefix else []
+    categories = suggest_categories(prefix) if prefix else []
+    response = JsonResponse({
+        'users': [
+            {
+                'username': username,
+                'url': reverse('blog:profile', args=(username,))
+            }
+            for username in users
+        ],
+        'categories': [
+            {
+                'title': title,
+                'url': reverse('blog:category_posts', args=(slug,))
+            }
+            for title, slug, _ in categories
+        ],
+    })
+    patch_cache_control(response, public=True, max_age=AUTOCOMPLETE_MAX_AGE)
+    return response
+
+
+def search_posts(request):
+    """Поиск по опубликованным постам и комментариям к ним."""
+    query = request.GET.get('q', '').strip()
+    page_obj = Paginator(
+        cached_search_post_ids(query), POSTS_LIMIT_ON_PAGE
+    ).get_page(request.GET.get('page'))
+    snippets = get_snippets(query, page_obj.object_list)
+    page_obj.object_list = get_identity_map(request).attach(
+        get_posts(page_obj.object_list), *POST_RELATED_FIELDS
+    )
+    for post in page_obj:
+        post.snippet = snippets.get(post.id)
+    return render(request, 'blog/search.html', {
+        'query': query,
+        'page_obj': page_obj,
+        # Ссылки пагинатора сохраняют запрос.
+        'page_query': urlencode({'q': query}) + '&'
+    })
+
+
+@login_required
+def timeline(request):
+    """Лента публикаций авторов, на которых подписан пользователь."""
+    return render(request, 'blog/timeline.html', {
+        'page_obj': paginate_timeline(request, request.GET.get('page'))
+    })
+
 
 class ProfileEditView(LoginRequiredMixin, UpdateView):
     """Класс редактирования профиля."""
@@ -107,69 +267,258 @@ class PostDeleteView(AuthorCheckMixin, PostMixin, DeleteView):
     pass
 
 
+def _fragment_response(request, template_name, context, body_key):
+    """
+    Отдаёт фрагмент страницы без base.html для бесконечной прокрутки.
+    Тело фрагмента кэшируется по версиям того же содержимого, что и
+    полная страница.
+    """
+    body_key = body_cache_key('fragment', template_name, body_key)
+    return conditional_response(
+        request,
+        (body_key,),
+        lambda: render(
+            request, template_name, {**context, 'body_key': body_key}
+        )
+    )
+
+
+def _index_page(request):
+    return paginate_feed(
+        request,
+        Post.objects.filter_posts_by_publication(),
+        INDEX_FEED,
+        request.GET.get('page')
+    )
+
+
 def index(request):
     """Функция для главной страницы."""
-    posts = (Post.objects.filter_posts_by_publication()
-             .with_comments_count())
-    page_obj = paginate_posts(posts, request.GET.get('page'))
-    return render(request, 'blog/index.html', {'page_obj': page_obj})
+    page_obj = _index_page(request)
+    # Рейтинг обновляется по расписанию и выводится вне кэша тела ленты.
+    trending = get_trending()
+    return conditional_response(
+        request,
+        (page_obj.body_key, trending['computed_at']),
+        lambda: render(request, 'blog/index.html', {
+            'page_obj': page_obj,
+            'trending': trending['posts']
+        })
+    )
 
 
-def category_posts(request, category_slug):
-    """Функция для страницы категории."""
-    category = get_object_or_404(
+def index_page(request):
+    """Фрагмент главной страницы: только карточки публикаций."""
+    page_obj = _index_page(request)
+    return _fragment_response(
+        request,
+        'blog/fragments/posts.html',
+        {'page_obj': page_obj},
+        page_obj.body_key
+    )
+
+
+def _category_page(request, category_slug):
+    category = get_identity_map(request).add(get_object_or_404(
         Category,
         slug=category_slug,
         is_published=True
+    ))
+    page_obj = paginate_feed(
+        request,
+        category.posts.filter_posts_by_publication(),
+        category_feed(category.pk),
+        request.GET.get('page')
+    )
+    return category, page_obj
+
+
+def category_posts(request, category_slug):
+    """Функция для страницы категории."""
+    category, page_obj = _category_page(request, category_slug)
+    trending = get_trending()
+
+    return conditional_response(
+        request,
+        (page_obj.body_key, trending['computed_at']),
+        lambda: render(
+            request, 'blog/category.html', {
+                'category': category,
+                'page_obj': page_obj,
+                'trending': trending['categories'].get(category.pk, [])
+            }
+        )
+    )
+
+
+def category_posts_page(request, category_slug):
+    """Фрагмент страницы категории: только карточки публикаций."""
+    _, page_obj = _category_page(request, category_slug)
+    return _fragment_response(
+        request,
+        'blog/fragments/posts.html',
+        {'page_obj': page_obj},
+        page_obj.body_key
+    )
+
+
+def index_syndication(request, feed_format):
+    """RSS/Atom главной страницы."""
+    return feed_response(
+        request,
+        feed_format,
+        Post.objects.filter_posts_by_publication(),
+        INDEX_FEED,
+        title='Блогикум',
+        link=reverse('blog:index'),
+        description='Новые публикации'
+    )
+
+
+def category_syndication(request, category_slug, feed_format):
+    """RSS/Atom категории."""
+    category = get_object_or_404(
+        Category, slug=category_slug, is_published=True
     )
-    posts = (category
-             .posts.filter_posts_by_publication()
-             .with_comments_count())
-    page_obj = paginate_posts(posts, request.GET.get('page'))
+    return feed_response(
+        request,
+        feed_format,
+        category.posts.filter_posts_by_publication(),
+        category_feed(category.pk),
+        title=f'Блогикум — {category.title}',
+        link=reverse('blog:category_posts', args=(category.slug,)),
+        description=category.description
+    )
+
+
+def author_syndication(request, username, feed_format):
+    """RSS/Atom публикаций автора (только опубликованных)."""
+    author = get_object_or_404(User, username=username)
+    return feed_response(
+        request,
+        feed_format,
+        author.posts.filter_posts_by_publication(),
+        author_feed(author.pk),
+        title=f'Блогикум — {author.get_full_name() or author.username}',
+        link=reverse('blog:profile', args=(author.username,)),
+        description=f'Публикации пользователя {author.username}'
+    )
+
 
-    return render(
-        request, 'blog/category.html', {
-            'category': category,
-            'page_obj': page_obj
-        }
+@require_GET
+def sitemap(request, name=INDEX_NAME):
+    """
+    Файл карты сайта, собранный командой build_sitemaps.
+    В продакшене эти адреса лучше отдавать веб-сервером из SITEMAPS_DIR.
+    """
+    return serve(request, name, document_root=sitemaps_dir())
+
+
+def _comments_page(request, post_id):
+    """
+    Публикация, страница её комментариев и версии всего, что выводится
+    на этой странице.
+    """
+    post = get_post(post_id)
+    if post is None:
+        raise Http404
+    # Автор поста попадает в карту, и его комментарии не порождают дублей.
+    get_identity_map(request).attach([post], *POST_RELATED_FIELDS)
+    if not post.author == request.user and not post.is_available():
+        raise Http404
+    page_obj = paginate_comments(request, post, request.GET.get('page'))
+    # Версии страниц комментариев меняются при добавлении, правке
+    # и удалении комментариев, что не отражается в updated_at поста.
+    version_parts = (
+        'post', post.id, post.updated_at, get_generation(RELATED_SCOPE),
+        page_obj.number, page_obj.paginator.num_pages, page_obj.version
+    )
+    return post, page_obj, version_parts
+
+
+def _comments_variant(request, post, page_obj):
+    """
+    Тело страницы общее для всех читателей, кроме авторов поста
+    и комментариев на этой странице.
+    """
+    return viewer_variant(
+        request.user, {post.author_id, *(c.author_id for c in page_obj)}
     )
 
 
 def post_detail(request, post_id):
     """Функция для страницы публикации."""
-    post = get_object_or_404(
-        Post.objects.select_related('author', 'category', 'location'),
-        pk=post_id)
-    if not post.author == request.user:
-        post = get_object_or_404(
-            Post.objects.select_related('author', 'category', 'location')
-                .filter_posts_by_publication(),
-            pk=post_id
+    post, page_obj, version_parts = _comments_page(request, post_id)
+    view_counter.hit(post.id)
+
+    def render_page():
+        # Тело страницы не содержит CSRF-токена, поэтому кэшируется.
+        body_key = body_cache_key(
+            *version_parts, _comments_variant(request, post, page_obj)
         )
+        return render(request, 'blog/detail.html', {
+            'post': post,
+            'page_obj': page_obj,
+            'form': CommentForm(),
+            'body_key': body_key,
+            # Публикация из кэша отстаёт от базы, счётчик — приблизительный.
+            'views_count': post.views_count + view_counter.pending(post.id)
+        })
+
+    return conditional_response(
+        request,
+        version_parts,
+        render_page,
+        last_modified=max(
+            post.updated_at, version_to_datetime(page_obj.version)
+        )
+    )
+
 
-    comments = post.comments.select_related('author')
-    page_obj = paginate_posts(
-        comments,
-        request.GET.get('page'),
-        COMMENTS_LIMIT_ON_PAGE
+def post_comments_page(request, post_id):
+    """Фрагмент страницы публикации: только комментарии."""
+    post, page_obj, version_parts = _comments_page(request, post_id)
+    return _fragment_response(
+        request,
+        'blog/fragments/comments.html',
+        {'post': post, 'page_obj': page_obj},
+        body_cache_key(
+            *version_parts, _comments_variant(request, post, page_obj)
+        )
     )
 
-    return render(request, 'blog/detail.html', {
-        'post': post,
-        'page_obj': page_obj,
-        'form': CommentForm()
-    })
+
+@never_cache
+def csrf_token(request):
+    """
+    Отдаёт CSRF-токен для форм на кэшируемых страницах.
+    Ответ не кэшируется, а прочитать его может только тот же источник,
+    поэтому проверка CsrfViewMiddleware при отправке формы не ослабевает.
+    """
+    return JsonResponse({'token': get_token(request)})
 
 
 class CommentCreateView(LoginRequiredMixin, CommentMixin, CreateView):
     """Создание комментария к публикации."""
 
     form_class = CommentForm
+    json_status = HTTPStatus.CREATED
 
     def form_valid(self, form):
-        """Присваиваем комментарию публикацию и автора."""
-        post = get_object_or_404(Post, pk=self.kwargs['post_id'])
-        form.instance.post = post
+        """
+        Присваиваем комментарию публикацию и автора.
+        Комментировать можно только видимую пользователю публикацию;
+        из базы для этого читается один id.
+        """
+        post_id = (
+            Post.objects.visible_to(self.request.user)
+            .filter(pk=self.kwargs['post_id'])
+            .values_list('id', flat=True)
+            .first()
+        )
+        if post_id is None:
+            raise Http404
+        form.instance.post_id = post_id
         form.instance.author = self.request.user
         return super().form_valid(form)
 
@@ -183,4 +532,6 @@ class CommentEditView(AuthorCheckMixin, CommentMixin, UpdateView):
 class CommentDeleteView(AuthorCheckMixin, CommentMixin, DeleteView):
     """Удаление комментария к публикации."""
 
-    pass
+    def get_json_data(self):
+        """После удаления объекта у комментария уже нет pk."""
+        return {'id': self.kwargs[self.pk_url_kwarg], 'deleted': True}
@@ -0,0 +1,15 @@
+from django.urls import include, path
+
+from . import urls
+
+# Те же адреса, что в urls.py, но приложение blog подключено
+# с асинхронными страницами чтения (см. blog/async_urls.py).
+urlpatterns = [
+    path('', include('blog.async_urls'))
+    if getattr(pattern, 'app_name', None) == 'blog' else pattern
+    for pattern in urls.urlpatterns
+]
+
+handler403 = urls.handler403
+handler404 = urls.handler404
+handler500 = urls.handler500
@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -37,7 +38,12 @@ MIDDLEWARE = [
 
 INTERNAL_IPS = ['127.0.0.1',]
 
-ROOT_URLCONF = 'blogicum.urls'
+# Под ASGI (blogicum/asgi.py выставляет BLOG_ASYNC_VIEWS=1) страницы
+# чтения обслуживают асинхронные представления из blog/async_views.py.
+ROOT_URLCONF = (
+    'blogicum.asgi_urls' if os.environ.get('BLOG_ASYNC_VIEWS') == '1'
+    else 'blogicum.urls'
+)
 
 TEMPLATES = [
     {
@@ -65,6 +71,28 @@ DATABASES = {
     }
 }
 
+# Локальный LRU-уровень процесса перед общим кэшем 'shared'.
+# В продакшене 'shared' переключается на Redis или Memcached.
+CACHES = {
+    'default': {
+        'BACKEND': 'blog.cache_backends.TwoTierCache',
+        'LOCATION': 'shared',
+        'OPTIONS': {
+            'LOCAL_MAX_ENTRIES': 5000,
+            'LOCAL_MAX_SIZE': 32 * 1024 * 1024,
+            'LOCAL_TIMEOUT': 30,
+            'SYNC_INTERVAL': 1,
+        },
+    },
+    'shared': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'blogicum-shared',
+        'OPTIONS': {
+            'MAX_ENTRIES': 50000,
+        },
+    },
+}
+
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -101,9 +129,27 @@ CSRF_FAILURE_VIEW = 'pages.views.csrf_failure'
 LOGIN_REDIRECT_URL = 'blog:index'
 LOGIN_URL = 'login'
 
-EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+# Письма из запросов только ставятся в очередь (blog/mail.py), а пачками
+# их отправляет задача очереди через QUEUED_EMAIL_BACKEND.
+EMAIL_BACKEND = 'blog.mail.QueuedEmailBackend'
+QUEUED_EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
 
+# Журналы ещё не записанных в базу просмотров публикаций.
+VIEW_COUNTS_DIR = BASE_DIR / 'view_counts'
+
+# Выполнять задачи очереди сразу при постановке, без воркера run_tasks.
+# Так по умолчанию работает сервер разработки; в бою задаётся
+# BLOG_TASKS_EAGER=0 и запускается manage.py run_tasks, иначе поиск,
+# ленты подписок и письма не обновляются.
+BLOG_TASKS_EAGER = os.environ.get('BLOG_TASKS_EAGER', '1') == '1'
+
+# Адрес сайта для абсолютных ссылок вне запроса (карта сайта).
+SITE_URL = 'http://127.0.0.1:8000'
+
+# Файлы карты сайта, которые собирает команда build_sitemaps.
+SITEMAPS_DIR = BASE_DIR / 'sitemaps'
+
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
@@ -0,0 +1,36 @@
+// Подсказки в строке поиска: пользователи и категории по началу имени.
+// Выбор подсказки открывает профиль или категорию, любой другой текст
+// отправляется в полнотекстовый поиск.
+document.querySelectorAll('input[data-autocomplete-url]').forEach((input) => {
+  const options = document.getElementById(input.getAttribute('list'));
+  let urls = new Map();
+
+  input.addEventListener('input', async () => {
+    const prefix = input.value.trim().replace(/^@/, '');
+    if (!prefix) {
+      return;
+    }
+    const url = new URL(input.dataset.autocompleteUrl, window.location.href);
+    url.searchParams.set('q', prefix);
+    const response = await fetch(url);
+    if (!response.ok) {
+      return;
+    }
+    const data = await response.json();
+    urls = new Map([
+      ...data.users.map((user) => [`@${user.username}`, user.url]),
+      ...data.categories.map((category) => [category.title, category.url]),
+    ]);
+    options.replaceChildren(...[...urls.keys()].map((label) => {
+      const option = document.createElement('option');
+      option.value = label;
+      return option;
+    }));
+  });
+
+  input.addEventListener('change', () => {
+    if (urls.has(input.value)) {
+      window.location.href = urls.get(input.value);
+    }
+  });
+});
@@ -0,0 +1,46 @@
+// Комментарий отправляется без перехода на страницу публикации:
+// сервер отвечает JSON с разметкой комментария, и он дописывается
+// в список. При любой ошибке сети форма отправляется обычным образом.
+document.addEventListener('submit', async (event) => {
+  const form = event.target;
+  if (!('ajax' in form.dataset)) {
+    return;
+  }
+  event.preventDefault();
+  try {
+    await window.blogFillCsrfToken(form);
+    const response = await fetch(form.action, {
+      method: 'POST',
+      body: new FormData(form),
+      credentials: 'same-origin',
+      headers: {'Accept': 'application/json'},
+    });
+    const data = await response.json();
+    form.querySelectorAll('.invalid-feedback[data-ajax-error]')
+      .forEach((error) => error.remove());
+    if (!response.ok) {
+      Object.entries(data.errors || {}).forEach(([name, errors]) => {
+        const input = form.querySelector(`[name="${name}"]`);
+        if (input) {
+          input.insertAdjacentHTML(
+            'afterend',
+            '<div class="invalid-feedback d-block" data-ajax-error></div>'
+          );
+          input.nextElementSibling.textContent = errors
+            .map((error) => error.message).join(' ');
+        }
+      });
+      return;
+    }
+    // Новый комментарий попадает в конец ветки: показываем его,
+    // только если загружена её последняя страница.
+    const list = form.closest('.card-body')
+      .querySelector('[data-fragment-url]');
+    if (list && !list.querySelector('[data-next-page]')) {
+      list.insertAdjacentHTML('beforeend', data.html);
+    }
+    form.reset();
+  } catch (error) {
+    form.submit();
+  }
+});
@@ -0,0 +1,25 @@
+// CSRF-токен не встраивается в кэшируемую страницу поста:
+// форма получает его перед отправкой из отдельного эндпоинта.
+window.blogFillCsrfToken = async (form) => {
+  const field = form.querySelector('input[data-csrf-field]');
+  if (!field || field.value) {
+    return;
+  }
+  const response = await fetch(form.dataset.csrfUrl, {
+    credentials: 'same-origin',
+    headers: {'Accept': 'application/json'},
+  });
+  field.value = (await response.json()).token;
+};
+
+document.addEventListener('submit', async (event) => {
+  const form = event.target;
+  const field = form.querySelector('input[data-csrf-field]');
+  // Формы с data-ajax отправляет свой скрипт и сам получает токен.
+  if (!field || field.value || 'ajax' in form.dataset) {
+    return;
+  }
+  event.preventDefault();
+  await window.blogFillCsrfToken(form);
+  form.submit();
+});
@@ -0,0 +1,46 @@
+// Бесконечная прокрутка лент и комментариев. Следующая страница
+// загружается фрагментом без шапки и подвала и дописывается в список.
+// Без JavaScript остаётся обычная пагинация.
+(() => {
+  if (window.blogInfiniteScroll || !('IntersectionObserver' in window)) {
+    return;
+  }
+  window.blogInfiniteScroll = true;
+
+  const watch = (container) => {
+    const marker = container.querySelector('[data-next-page]');
+    if (marker) {
+      observer.observe(marker);
+    }
+  };
+
+  const loadNextPage = async (container, marker) => {
+    const url = new URL(container.dataset.fragmentUrl, window.location.href);
+    url.searchParams.set('page', marker.dataset.nextPage);
+    marker.remove();
+    const response = await fetch(url, {credentials: 'same-origin'});
+    if (response.ok) {
+      container.insertAdjacentHTML('beforeend', await response.text());
+      watch(container);
+    }
+  };
+
+  const observer = new IntersectionObserver((entries) => {
+    entries.filter((entry) => entry.isIntersecting).forEach((entry) => {
+      observer.unobserve(entry.target);
+      loadNextPage(
+        entry.target.closest('[data-fragment-url]'), entry.target
+      );
+    });
+  }, {rootMargin: '400px'});
+
+  document.querySelectorAll('[data-fragment-url]').forEach((container) => {
+    const paginator = container.parentElement.querySelector(
+      ':scope > [data-paginator]'
+    );
+    if (paginator) {
+      paginator.hidden = true;
+    }
+    watch(container);
+  });
+})();
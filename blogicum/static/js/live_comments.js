@@ -0,0 +1,23 @@
+// Новые комментарии приходят потоком Server-Sent Events и дописываются
+// в конец ветки, если загружена её последняя страница. Переподключение
+// (с Last-Event-ID) браузер выполняет сам.
+(() => {
+  const list = document.querySelector('[data-live-url]');
+  if (!list || !('EventSource' in window)) {
+    return;
+  }
+  const source = new EventSource(list.dataset.liveUrl);
+  source.addEventListener('comment', (event) => {
+    if (list.querySelector('[data-next-page]')) {
+      return;
+    }
+    const template = document.createElement('template');
+    template.innerHTML = event.data;
+    // Свой комментарий уже добавлен формой (comments.js).
+    const anchor = template.content.querySelector('a[name^="comment_"]');
+    if (anchor && list.querySelector(`a[name="${anchor.name}"]`)) {
+      return;
+    }
+    list.append(template.content);
+  });
+})();
@@ -31,7 +31,9 @@ def CommentModelAdapter(CommentModel: type) -> CommentModelAdapterT:
 
         @property
         def _access_by_name_fields(self):
-            return ["id", "refresh_from_db"]
+            # updated_at — служебная дата изменения для условных
+            # запросов; с created_at её различает имя, а не тип.
+            return ["id", "updated_at", "refresh_from_db"]
 
         @property
         def AdapterFields(self) -> type:
@@ -30,6 +30,7 @@ class PostModelAdapter(StudentModelAdapter):
             "title",
             "text",
             "pub_date",
+            "updated_at",
             "author",
             "category",
             "location",
@@ -41,6 +41,29 @@ def enable_debug_false():
         yield
 
 
+@pytest.fixture(autouse=True)
+def clear_caches():
+    from django.core.cache import caches
+
+    for cache in caches.all():
+        cache.clear()
+    yield
+
+
+@pytest.fixture(autouse=True)
+def eager_tasks(settings):
+    settings.BLOG_TASKS_EAGER = True
+
+
+@pytest.fixture(autouse=True)
+def view_counts_dir(settings, tmp_path):
+    from blog.counters import view_counter
+
+    settings.VIEW_COUNTS_DIR = tmp_path / "view_counts"
+    yield settings.VIEW_COUNTS_DIR
+    view_counter.clear()
+
+
 class SafeImportFromContextManager:
     def __init__(
             self,
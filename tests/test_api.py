@@ -0,0 +1,102 @@
+import json
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.client import Client
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from mixer.main import Mixer
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _json(response):
+    return json.loads(b"".join(response.streaming_content))
+
+
+@pytest.fixture
+def api_posts(mixer: Mixer, user, published_category):
+    start = timezone.now() - timedelta(days=1)
+    return mixer.cycle(5).blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        pub_date=mixer.sequence(
+            *(start + timedelta(minutes=number) for number in range(5))
+        ),
+    )
+
+
+def test_cursor_pagination_walks_whole_feed(api_posts, client: Client):
+    url = "/api/v1/posts/?limit=2"
+    seen = []
+    while url:
+        with CaptureQueriesContext(connection) as queries:
+            data = _json(client.get(url))
+        assert not [q for q in queries if "OFFSET" in q["sql"]], (
+            "Убедитесь, что API листает ленту курсором, без OFFSET."
+        )
+        seen += [item["id"] for item in data["results"]]
+        url = data["next"]
+    assert seen == [post.id for post in reversed(api_posts)]
+
+
+def test_post_projection(api_posts, user, published_category, client: Client):
+    item = _json(client.get("/api/v1/posts/?limit=1"))["results"][0]
+    assert set(item) == {
+        "id", "title", "text_html", "pub_date", "author", "category",
+        "location", "comment_count",
+    }
+    assert item["author"] == user.username
+    assert item["category"] == published_category.slug
+
+
+def test_unpublished_posts_visible_only_to_author(
+        mixer: Mixer, user, another_user, published_category,
+        user_client: Client, another_user_client: Client
+):
+    hidden = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=False
+    )
+    url = f"/api/v1/profiles/{user.username}/posts/"
+    assert [item["id"] for item in _json(user_client.get(url))["results"]] \
+        == [hidden.id]
+    assert _json(another_user_client.get(url))["results"] == []
+    assert another_user_client.get(
+        f"/api/v1/posts/{hidden.id}/"
+    ).status_code == HTTPStatus.NOT_FOUND
+
+
+def test_etag_follows_post_changes(api_posts, client: Client):
+    etag = client.get("/api/v1/posts/")["ETag"]
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get("/api/v1/posts/", HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+    assert len(queries) == 1, (
+        "Убедитесь, что для ответа 304 API читает только id страницы."
+    )
+    api_posts[-1].title = "Новый заголовок"
+    api_posts[-1].save()
+    response = client.get("/api/v1/posts/", HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK
+
+
+def test_comments_page(mixer: Mixer, api_posts, user, client: Client):
+    post = api_posts[0]
+    comments = mixer.cycle(3).blend("blog.Comment", post=post, author=user)
+    first = _json(client.get(f"/api/v1/posts/{post.id}/comments/?limit=2"))
+    second = _json(client.get(first["next"]))
+    assert [item["id"] for item in first["results"] + second["results"]] \
+        == [comment.id for comment in comments]
+    assert second["next"] is None
+
+
+@pytest.mark.parametrize(
+    "cursor", ["garbage", "NQ==", "WzEsIDJd", "W10=", "%FF"]
+)
+def test_bad_cursor(client: Client, cursor):
+    response = client.get(f"/api/v1/posts/?cursor={cursor}")
+    assert response.status_code == HTTPStatus.BAD_REQUEST
@@ -0,0 +1,129 @@
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.core.management import call_command
+from django.db import connection
+from django.test import AsyncClient
+from django.test.client import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve
+from mixer.main import Mixer
+
+from blog import async_views
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def async_urls(settings):
+    settings.ROOT_URLCONF = "blogicum.asgi_urls"
+
+
+@pytest.fixture
+def pages(mixer: Mixer, user, published_category):
+    post = mixer.blend("blog.Post", author=user, category=published_category)
+    mixer.cycle(2).blend("blog.Comment", post=post, author=user)
+    return (
+        "/",
+        f"/category/{published_category.slug}/",
+        f"/profile/{user.username}/",
+        f"/posts/{post.id}/",
+    )
+
+
+def _aget(url, **extra):
+    return async_to_sync(AsyncClient().get)(url, **extra)
+
+
+def test_async_views_are_routed(async_urls):
+    assert resolve("/").func is async_views.index
+
+
+def test_async_pages_match_sync(pages, settings, client: Client):
+    expected = {url: client.get(url).content for url in pages[:3]}
+    settings.ROOT_URLCONF = "blogicum.asgi_urls"
+    for url in pages[:3]:
+        response = _aget(url)
+        assert response.status_code == HTTPStatus.OK
+        assert response.content == expected[url], (
+            f"Убедитесь, что асинхронная версия `{url}` выводит ту же "
+            "страницу, что и синхронная."
+        )
+    response = _aget(pages[3])
+    assert response.status_code == HTTPStatus.OK
+    assert "Просмотров" in response.content.decode()
+
+
+def test_warm_async_pages_skip_database(async_urls, pages):
+    for url in pages:
+        _aget(url)
+        with CaptureQueriesContext(connection) as queries:
+            response = _aget(url)
+        assert response.status_code == HTTPStatus.OK
+        assert not [
+            query for query in queries
+            if 'FROM "blog_post"' in query["sql"]
+            or 'FROM "blog_comment"' in query["sql"]
+        ], (
+            f"Убедитесь, что прогретая асинхронная страница `{url}` "
+            "берёт публикации и комментарии из кэша."
+        )
+
+
+def test_blocking_work_leaves_event_loop(async_urls, pages, monkeypatch):
+    import asyncio
+
+    from blog.counters import view_counter
+    from blog.templatetags.body_cache import CachedBodyNode
+
+    in_loop = []
+
+    def spy(func):
+        def wrapper(*args, **kwargs):
+            try:
+                asyncio.get_running_loop()
+                in_loop.append(func.__name__)
+            except RuntimeError:
+                pass
+            return func(*args, **kwargs)
+        return wrapper
+
+    monkeypatch.setattr(CachedBodyNode, "render", spy(CachedBodyNode.render))
+    monkeypatch.setattr(view_counter, "hit", spy(view_counter.hit))
+    for url in pages:
+        assert _aget(url).status_code == HTTPStatus.OK
+    assert not in_loop, (
+        "Убедитесь, что рендеринг шаблонов и учёт просмотров в асинхронных "
+        "представлениях не выполняются в цикле событий."
+    )
+
+
+def test_async_not_modified(async_urls, pages):
+    for url in pages:
+        etag = _aget(url)["ETag"]
+        response = _aget(url, headers={"If-None-Match": etag})
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+
+def test_async_hidden_post(async_urls, mixer: Mixer, user, published_category):
+    post = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=False
+    )
+    assert _aget(f"/posts/{post.id}/").status_code == HTTPStatus.NOT_FOUND
+
+
+@pytest.mark.django_db(transaction=True)
+def test_bench_views_command(pages):
+    out = StringIO()
+    call_command(
+        "bench_views", *pages[:2], "--concurrency", "2", "--requests", "2",
+        stdout=out
+    )
+    lines = out.getvalue().splitlines()
+    assert [line.split(":")[0] for line in lines] == [
+        "WSGI, sync", "ASGI, async"
+    ]
+    assert all("ошибок 0" in line for line in lines)
@@ -0,0 +1,105 @@
+import pytest
+from django.test.client import Client
+from mixer.main import Mixer
+
+pytestmark = [pytest.mark.django_db]
+
+
+def suggest(client, prefix):
+    return client.get("/autocomplete/", {"q": prefix})
+
+
+@pytest.fixture
+def names(mixer: Mixer):
+    mixer.blend("auth.User", username="alice")
+    mixer.blend("auth.User", username="Alex")
+    mixer.blend("auth.User", username="bob")
+    mixer.blend(
+        "blog.Category", title="Алгоритмы", slug="algo", is_published=True
+    )
+    mixer.blend(
+        "blog.Category", title="Алхимия", slug="alchemy", is_published=False
+    )
+
+
+def test_prefix_suggestions(names, client: Client):
+    response = suggest(client, "AL")
+    data = response.json()
+    assert [user["username"] for user in data["users"]] == ["Alex", "alice"]
+    assert "public" in response["Cache-Control"]
+    assert "max-age" in response["Cache-Control"], (
+        "Убедитесь, что ответ с подсказками кэшируется браузером."
+    )
+    assert [c["title"] for c in suggest(client, "ал").json()[
+        "categories"
+    ]] == ["Алгоритмы"], (
+        "Убедитесь, что неопубликованные категории не подсказываются."
+    )
+
+
+def test_index_follows_changes_incrementally(
+        names, client: Client, django_capture_on_commit_callbacks
+):
+    from django.contrib.auth import get_user_model
+
+    from blog.autocomplete import autocomplete
+
+    suggest(client, "a")
+    User = get_user_model()
+    user = User.objects.get(username="bob")
+    user.username = "albert"
+    with django_capture_on_commit_callbacks(execute=True):
+        user.save()
+    reload_calls = []
+    original = autocomplete._reload
+    autocomplete._reload = lambda *args: reload_calls.append(args)
+    try:
+        users = suggest(client, "al").json()["users"]
+    finally:
+        autocomplete._reload = original
+    assert "albert" in [user["username"] for user in users]
+    assert not reload_calls, (
+        "Убедитесь, что индекс обновляется по журналу изменений, "
+        "а не перестраивается целиком."
+    )
+    assert not suggest(client, "bo").json()["users"]
+
+
+def test_rolled_back_change_is_not_indexed(
+        names, client: Client, django_capture_on_commit_callbacks
+):
+    from django.contrib.auth import get_user_model
+    from django.db import transaction
+
+    suggest(client, "a")
+    user = get_user_model().objects.get(username="bob")
+    user.username = "albert"
+    with django_capture_on_commit_callbacks(execute=True):
+        with pytest.raises(RuntimeError):
+            with transaction.atomic():
+                user.save()
+                raise RuntimeError
+    assert not suggest(client, "alb").json()["users"], (
+        "Убедитесь, что изменения из отменённой транзакции не попадают "
+        "в индекс автодополнения."
+    )
+
+
+def test_admin_autocomplete_uses_prefix_index(names, admin_client: Client):
+    from blog.models import Category
+
+    response = admin_client.get(
+        "/admin/autocomplete/",
+        {
+            "term": "алх",
+            "app_label": "blog",
+            "model_name": "post",
+            "field_name": "category",
+        },
+    )
+    assert [item["id"] for item in response.json()["results"]] == [
+        str(Category.objects.get(slug="alchemy").pk)
+    ], (
+        "Убедитесь, что автодополнение в админке находит и "
+        "неопубликованные категории."
+    )
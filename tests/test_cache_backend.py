@@ -0,0 +1,124 @@
+import pytest
+from django.core.cache import caches
+
+from blog.cache_backends import LocalTier, TwoTierCache
+
+
+def make_cache(**options):
+    cache = TwoTierCache("shared", {"OPTIONS": {"SYNC_INTERVAL": 0, **options}})
+    cache._tier = LocalTier(
+        max_entries=options.get("LOCAL_MAX_ENTRIES", 1000),
+        max_size=options.get("LOCAL_MAX_SIZE", 1024 * 1024),
+    )
+    return cache
+
+
+def test_local_tier_serves_repeated_reads():
+    cache = make_cache()
+    cache.set("key", "value")
+    caches["shared"].delete("key")
+    assert cache.get("key") == "value", (
+        "Убедитесь, что повторное чтение обслуживается локальным уровнем."
+    )
+    assert cache.get_stats()["hits"] == 1
+
+
+def test_lru_evicts_least_recently_used():
+    cache = make_cache(LOCAL_MAX_ENTRIES=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    tier = cache._tier
+    assert cache.make_key("b") not in tier.entries
+    assert cache.make_key("a") in tier.entries
+    assert cache.get_stats()["evictions"] == 1
+
+
+def test_size_limit_evicts_entries():
+    cache = make_cache(LOCAL_MAX_SIZE=200)
+    cache.set("a", "x" * 120)
+    cache.set("b", "y" * 120)
+    assert cache.get_stats()["size"] <= 200
+    assert cache.get_stats()["entries"] == 1
+
+
+def test_write_in_another_worker_invalidates_local_copy():
+    worker_1 = make_cache()
+    worker_2 = make_cache()
+    worker_1.set("key", "old")
+    assert worker_2.get("key") == "old"
+    worker_1.set("key", "new")
+    assert worker_2.get("key") == "new", (
+        "Убедитесь, что запись в одном воркере делает устаревшими "
+        "локальные копии ключа в остальных воркерах."
+    )
+
+
+@pytest.mark.parametrize("operation", ["delete", "incr"])
+def test_shared_changes_bump_generation(operation):
+    worker_1 = make_cache()
+    worker_2 = make_cache()
+    worker_1.set("counter", 1)
+    assert worker_2.get("counter") == 1
+    getattr(worker_1, operation)("counter")
+    assert worker_2.get("counter") == (None if operation == "delete" else 2)
+
+
+def test_recompute_locks_keep_local_copies():
+    worker_1 = make_cache()
+    worker_2 = make_cache()
+    worker_1.set("feed", "cached")
+    worker_2.get("feed")
+    caches["shared"].delete("feed")
+    for worker in (worker_1, worker_2):
+        assert worker.add("feed:lock", 1, 10)
+        worker.delete("feed:lock")
+    assert worker_2.get("feed") == "cached", (
+        "Убедитесь, что захват и снятие блокировок пересчёта не сбрасывают "
+        "локальные копии ключей."
+    )
+
+
+def test_write_keeps_unrelated_local_copies():
+    worker_1 = make_cache()
+    worker_2 = make_cache()
+    for key in ("a", "b"):
+        worker_1.set(key, "old")
+        worker_2.get(key)
+    caches["shared"].delete("b")
+    worker_1.set("a", "new")
+    assert worker_2.get("a") == "new"
+    assert worker_2.get("b") == "old", (
+        "Убедитесь, что запись ключа сбрасывает в других воркерах только "
+        "копию этого ключа."
+    )
+
+
+def test_batch_write_is_one_log_entry():
+    worker = make_cache()
+    worker.set("warm-up", 1)
+    sequence = caches["shared"].get(worker._sequence_key())
+    worker.set_many({f"post:{number}": number for number in range(10)})
+    assert caches["shared"].get(worker._sequence_key()) == sequence + 1, (
+        "Убедитесь, что пакетная запись публикует изменения одной записью "
+        "журнала, а не обращением на каждый ключ."
+    )
+
+
+def test_lost_log_entry_resets_local_tier(monkeypatch):
+    from blog import cache_backends
+
+    monkeypatch.setattr(cache_backends, "LOG_GRACE", 0)
+    worker_1 = make_cache()
+    worker_2 = make_cache()
+    worker_1.set("key", "old")
+    assert worker_2.get("key") == "old"
+    worker_1.set("key", "new")
+    caches["shared"].delete(
+        worker_1._log_key(caches["shared"].get(worker_1._sequence_key()))
+    )
+    assert worker_2.get("key") == "new", (
+        "Убедитесь, что при потере записи журнала локальный уровень "
+        "сбрасывается целиком."
+    )
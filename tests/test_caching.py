@@ -0,0 +1,231 @@
+import pytest
+from django.db import connection
+from django.test.client import Client
+from django.test.utils import CaptureQueriesContext
+from mixer.main import Mixer
+
+from conftest import N_PER_FIXTURE
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def feed_posts(mixer: Mixer, user, published_category):
+    return mixer.cycle(N_PER_FIXTURE).blend(
+        "blog.Post", author=user, category=published_category
+    )
+
+
+def test_cached_feed_skips_database(feed_posts, client: Client):
+    client.get("/")
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get("/")
+    assert len(response.context["page_obj"]) == N_PER_FIXTURE
+    assert not [
+        query for query in queries if "blog_post" in query["sql"]
+    ], (
+        "Убедитесь, что повторный запрос ленты берёт список публикаций "
+        "и сами публикации из кэша."
+    )
+
+
+def test_post_edit_invalidates_only_post(feed_posts, client: Client):
+    from blog.caching import INDEX_FEED, get_generation
+
+    client.get("/")
+    generation = get_generation(INDEX_FEED)
+    post = feed_posts[0]
+    post.text = "Обновлённый текст"
+    post.save()
+    assert get_generation(INDEX_FEED) == generation, (
+        "Убедитесь, что правка текста публикации не сбрасывает кэш ленты."
+    )
+    posts = {p.id: p for p in client.get("/").context["page_obj"]}
+    assert posts[post.id].text == "Обновлённый текст"
+
+
+def test_new_post_appears_in_cached_feed(
+        feed_posts, mixer: Mixer, user, published_category, client: Client
+):
+    client.get("/")
+    post = mixer.blend("blog.Post", author=user, category=published_category)
+    posts = list(client.get("/").context["page_obj"])
+    assert post in posts, (
+        "Убедитесь, что новая публикация сбрасывает кэш ленты."
+    )
+
+
+def test_unpublished_category_hides_cached_posts(
+        feed_posts, published_category, client: Client
+):
+    client.get(f"/category/{published_category.slug}/")
+    published_category.is_published = False
+    published_category.save()
+    assert not list(client.get("/").context["page_obj"])
+
+
+def test_unpublished_category_hides_posts_in_profile(
+        feed_posts, user, published_category, client: Client
+):
+    url = f"/profile/{user.username}/"
+    assert len(client.get(url).context["page_obj"]) == N_PER_FIXTURE
+    published_category.is_published = False
+    published_category.save()
+    assert not list(client.get(url).context["page_obj"]), (
+        "Убедитесь, что снятие категории с публикации сбрасывает кэш лент "
+        "профилей её авторов."
+    )
+
+
+def test_stale_entry_served_while_another_worker_recomputes():
+    from django.core.cache import cache
+
+    from blog.caching import get_or_compute
+
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return "fresh"
+
+    assert get_or_compute("swr-key", lambda: "old", 60, 600, 1) == "old"
+    cache.add("swr-key:lock", 1)
+    assert get_or_compute("swr-key", compute, 60, 600, 2) == "old", (
+        "Убедитесь, что устаревшая запись отдаётся, пока её пересчитывает "
+        "другой воркер."
+    )
+    assert not calls
+    cache.delete("swr-key:lock")
+    assert get_or_compute("swr-key", compute, 60, 600, 2) == "fresh"
+    assert calls == [1]
+
+
+def test_missing_entry_waits_for_recomputing_worker(monkeypatch):
+    from django.core.cache import cache
+
+    from blog import caching
+
+    cache.add("coalesced-key:lock", 1)
+
+    def sleep(seconds):
+        cache.set("coalesced-key", (None, float("inf"), "shared"))
+
+    monkeypatch.setattr(caching.time, "sleep", sleep)
+    value = caching.get_or_compute(
+        "coalesced-key", lambda: "own", 60, 600
+    )
+    assert value == "shared", (
+        "Убедитесь, что при отсутствии записи воркер дожидается результата "
+        "того, кто её пересчитывает, а не считает сам."
+    )
+
+
+def test_waiting_stops_when_lock_released_without_value(monkeypatch):
+    from django.core.cache import cache
+
+    from blog import caching
+
+    cache.add("missing-key:lock", 1)
+    sleeps = []
+
+    def sleep(seconds):
+        sleeps.append(seconds)
+        cache.delete("missing-key:lock")
+
+    monkeypatch.setattr(caching.time, "sleep", sleep)
+    value = caching.get_or_compute("missing-key", lambda: "own", 60, 600)
+    assert value == "own"
+    assert len(sleeps) == 1, (
+        "Убедитесь, что воркер перестаёт ждать запись, как только "
+        "блокировку сняли без результата."
+    )
+
+
+def test_body_cache_shared_between_readers(
+        feed_posts, user, user_client: Client, client: Client
+):
+    client.get("/")
+    with CaptureQueriesContext(connection) as queries:
+        response = user_client.get("/")
+    content = response.content.decode("utf-8")
+    assert feed_posts[0].title in content
+    assert f"/profile/{user.username}/" in content, (
+        "Убедитесь, что шапка страницы рендерится для каждого пользователя."
+    )
+    assert not [
+        query for query in queries
+        if "blog_post" in query["sql"] or "blog_category" in query["sql"]
+    ], (
+        "Убедитесь, что авторизованный читатель получает тело ленты "
+        "из того же кэша, что и анонимный."
+    )
+
+
+def test_username_change_refreshes_cached_body(
+        feed_posts, user, client: Client
+):
+    client.get("/")
+    user.username = "renamed_author"
+    user.save()
+    assert "@renamed_author" in client.get("/").content.decode("utf-8")
+
+
+def test_signup_and_password_change_keep_cached_bodies(
+        feed_posts, user, mixer: Mixer
+):
+    from blog.caching import RELATED_SCOPE, get_generation
+
+    generation = get_generation(RELATED_SCOPE)
+    mixer.blend("auth.User", username="newcomer")
+    user.set_password("new-password-123")
+    user.save()
+    assert get_generation(RELATED_SCOPE) == generation, (
+        "Убедитесь, что регистрация и смена пароля не сбрасывают кэш "
+        "тел страниц."
+    )
+
+
+@pytest.fixture
+def commented_post(mixer: Mixer, user, published_category):
+    from blog.constants import COMMENTS_LIMIT_ON_PAGE
+
+    post = mixer.blend("blog.Post", author=user, category=published_category)
+    mixer.cycle(COMMENTS_LIMIT_ON_PAGE + 1).blend(
+        "blog.Comment", post=post, author=user
+    )
+    return post
+
+
+def test_new_comment_keeps_earlier_comment_pages(
+        commented_post, mixer: Mixer, user, client: Client
+):
+    url = f"/posts/{commented_post.id}/"
+    client.get(url)
+    mixer.blend("blog.Comment", post=commented_post, author=user)
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url)
+    assert response.context["page_obj"].paginator.count == (
+        commented_post.comments.count()
+    )
+    assert not [
+        query for query in queries
+        if 'FROM "blog_comment"' in query["sql"]
+    ], (
+        "Убедитесь, что новый комментарий не сбрасывает кэш первых страниц "
+        "комментариев: он дописывается на последнюю."
+    )
+    last_page = client.get(f"{url}?page=2").context["page_obj"]
+    assert len(last_page) == 2, (
+        "Убедитесь, что новый комментарий появляется на последней странице."
+    )
+
+
+def test_deleted_comment_shifts_cached_pages(commented_post, client: Client):
+    url = f"/posts/{commented_post.id}/"
+    first_page = list(client.get(url).context["page_obj"])
+    last_comment = list(client.get(f"{url}?page=2").context["page_obj"])[0]
+    first_page[0].delete()
+    assert last_comment in list(client.get(url).context["page_obj"]), (
+        "Убедитесь, что удаление комментария сбрасывает кэш его страницы "
+        "и всех следующих."
+    )
@@ -0,0 +1,67 @@
+from http import HTTPStatus
+
+import pytest
+from django.test.client import Client
+
+pytestmark = [pytest.mark.django_db]
+
+JSON = {"HTTP_ACCEPT": "application/json"}
+
+
+def test_add_comment_returns_rendered_comment(
+        post_with_published_location, user_client: Client
+):
+    post = post_with_published_location
+    response = user_client.post(
+        f"/posts/{post.id}/comment/", {"text": "Новый комментарий"}, **JSON
+    )
+    assert response.status_code == HTTPStatus.CREATED, (
+        "Убедитесь, что при запросе JSON добавление комментария отвечает "
+        "201, а не перенаправлением."
+    )
+    data = response.json()
+    comment = post.comments.get()
+    assert data["id"] == comment.id
+    assert "Новый комментарий" in data["html"]
+    assert f"/edit_comment/{comment.id}/" in data["html"]
+    assert "<html" not in data["html"]
+
+
+def test_invalid_comment_returns_errors(
+        post_with_published_location, user_client: Client
+):
+    response = user_client.post(
+        f"/posts/{post_with_published_location.id}/comment/",
+        {"text": ""},
+        **JSON
+    )
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    assert "text" in response.json()["errors"]
+
+
+def test_edit_and_delete_comment_json(
+        mixer, user, post_with_published_location, user_client: Client
+):
+    comment = mixer.blend(
+        "blog.Comment", post=post_with_published_location, author=user
+    )
+    base_url = f"/posts/{comment.post_id}"
+    response = user_client.post(
+        f"{base_url}/edit_comment/{comment.id}/", {"text": "Правка"}, **JSON
+    )
+    assert response.status_code == HTTPStatus.OK
+    assert "Правка" in response.json()["html"]
+    response = user_client.post(
+        f"{base_url}/delete_comment/{comment.id}/", **JSON
+    )
+    assert response.json() == {"id": comment.id, "deleted": True}
+
+
+def test_html_form_still_redirects(
+        post_with_published_location, user_client: Client
+):
+    post = post_with_published_location
+    response = user_client.post(
+        f"/posts/{post.id}/comment/", {"text": "Комментарий"}
+    )
+    assert response.status_code == HTTPStatus.FOUND
@@ -0,0 +1,62 @@
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.client import Client
+from django.test.utils import CaptureQueriesContext
+from mixer.main import Mixer
+
+
+@pytest.fixture
+def hidden_post(mixer: Mixer, user, published_category):
+    return mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=False
+    )
+
+
+@pytest.mark.django_db
+def test_comment_on_hidden_post_is_not_found(
+        hidden_post, another_user_client: Client
+):
+    response = another_user_client.post(
+        f"/posts/{hidden_post.id}/comment/", {"text": "Комментарий"}
+    )
+    assert response.status_code == HTTPStatus.NOT_FOUND, (
+        "Убедитесь, что нельзя прокомментировать публикацию, "
+        "которая не видна пользователю."
+    )
+    assert not hidden_post.comments.exists()
+
+
+@pytest.mark.django_db
+def test_author_comments_own_hidden_post(hidden_post, user_client: Client):
+    with CaptureQueriesContext(connection) as queries:
+        user_client.post(
+            f"/posts/{hidden_post.id}/comment/", {"text": "Комментарий"}
+        )
+    assert hidden_post.comments.count() == 1
+    assert not [
+        query for query in queries
+        if query["sql"].startswith("SELECT") and '"blog_post"."text"' in (
+            query["sql"]
+        )
+    ], (
+        "Убедитесь, что при добавлении комментария публикация не "
+        "загружается целиком."
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_bench_comments_command(mixer: Mixer, user, published_category):
+    post = mixer.blend("blog.Post", author=user, category=published_category)
+    out = StringIO()
+    call_command(
+        "bench_comments", post.id, writers=2, comments=2, stdout=out
+    )
+    assert "комментариев: 4" in out.getvalue()
+    assert not post.comments.exists(), (
+        "Убедитесь, что замер удаляет созданные комментарии."
+    )
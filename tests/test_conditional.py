@@ -0,0 +1,44 @@
+from http import HTTPStatus
+
+import pytest
+from django.test.client import Client
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.mark.parametrize(
+    "url_template", ["/", "/posts/{post.id}/", "/profile/{post.author}/",
+                     "/category/{post.category.slug}/"]
+)
+def test_unchanged_page_returns_not_modified(
+        url_template, post_with_published_location, client: Client
+):
+    url = url_template.format(post=post_with_published_location)
+    response = client.get(url)
+    assert response.status_code == HTTPStatus.OK
+    assert response.has_header("ETag"), (
+        "Убедитесь, что страницы лент и публикации отдают заголовок ETag."
+    )
+    repeated = client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+    assert repeated.status_code == HTTPStatus.NOT_MODIFIED
+
+
+def test_post_edit_changes_etag(post_with_published_location, client: Client):
+    url = f"/posts/{post_with_published_location.id}/"
+    etag = client.get(url)["ETag"]
+    post_with_published_location.text = "Новый текст"
+    post_with_published_location.save()
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK
+    assert "Новый текст" in response.content.decode("utf-8")
+
+
+def test_etag_differs_between_users(
+        post_with_published_location, client: Client, user_client: Client
+):
+    etag = client.get("/")["ETag"]
+    response = user_client.get("/", HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK, (
+        "Убедитесь, что ETag учитывает пользователя: шапка страницы "
+        "у каждого своя."
+    )
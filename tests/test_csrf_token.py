@@ -0,0 +1,47 @@
+from http import HTTPStatus
+
+import pytest
+from django.test.client import Client
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def csrf_client(user):
+    client = Client(enforce_csrf_checks=True)
+    client.force_login(user)
+    return client
+
+
+def test_post_page_has_no_csrf_token(
+        post_with_published_location, csrf_client: Client
+):
+    response = csrf_client.get(f"/posts/{post_with_published_location.id}/")
+    assert response.status_code == HTTPStatus.OK
+    assert 'name="csrfmiddlewaretoken" value=""' in response.content.decode(
+        "utf-8"
+    ), (
+        "Убедитесь, что страница публикации не содержит CSRF-токена и "
+        "может кэшироваться для всех читателей."
+    )
+
+
+def test_comment_requires_token_from_endpoint(
+        post_with_published_location, csrf_client: Client
+):
+    url = f"/posts/{post_with_published_location.id}/comment/"
+    response = csrf_client.post(url, {"text": "Комментарий"})
+    assert response.status_code == HTTPStatus.FORBIDDEN, (
+        "Убедитесь, что добавление комментария без CSRF-токена "
+        "по-прежнему отклоняется."
+    )
+    token_response = csrf_client.get("/csrf/")
+    assert "no-store" in token_response["Cache-Control"]
+    response = csrf_client.post(
+        url,
+        {"text": "Комментарий", "csrfmiddlewaretoken": token_response.json()[
+            "token"
+        ]},
+    )
+    assert response.status_code == HTTPStatus.FOUND
+    assert post_with_published_location.comments.count() == 1
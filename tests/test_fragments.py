@@ -0,0 +1,67 @@
+from http import HTTPStatus
+
+import pytest
+from django.test.client import Client
+from mixer.main import Mixer
+
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def feed_posts(mixer: Mixer, user, published_category):
+    return mixer.cycle(N_PER_PAGE + 2).blend(
+        "blog.Post", author=user, category=published_category
+    )
+
+
+@pytest.mark.parametrize(
+    "url",
+    (
+        "/page/",
+        "/category/{category.slug}/page/",
+        "/profile/{user.username}/page/",
+    ),
+)
+def test_feed_fragment_contains_only_cards(
+        url, feed_posts, user, published_category, client: Client
+):
+    url = url.format(category=published_category, user=user)
+    response = client.get(f"{url}?page=2")
+    assert response.status_code == HTTPStatus.OK
+    content = response.content.decode("utf-8")
+    assert "<html" not in content and "<header" not in content, (
+        "Убедитесь, что фрагмент ленты не содержит разметки base.html."
+    )
+    assert content.count("<article") == 2
+    assert "data-next-page" not in content, (
+        "Убедитесь, что на последней странице нет метки следующей страницы."
+    )
+    first_page = client.get(url).content.decode("utf-8")
+    assert 'data-next-page="2"' in first_page
+
+
+def test_comments_fragment(mixer: Mixer, post_with_published_location, user,
+                           client: Client):
+    post = post_with_published_location
+    comments = mixer.cycle(N_PER_PAGE + 1).blend(
+        "blog.Comment", post=post, author=user
+    )
+    response = client.get(f"/posts/{post.id}/comments/?page=2")
+    content = response.content.decode("utf-8")
+    assert "<html" not in content
+    assert f"comment_{comments[-1].id}" in content, (
+        "Убедитесь, что фрагмент отдаёт комментарии запрошенной страницы."
+    )
+
+
+def test_comments_fragment_hides_unavailable_post(
+        mixer: Mixer, user, published_category, client: Client
+):
+    post = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=False
+    )
+    response = client.get(f"/posts/{post.id}/comments/")
+    assert response.status_code == HTTPStatus.NOT_FOUND
@@ -0,0 +1,45 @@
+import pytest
+from django.test.client import Client
+from mixer.main import Mixer
+
+from conftest import N_PER_FIXTURE
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_feed_shares_related_instances(
+        mixer: Mixer, user, published_category, client: Client
+):
+    mixer.cycle(N_PER_FIXTURE).blend(
+        "blog.Post", author=user, category=published_category
+    )
+    response = client.get("/")
+    posts = list(response.context["page_obj"])
+    assert len(posts) == N_PER_FIXTURE
+    assert len({id(post.category) for post in posts}) == 1, (
+        "Убедитесь, что публикации одной категории на странице ленты "
+        "ссылаются на один и тот же объект категории."
+    )
+    assert len({id(post.author) for post in posts}) == 1, (
+        "Убедитесь, что публикации одного автора на странице ленты "
+        "ссылаются на один и тот же объект автора."
+    )
+
+
+def test_comments_share_post_author_instance(
+        mixer: Mixer, post_with_published_location, client: Client
+):
+    post = post_with_published_location
+    mixer.cycle(N_PER_FIXTURE).blend(
+        "blog.Comment", post=post, author=post.author
+    )
+    response = client.get(f"/posts/{post.id}/")
+    comments = list(response.context["page_obj"])
+    assert len(comments) == N_PER_FIXTURE
+    assert all(
+        comment.author is response.context["post"].author
+        for comment in comments
+    ), (
+        "Убедитесь, что комментарии автора поста ссылаются на тот же "
+        "объект пользователя, что и сама публикация."
+    )
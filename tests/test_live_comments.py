@@ -0,0 +1,106 @@
+import asyncio
+from http import HTTPStatus
+
+import pytest
+from asgiref.sync import async_to_sync, sync_to_async
+from django.test import AsyncClient, RequestFactory
+from django.test.client import Client
+from mixer.main import Mixer
+
+from blog import live
+from blog.models import Comment, LiveEvent
+
+pytestmark = [pytest.mark.django_db(transaction=True)]
+
+
+@pytest.fixture
+def live_post(mixer: Mixer, user, published_category):
+    return mixer.blend("blog.Post", author=user, category=published_category)
+
+
+def _add_comment(post, author, text):
+    return Comment.objects.create(post=post, author=author, text=text)
+
+
+def test_new_comment_is_streamed(live_post, user):
+    async def listen():
+        response = await AsyncClient().get(
+            f"/posts/{live_post.id}/comments/live/"
+        )
+        assert response["Content-Type"] == "text/event-stream"
+        chunks = aiter(response.streaming_content)
+        assert (await anext(chunks)).startswith(b"retry:")
+        comment = await sync_to_async(_add_comment)(
+            live_post, user, "Живой комментарий"
+        )
+        message = (await asyncio.wait_for(anext(chunks), 5)).decode()
+        await response.streaming_content.aclose()
+        return comment, message
+
+    comment, message = async_to_sync(listen)()
+    assert "event: comment" in message
+    assert f'name="comment_{comment.id}"' in message
+    assert "Живой комментарий" in message, (
+        "Убедитесь, что новый комментарий приходит в поток "
+        "готовым фрагментом разметки."
+    )
+
+
+def test_missed_comments_are_replayed(live_post, user):
+    first = _add_comment(live_post, user, "Первый")
+    _add_comment(live_post, user, "Второй")
+    since = LiveEvent.objects.get(comment_id=first.id).id
+
+    async def reconnect():
+        response = await AsyncClient().get(
+            f"/posts/{live_post.id}/comments/live/",
+            headers={"Last-Event-ID": str(since)},
+        )
+        chunks = aiter(response.streaming_content)
+        await anext(chunks)
+        message = (await asyncio.wait_for(anext(chunks), 5)).decode()
+        await response.streaming_content.aclose()
+        return message
+
+    message = async_to_sync(reconnect)()
+    assert "Второй" in message and "Первый" not in message, (
+        "Убедитесь, что после переподключения досылаются только "
+        "пропущенные комментарии."
+    )
+
+
+def test_replay_is_not_lost_behind_newer_event(
+    live_post, user, monkeypatch
+):
+    first = _add_comment(live_post, user, "Первый")
+    _add_comment(live_post, user, "Второй")
+    third = _add_comment(live_post, user, "Третий")
+    since = LiveEvent.objects.get(comment_id=first.id).id
+    newest = LiveEvent.objects.get(comment_id=third.id).id
+    request = RequestFactory().get("/")
+    request.user = user
+
+    async def stream():
+        # Опросчик успел положить новое событие в очередь до того,
+        # как поток дочитал пропущенные.
+        queue = asyncio.Queue()
+        queue.put_nowait((newest, third))
+        monkeypatch.setattr(live.broker, "subscribe", lambda post_id: queue)
+        chunks = live.comment_stream(request, live_post, since)
+        await anext(chunks)
+        messages = [
+            (await asyncio.wait_for(anext(chunks), 5)) for _ in range(2)
+        ]
+        await chunks.aclose()
+        return messages
+
+    messages = async_to_sync(stream)()
+    assert "Второй" in messages[0] and "Третий" in messages[1], (
+        "Убедитесь, что пропущенные комментарии досылаются по порядку "
+        "и не теряются, если опросчик опередил чтение из таблицы."
+    )
+
+
+def test_stream_needs_asgi(live_post, client: Client):
+    response = client.get(f"/posts/{live_post.id}/comments/live/")
+    assert response.status_code == HTTPStatus.NO_CONTENT
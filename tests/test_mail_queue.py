@@ -0,0 +1,136 @@
+import socketserver
+import threading
+from email import message_from_bytes, policy
+from io import StringIO
+
+import pytest
+from django.core import mail
+from django.core.management import call_command
+from django.urls import reverse
+
+from blog.mail import QueuedEmailBackend, send_queued_mail_task
+from blog.models import OutgoingEmail, Task
+
+pytestmark = [pytest.mark.django_db]
+
+
+class SMTPHandler(socketserver.StreamRequestHandler):
+    """Минимальный SMTP-сервер: принимает всё и запоминает письма."""
+
+    def reply(self, line):
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self):
+        self.server.connections += 1
+        self.reply("220 localhost")
+        while line := self.rfile.readline():
+            command = line.decode().strip().upper()
+            if command.startswith(("EHLO", "HELO")):
+                self.reply("250 localhost")
+            elif command == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                data = b"".join(iter(self.rfile.readline, b".\r\n"))
+                self.server.messages.append(
+                    message_from_bytes(data, policy=policy.default)
+                )
+                self.reply("250 OK")
+            elif command == "QUIT":
+                self.reply("221 Bye")
+                break
+            else:
+                self.reply("250 OK")
+
+
+@pytest.fixture
+def smtp_server(settings):
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), SMTPHandler)
+    server.daemon_threads = True
+    server.connections = 0
+    server.messages = []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    settings.QUEUED_EMAIL_BACKEND = (
+        "django.core.mail.backends.smtp.EmailBackend"
+    )
+    settings.EMAIL_HOST, settings.EMAIL_PORT = server.server_address
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(autouse=True)
+def queued_email(settings):
+    settings.EMAIL_BACKEND = "blog.mail.QueuedEmailBackend"
+    settings.BLOG_TASKS_EAGER = False
+
+
+def queue_messages(count):
+    QueuedEmailBackend().send_messages([
+        mail.EmailMessage(f"Письмо №{number}", "Текст", to=["a@example.com"])
+        for number in range(count)
+    ])
+
+
+def test_password_reset_only_queues(
+        client, user, django_capture_on_commit_callbacks
+):
+    user.email = "reader@example.com"
+    user.save()
+    with django_capture_on_commit_callbacks(execute=True):
+        response = client.post(
+            reverse("password_reset"), {"email": user.email}
+        )
+    assert response.status_code == 302
+    assert not mail.outbox, (
+        "Убедитесь, что письмо не отправляется во время запроса."
+    )
+    assert OutgoingEmail.objects.get().recipients == [user.email]
+    assert Task.objects.filter(
+        name=send_queued_mail_task.task_name
+    ).count() == 1
+
+
+def test_one_pending_delivery_task(django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        queue_messages(1)
+        queue_messages(1)
+    assert Task.objects.count() == 1, (
+        "Убедитесь, что на всю очередь писем ставится одна задача рассылки."
+    )
+
+
+def test_batches_reuse_connection(smtp_server):
+    queue_messages(5)
+    out = StringIO()
+    call_command("send_queued_mail", "--batch-size", "2", stdout=out)
+    assert "Отправлено писем: 5, с ошибкой: 0" in out.getvalue()
+    assert smtp_server.connections == 3, (
+        "Убедитесь, что пачка писем отправляется через одно соединение."
+    )
+    assert sorted(message["Subject"] for message in smtp_server.messages) == [
+        f"Письмо №{number}" for number in range(5)
+    ]
+    assert not OutgoingEmail.objects.exists()
+
+
+def test_failed_delivery_stays_queued(smtp_server):
+    smtp_server.shutdown()
+    smtp_server.server_close()
+    queue_messages(2)
+    call_command("send_queued_mail", stdout=StringIO())
+    assert list(OutgoingEmail.objects.values_list("attempts", flat=True)) == [
+        1, 1
+    ], "Убедитесь, что неотправленные письма остаются в очереди."
+    assert OutgoingEmail.objects.exclude(last_error="").count() == 2
+
+
+@pytest.mark.django_db(transaction=True)
+def test_eager_delivery(settings):
+    settings.BLOG_TASKS_EAGER = True
+    settings.QUEUED_EMAIL_BACKEND = (
+        "django.core.mail.backends.locmem.EmailBackend"
+    )
+    queue_messages(2)
+    assert [message.subject for message in mail.outbox] == [
+        "Письмо №0", "Письмо №1"
+    ]
+    assert not OutgoingEmail.objects.exists()
@@ -0,0 +1,42 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.test.client import Client
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_post_text_rendered_on_save(post_with_published_location):
+    post = post_with_published_location
+    post.text = "<b>первая</b>\nвторая"
+    post.save()
+    post.refresh_from_db()
+    assert post.text_html == "&lt;b&gt;первая&lt;/b&gt;<br>вторая", (
+        "Убедитесь, что при сохранении публикации текст экранируется, "
+        "а переводы строк заменяются на <br>."
+    )
+
+
+def test_comment_text_rendered_in_page(
+        mixer, post_with_published_location, client: Client
+):
+    mixer.blend(
+        "blog.Comment", post=post_with_published_location,
+        text="строка\nещё строка"
+    )
+    content = client.get(
+        f"/posts/{post_with_published_location.id}/"
+    ).content.decode("utf-8")
+    assert "строка<br>ещё строка" in content
+
+
+def test_backfill_command(post_with_published_location):
+    from blog.models import Post
+
+    Post.objects.update(text_html="")
+    call_command("render_texts", stdout=StringIO())
+    post_with_published_location.refresh_from_db()
+    assert post_with_published_location.text_html, (
+        "Убедитесь, что команда render_texts заполняет пустой text_html."
+    )
@@ -0,0 +1,123 @@
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.client import Client
+from django.test.utils import CaptureQueriesContext
+from mixer.main import Mixer
+
+# Задачи очереди ставятся после коммита, поэтому тестам нужны настоящие
+# транзакции.
+pytestmark = [pytest.mark.django_db(transaction=True)]
+
+
+def found(client, query):
+    return list(client.get("/search/", {"q": query}).context["page_obj"])
+
+
+@pytest.fixture
+def posts(mixer: Mixer, user, published_category):
+    return (
+        mixer.blend(
+            "blog.Post", author=user, category=published_category,
+            title="Котики", text="Про пушистых котиков"
+        ),
+        mixer.blend(
+            "blog.Post", author=user, category=published_category,
+            title="Собаки", text="Немного о котах в конце"
+        ),
+    )
+
+
+def test_search_ranks_posts_by_relevance(posts, client: Client):
+    cats, dogs = posts
+    assert found(client, "кот") == [cats, dogs], (
+        "Убедитесь, что поиск находит публикации по префиксу слова "
+        "и ставит выше более релевантные."
+    )
+    assert found(client, "собаки конце") == [dogs]
+
+
+def test_search_keeps_index_in_sync(posts, client: Client):
+    cats, dogs = posts
+    dogs.text = "Только собаки"
+    dogs.save()
+    assert found(client, "кот") == [cats]
+    cats.delete()
+    assert not found(client, "кот")
+
+
+def test_search_hides_unpublished_posts(posts, client: Client):
+    cats, dogs = posts
+    cats.is_published = False
+    cats.save()
+    assert found(client, "кот") == [dogs]
+
+
+def test_search_finds_posts_by_comments(
+        posts, mixer: Mixer, user, client: Client
+):
+    _, dogs = posts
+    mixer.blend("blog.Comment", post=dogs, author=user, text="Отличные фото")
+    assert found(client, "фото") == [dogs]
+
+
+def test_search_ignores_fts_syntax(posts, client: Client):
+    response = client.get("/search/", {"q": 'кот" OR NEAR(*'})
+    assert response.status_code == HTTPStatus.OK
+
+
+def test_rebuild_and_admin_search(posts, admin_client: Client):
+    from blog import search
+
+    cats, _ = posts
+    with search.connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {search.POST_INDEX}")
+    call_command("rebuild_search_index", stdout=StringIO())
+    response = admin_client.get("/admin/blog/post/", {"q": "пушистых"})
+    assert list(response.context["cl"].result_list) == [cats], (
+        "Убедитесь, что поиск в админке идёт по полнотекстовому индексу."
+    )
+
+
+def test_search_results_are_cached_per_normalized_query(
+        posts, client: Client
+):
+    found(client, "Кот")
+    with CaptureQueriesContext(connection) as queries:
+        assert found(client, "кот  КОТ") == list(posts)
+    assert not [
+        query for query in queries if "_fts" in query["sql"]
+    ], (
+        "Убедитесь, что повторный запрос (с точностью до регистра и "
+        "повторов слов) берёт результаты и фрагменты из кэша."
+    )
+
+
+def test_new_post_invalidates_cached_results(
+        posts, mixer: Mixer, user, published_category, client: Client
+):
+    found(client, "кот")
+    post = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        title="Кот учёный", text="Текст"
+    )
+    assert post in found(client, "кот")
+
+
+def test_snippets_are_highlighted_and_escaped(
+        mixer: Mixer, user, published_category, client: Client
+):
+    mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        title="Заметка", text="<b>жирный</b> кот"
+    )
+    content = client.get("/search/", {"q": "кот"}).content.decode("utf-8")
+    assert "<mark>кот</mark>" in content, (
+        "Убедитесь, что найденные слова подсвечиваются во фрагменте."
+    )
+    assert "&lt;b&gt;жирный&lt;/b&gt;" in content, (
+        "Убедитесь, что текст фрагмента экранируется."
+    )
@@ -0,0 +1,89 @@
+from http import HTTPStatus
+from io import StringIO
+from xml.etree import ElementTree
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.client import Client
+from django.test.utils import CaptureQueriesContext
+from mixer.main import Mixer
+
+pytestmark = [pytest.mark.django_db]
+
+NS = "{http://www.sitemaps.org/schemas/sitemap/0.9}"
+
+
+@pytest.fixture(autouse=True)
+def sitemaps_dir(settings, tmp_path):
+    settings.SITEMAPS_DIR = tmp_path / "sitemaps"
+    return settings.SITEMAPS_DIR
+
+
+def _locations(path):
+    return [
+        loc.text for loc in ElementTree.parse(path).getroot().iter(f"{NS}loc")
+    ]
+
+
+def test_sitemaps_are_sharded_by_id(
+        mixer: Mixer, user, published_category, sitemaps_dir
+):
+    posts = mixer.cycle(5).blend(
+        "blog.Post", author=user, category=published_category
+    )
+    hidden = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=False
+    )
+    with CaptureQueriesContext(connection) as queries:
+        call_command(
+            "build_sitemaps", "--base-url", "https://example.com",
+            "--shard-size", "2", stdout=StringIO()
+        )
+    assert not [query for query in queries if "OFFSET" in query["sql"]], (
+        "Убедитесь, что карта сайта читает базу по ключу, без OFFSET."
+    )
+    post_shards = sorted(sitemaps_dir.glob("sitemap-posts-*.xml"))
+    assert len(post_shards) == len({post.id // 2 for post in posts})
+    locations = [
+        loc for path in post_shards for loc in _locations(path)
+    ]
+    assert sorted(locations) == sorted(
+        f"https://example.com/posts/{post.id}/" for post in posts
+    )
+    assert f"https://example.com/posts/{hidden.id}/" not in locations, (
+        "Убедитесь, что в карту сайта не попадают неопубликованные посты."
+    )
+    index = _locations(sitemaps_dir / "sitemap.xml")
+    assert sorted(index) == sorted(
+        f"https://example.com/sitemaps/{path.name}"
+        for path in sitemaps_dir.glob("sitemap-*.xml")
+    )
+
+
+def test_sitemap_is_served_from_files(
+        mixer: Mixer, user, published_category, client: Client
+):
+    post = mixer.blend("blog.Post", author=user, category=published_category)
+    call_command("build_sitemaps", stdout=StringIO())
+    with CaptureQueriesContext(connection) as queries:
+        index = client.get("/sitemap.xml")
+        shard = client.get(f"/sitemaps/sitemap-posts-{post.id // 50000}.xml")
+    assert index.status_code == shard.status_code == HTTPStatus.OK
+    assert f"/posts/{post.id}/".encode() in b"".join(shard.streaming_content)
+    assert not [
+        query for query in queries if "blog_post" in query["sql"]
+    ], "Убедитесь, что карта сайта отдаётся из файлов, без запросов к постам."
+
+
+def test_empty_shards_are_removed(
+        mixer: Mixer, user, published_category, sitemaps_dir
+):
+    post = mixer.blend("blog.Post", author=user, category=published_category)
+    call_command("build_sitemaps", "--shard-size", "1", stdout=StringIO())
+    shard = sitemaps_dir / f"sitemap-posts-{post.id}.xml"
+    assert shard.exists()
+    post.delete()
+    call_command("build_sitemaps", "--shard-size", "1", stdout=StringIO())
+    assert not shard.exists()
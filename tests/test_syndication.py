@@ -0,0 +1,100 @@
+from http import HTTPStatus
+from xml.etree import ElementTree
+
+import pytest
+from django.http import StreamingHttpResponse
+from django.test.client import Client
+from mixer.main import Mixer
+
+pytestmark = [pytest.mark.django_db]
+
+ATOM = "{http://www.w3.org/2005/Atom}"
+
+
+@pytest.fixture
+def feed_posts(mixer: Mixer, user, published_category):
+    published = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        title="Опубликованная"
+    )
+    hidden = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=False, title="Скрытая"
+    )
+    return published, hidden
+
+
+def _content(response):
+    assert isinstance(response, StreamingHttpResponse), (
+        "Убедитесь, что лента отдаётся потоковым ответом."
+    )
+    return b"".join(response.streaming_content)
+
+
+@pytest.mark.parametrize(
+    "url",
+    ("/feed/rss/", "/category/{category}/feed/rss/",
+     "/profile/{author}/feed/rss/"),
+)
+def test_rss_lists_only_published_posts(
+        url, feed_posts, published_category, user, client: Client
+):
+    published, hidden = feed_posts
+    response = client.get(
+        url.format(category=published_category.slug, author=user.username)
+    )
+    assert response.status_code == HTTPStatus.OK
+    assert response["Content-Type"].startswith("application/rss+xml")
+    channel = ElementTree.fromstring(_content(response)).find("channel")
+    titles = [item.findtext("title") for item in channel.iter("item")]
+    assert titles == [published.title], (
+        "Убедитесь, что в RSS попадают только опубликованные посты."
+    )
+
+
+def test_atom_feed_is_valid(feed_posts, client: Client):
+    published, _ = feed_posts
+    response = client.get("/feed/atom/")
+    assert response["Content-Type"].startswith("application/atom+xml")
+    root = ElementTree.fromstring(_content(response))
+    assert root.tag == f"{ATOM}feed"
+    entries = root.findall(f"{ATOM}entry")
+    assert [entry.findtext(f"{ATOM}title") for entry in entries] == [
+        published.title
+    ]
+    assert entries[0].find(f"{ATOM}link").get("href").endswith(
+        f"/posts/{published.id}/"
+    )
+
+
+def test_unknown_feed_format(client: Client):
+    assert client.get("/feed/json/").status_code == HTTPStatus.NOT_FOUND
+
+
+def test_feed_etag_changes_with_new_post(
+        feed_posts, mixer: Mixer, user, published_category, client: Client
+):
+    etag = client.get("/feed/rss/")["ETag"]
+    response = client.get("/feed/rss/", HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+        "Убедитесь, что неизменившаяся лента отдаёт 304 по ETag."
+    )
+    mixer.blend("blog.Post", author=user, category=published_category)
+    response = client.get("/feed/rss/", HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK, (
+        "Убедитесь, что новая публикация сбрасывает ETag ленты."
+    )
+
+
+def test_feed_is_cacheable_by_shared_caches(
+        feed_posts, client: Client, user_client: Client
+):
+    anonymous = client.get("/feed/atom/")
+    logged_in = user_client.get("/feed/atom/")
+    assert anonymous["ETag"] == logged_in["ETag"], (
+        "Убедитесь, что ETag ленты не зависит от пользователя."
+    )
+    assert "public" in logged_in["Cache-Control"]
+    assert "Cookie" not in logged_in.get("Vary", ""), (
+        "Убедитесь, что лента одинакова для всех и не зависит от cookie."
+    )
@@ -0,0 +1,141 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from mixer.main import Mixer
+
+from blog.models import Task, TimelineEntry
+from blog.tasks import claim, enqueue, run_task, task
+
+pytestmark = [pytest.mark.django_db]
+
+calls = []
+
+
+@task(priority=5, max_attempts=2)
+def failing_task(value):
+    calls.append(value)
+    raise RuntimeError("Не получилось")
+
+
+@task(priority=1)
+def urgent_task():
+    pass
+
+
+@pytest.fixture(autouse=True)
+def queued_tasks(settings):
+    settings.BLOG_TASKS_EAGER = False
+    calls.clear()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_side_effects_leave_request(
+        mixer: Mixer, user, another_user, published_category
+):
+    mixer.blend("blog.Follow", user=another_user, author=user)
+    call_command(
+        "run_tasks", "--once", "--concurrency", "1", stdout=StringIO()
+    )
+    post = mixer.blend("blog.Post", author=user, category=published_category)
+    assert not TimelineEntry.objects.filter(post=post).exists(), (
+        "Убедитесь, что раскладка поста по лентам выполняется в очереди "
+        "задач, а не при сохранении."
+    )
+    assert set(Task.objects.values_list("name", flat=True)) >= {
+        "blog.timeline.deliver_post_task", "blog.search.reindex_post"
+    }
+    out = StringIO()
+    call_command("run_tasks", "--once", "--concurrency", "1", stdout=out)
+    assert "с ошибкой: 0" in out.getvalue()
+    assert TimelineEntry.objects.filter(
+        user=another_user, post=post
+    ).exists()
+    assert not Task.objects.exists(), (
+        "Убедитесь, что выполненные задачи удаляются из очереди."
+    )
+
+
+def test_tasks_wait_for_commit(django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks() as callbacks:
+        urgent_task.enqueue_on_commit()
+        assert not Task.objects.exists()
+    assert len(callbacks) == 1
+
+
+def test_priority_order():
+    low = urgent_task.enqueue()
+    high = failing_task.enqueue(1)
+    assert claim(2) == [high.id, low.id]
+
+
+def test_retries_then_fails():
+    queued = failing_task.enqueue("x")
+    assert claim(1) == [queued.id]
+    assert not run_task(queued.id)
+    queued.refresh_from_db()
+    assert queued.status == Task.Status.QUEUED
+    assert queued.attempts == 1
+    assert "Не получилось" in queued.last_error
+    assert claim(1) == [], "Убедитесь, что повтор откладывается."
+
+    Task.objects.filter(id=queued.id).update(run_after=queued.created_at)
+    assert claim(1) == [queued.id]
+    run_task(queued.id)
+    queued.refresh_from_db()
+    assert queued.status == Task.Status.FAILED
+    assert calls == ["x", "x"]
+
+
+def test_eager_mode_runs_immediately(settings):
+    settings.BLOG_TASKS_EAGER = True
+    assert enqueue(urgent_task) is None
+    assert not Task.objects.exists()
+
+
+def test_unknown_task_is_not_run():
+    queued = Task.objects.create(
+        name="os.system", args=["true"], max_attempts=3
+    )
+    assert claim(1) == [queued.id]
+    assert not run_task(queued.id)
+    queued.refresh_from_db()
+    assert queued.status == Task.Status.FAILED, (
+        "Убедитесь, что выполняются только зарегистрированные задачи."
+    )
+
+
+def test_eager_tasks_wait_for_commit_and_swallow_errors(
+        settings, django_capture_on_commit_callbacks
+):
+    from django.db import transaction
+
+    settings.BLOG_TASKS_EAGER = True
+    with django_capture_on_commit_callbacks(execute=True):
+        with pytest.raises(RuntimeError):
+            with transaction.atomic():
+                failing_task.enqueue_on_commit("отменено")
+                raise RuntimeError
+    assert not calls, (
+        "Убедитесь, что задачи из отменённой транзакции не выполняются."
+    )
+    with django_capture_on_commit_callbacks(execute=True):
+        failing_task.enqueue_on_commit("ошибка")
+    assert calls == ["ошибка"], (
+        "Убедитесь, что ошибка задачи в режиме eager не доходит до запроса."
+    )
+
+
+def test_bookkeeping_error_does_not_stop_worker(monkeypatch):
+    from django.db import OperationalError
+
+    def locked(*args, **kwargs):
+        raise OperationalError("database table is locked")
+
+    queued = failing_task.enqueue("x")
+    assert claim(1) == [queued.id]
+    monkeypatch.setattr(Task, "save", locked)
+    assert not run_task(queued.id), (
+        "Убедитесь, что ошибка базы при записи итога задачи не "
+        "останавливает воркер."
+    )
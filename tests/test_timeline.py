@@ -0,0 +1,90 @@
+from datetime import timedelta
+from unittest import mock
+
+import pytest
+from django.test.client import Client
+from django.utils import timezone
+from mixer.main import Mixer
+
+# Задачи очереди ставятся после коммита, поэтому тестам нужны настоящие
+# транзакции.
+pytestmark = [pytest.mark.django_db(transaction=True)]
+
+
+def timeline_posts(client):
+    return list(client.get("/timeline/").context["page_obj"])
+
+
+@pytest.fixture
+def followed_post(mixer: Mixer, another_user, published_category, user_client):
+    user_client.post(f"/profile/{another_user.username}/follow/")
+    return mixer.blend(
+        "blog.Post", author=another_user, category=published_category
+    )
+
+
+def test_published_post_is_delivered(followed_post, user, user_client):
+    from blog.models import TimelineEntry
+
+    assert TimelineEntry.objects.filter(user=user).count() == 1, (
+        "Убедитесь, что опубликованный пост записывается в ленты "
+        "подписчиков автора."
+    )
+    assert timeline_posts(user_client) == [followed_post]
+
+
+def test_follow_backfills_recent_posts(
+        mixer: Mixer, another_user, published_category, user_client: Client
+):
+    post = mixer.blend(
+        "blog.Post", author=another_user, category=published_category
+    )
+    user_client.post(f"/profile/{another_user.username}/follow/")
+    assert timeline_posts(user_client) == [post]
+    user_client.post(f"/profile/{another_user.username}/unfollow/")
+    assert not timeline_posts(user_client)
+
+
+def test_scheduled_post_goes_live_without_redelivery(
+        mixer: Mixer, another_user, published_category, user_client: Client
+):
+    user_client.post(f"/profile/{another_user.username}/follow/")
+    pub_date = timezone.now() + timedelta(days=1)
+    post = mixer.blend(
+        "blog.Post",
+        author=another_user,
+        category=published_category,
+        pub_date=pub_date,
+    )
+    assert not timeline_posts(user_client)
+    later = pub_date + timedelta(minutes=1)
+    with mock.patch("blog.models.now", return_value=later):
+        assert timeline_posts(user_client) == [post], (
+            "Убедитесь, что отложенная публикация появляется в ленте "
+            "подписок, когда наступает её время."
+        )
+
+
+def test_unpublished_post_leaves_timeline(followed_post, user_client):
+    followed_post.is_published = False
+    followed_post.save()
+    assert not timeline_posts(user_client)
+
+
+def test_mega_author_posts_are_pulled(
+        mixer: Mixer, user, another_user, published_category,
+        user_client: Client, monkeypatch
+):
+    from blog import timeline
+    from blog.models import TimelineEntry
+
+    monkeypatch.setattr(timeline, "TIMELINE_FANOUT_LIMIT", 0)
+    user_client.post(f"/profile/{another_user.username}/follow/")
+    post = mixer.blend(
+        "blog.Post", author=another_user, category=published_category
+    )
+    assert not TimelineEntry.objects.exists(), (
+        "Убедитесь, что посты автора с большим числом подписчиков не "
+        "раскладываются по лентам."
+    )
+    assert timeline_posts(user_client) == [post]
@@ -0,0 +1,60 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.client import Client
+from django.test.utils import CaptureQueriesContext
+from mixer.main import Mixer
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def discussed_posts(mixer: Mixer, user, published_category, another_category):
+    quiet, busy, other = mixer.cycle(3).blend(
+        "blog.Post",
+        author=user,
+        category=mixer.sequence(
+            published_category, published_category, another_category
+        ),
+    )
+    for post, count in ((quiet, 1), (busy, 3), (other, 2)):
+        mixer.cycle(count).blend("blog.Comment", post=post, author=user)
+    return quiet, busy, other
+
+
+def test_index_shows_precomputed_trending(discussed_posts, client: Client):
+    quiet, busy, other = discussed_posts
+    call_command("rank_posts", stdout=StringIO())
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get("/")
+    assert [item["id"] for item in response.context["trending"]] == [
+        busy.id, other.id, quiet.id
+    ]
+    assert not [
+        query for query in queries if 'FROM "blog_comment"' in query["sql"]
+    ], (
+        "Убедитесь, что блок самых обсуждаемых публикаций берётся из "
+        "заранее посчитанного рейтинга, а не считается при показе."
+    )
+
+
+def test_category_shows_its_own_trending(
+        discussed_posts, published_category, client: Client
+):
+    quiet, busy, _ = discussed_posts
+    call_command("rank_posts", stdout=StringIO())
+    response = client.get(f"/category/{published_category.slug}/")
+    assert [item["id"] for item in response.context["trending"]] == [
+        busy.id, quiet.id
+    ]
+
+
+def test_trending_skips_unpublished_posts(discussed_posts, client: Client):
+    _, busy, _ = discussed_posts
+    busy.is_published = False
+    busy.save()
+    call_command("rank_posts", "--limit", "1", stdout=StringIO())
+    trending = client.get("/").context["trending"]
+    assert [item["id"] for item in trending] == [discussed_posts[2].id]
@@ -0,0 +1,95 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.client import Client
+from django.test.utils import CaptureQueriesContext
+from mixer.main import Mixer
+
+from conftest import N_PER_FIXTURE
+
+pytestmark = [pytest.mark.django_db]
+
+# PID, которого не бывает в Linux (pid_max не больше 2**22).
+DEAD_PID = 2 ** 22 + 1
+
+
+@pytest.fixture
+def posts(mixer: Mixer, user, published_category):
+    return mixer.cycle(N_PER_FIXTURE).blend(
+        "blog.Post", author=user, category=published_category
+    )
+
+
+def test_views_are_buffered_and_flushed_in_one_update(
+        posts, client: Client
+):
+    from blog.counters import view_counter
+
+    for post in posts:
+        client.get(f"/posts/{post.id}/")
+    client.get(f"/posts/{posts[0].id}/")
+    posts[0].refresh_from_db()
+    assert posts[0].views_count == 0, (
+        "Убедитесь, что просмотр не пишется в базу синхронно."
+    )
+    with CaptureQueriesContext(connection) as queries:
+        view_counter.flush()
+    assert len(queries) == 1, (
+        "Убедитесь, что счётчики записываются одним UPDATE."
+    )
+    counts = [post.views_count for post in
+              posts[0].__class__.objects.order_by("id")]
+    assert counts == [2] + [1] * (N_PER_FIXTURE - 1)
+
+
+def test_log_keeps_unflushed_views(posts, client: Client, view_counts_dir):
+    from blog.counters import read_log, view_counter
+
+    client.get(f"/posts/{posts[0].id}/")
+    (log,) = view_counts_dir.glob("views-*.log")
+    assert read_log(log) == {posts[0].id: 1}
+    view_counter.flush()
+    assert not read_log(log), (
+        "Убедитесь, что после записи в базу журнал очищается."
+    )
+
+
+def test_compact_applies_logs_of_dead_processes(posts, view_counts_dir):
+    view_counts_dir.mkdir()
+    log = view_counts_dir / f"views-{DEAD_PID}.log"
+    log.write_text(f"{posts[0].id} 1\n{posts[0].id} 2\n{posts[1].id}")
+    call_command("compact_view_counts", stdout=StringIO())
+    posts[0].refresh_from_db()
+    posts[1].refresh_from_db()
+    assert posts[0].views_count == 3
+    assert posts[1].views_count == 0, (
+        "Убедитесь, что недописанная строка журнала пропускается."
+    )
+    assert not log.exists()
+
+
+def test_views_recorded_during_flush_are_kept(
+        posts, monkeypatch, view_counts_dir
+):
+    from blog import counters
+
+    counter = counters.ViewCounter()
+    apply_counts = counters.apply_counts
+
+    def slow_update(counts):
+        # Просмотр во время UPDATE не ждёт окончания записи в базу.
+        counter.record(posts[1].id)
+        apply_counts(counts)
+
+    monkeypatch.setattr(counters, "apply_counts", slow_update)
+    counter.record(posts[0].id)
+    counter.flush()
+    (log,) = view_counts_dir.glob("views-*.log")
+    assert counters.read_log(log) == {posts[1].id: 1}, (
+        "Убедитесь, что просмотры, пришедшие во время записи, остаются "
+        "в журнале."
+    )
+    assert counter.pending(posts[1].id) == 1
+    counter.clear()